@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark for the Cabo research crew
+Swaps the search tools and LLM for deterministic local fakes, then times the
+five custom tools and a full five-task crew run under repeatable scenarios
+
+Usage:
+    python3 benchmarks/crew_benchmark.py                       # all scenarios
+    python3 benchmarks/crew_benchmark.py --scenario slow-search --repeat 3
+    python3 benchmarks/crew_benchmark.py --json bench_output.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import cabo_market_research_crew_improved as cabo
+from cabo_models import MarketGapReport, ProductFeatureReport
+from cabo_scheduler import run_task_graph
+from fakes import FakeLLM, FakeSearchTool, LatencyProfile
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "baseline": {
+        "search": LatencyProfile(mean_ms=300, mean_chars=2000),
+        "llm": LatencyProfile(mean_ms=800, mean_chars=3000),
+        "tool_calls_per_task": 1,
+    },
+    "slow-search": {
+        "search": LatencyProfile(mean_ms=1500, sigma=0.6, mean_chars=2000),
+        "llm": LatencyProfile(mean_ms=800, mean_chars=3000),
+        "tool_calls_per_task": 1,
+    },
+    "large-payloads": {
+        "search": LatencyProfile(mean_ms=300, mean_chars=20000),
+        "llm": LatencyProfile(mean_ms=1200, mean_chars=12000),
+        "tool_calls_per_task": 1,
+    },
+    "tool-heavy": {
+        "search": LatencyProfile(mean_ms=300, mean_chars=2000),
+        "llm": LatencyProfile(mean_ms=500, mean_chars=2000),
+        "tool_calls_per_task": 3,
+    },
+}
+
+# Sample inputs for each custom tool
+TOOL_INPUTS = {
+    "analyze_cabo_tourism_data": {"query": "boutique hotels"},
+    "analyze_competitors": {"business_type": "fishing charters"},
+    "analyze_customer_sentiment": {"business_category": "spa resorts"},
+    "predict_market_trends": {"industry_segment": "wellness tourism"},
+    "calculate_roi_potential": {"product_type": "AI concierge", "target_market": "luxury resorts"},
+}
+
+
+def _call_tool(tool: Any, args: Dict[str, Any]) -> Any:
+    return tool.invoke(args) if hasattr(tool, "invoke") else tool.run(**args)
+
+
+def install_fakes(scenario: Dict[str, Any]):
+    """Replace the crew's LLM and search-backed tools with local fakes"""
+    search = FakeSearchTool(profile=scenario["search"])
+    website = FakeSearchTool(
+        name="Search in a specific website",
+        description="Semantic search over the content of a website.",
+        profile=scenario["search"],
+        seed=11,
+    )
+    llm = FakeLLM(profile=scenario["llm"], tool_calls_per_task=scenario["tool_calls_per_task"],
+                  response_models=[MarketGapReport, ProductFeatureReport])
+    cabo.set_component("search_tool", search)
+    cabo.set_component("website_tool", website)
+    cabo.set_component("llm", llm)
+    return search, website, llm
+
+
+def bench_tools(search: FakeSearchTool) -> Dict[str, Dict[str, float]]:
+    """Time each custom tool once and count the searches it issues"""
+    results = {}
+    for name, args in TOOL_INPUTS.items():
+        calls_before = search.calls
+        started = time.perf_counter()
+        _call_tool(getattr(cabo, name), args)
+        results[name] = {
+            "wall_s": round(time.perf_counter() - started, 3),
+            "search_calls": search.calls - calls_before,
+        }
+    return results
+
+
+def bench_crew(search: FakeSearchTool, website: FakeSearchTool, llm: FakeLLM) -> Dict[str, Any]:
+    """Run the full five-task crew through the scheduler and time every task"""
+    crew = cabo.build_crew(cabo.CrewConfig(memory=False, cache=False, max_rpm=None, verbose=False))
+    starts: Dict[str, float] = {}
+    latencies: Dict[str, float] = {}
+    lock = threading.Lock()
+
+    def on_start(task):
+        with lock:
+            starts[task.name] = time.perf_counter()
+
+    def on_complete(task, output):
+        with lock:
+            latencies[task.name] = round(time.perf_counter() - starts[task.name], 3)
+
+    searches_before, website_before, llm_before = search.calls, website.calls, llm.calls
+    tracemalloc.start()
+    started = time.perf_counter()
+    run_task_graph(crew, on_task_complete=on_complete, on_task_start=on_start)
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_s": round(wall, 3),
+        "task_latency_s": latencies,
+        "search_calls": search.calls - searches_before,
+        "website_calls": website.calls - website_before,
+        "llm_calls": llm.calls - llm_before,
+        "peak_memory_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def run_scenario(name: str, repeat: int) -> Dict[str, Any]:
+    search, website, llm = install_fakes(SCENARIOS[name])
+    runs = []
+    for _ in range(repeat):
+        runs.append({"tools": bench_tools(search), "crew": bench_crew(search, website, llm)})
+    return {
+        "scenario": name,
+        "runs": runs,
+        "median_crew_wall_s": round(statistics.median(r["crew"]["wall_s"] for r in runs), 3),
+        "median_tools_wall_s": round(
+            statistics.median(sum(t["wall_s"] for t in r["tools"].values()) for r in runs), 3
+        ),
+    }
+
+
+def print_report(result: Dict[str, Any]):
+    last = result["runs"][-1]
+    print(f"\nScenario: {result['scenario']}  ({len(result['runs'])} run(s))")
+    print("-" * 80)
+    print(f"{'Tool':<32}{'wall (s)':>12}{'searches':>12}")
+    for name, stats in last["tools"].items():
+        print(f"{name:<32}{stats['wall_s']:>12.3f}{stats['search_calls']:>12}")
+    crew = last["crew"]
+    print(f"\n{'Task':<32}{'latency (s)':>12}")
+    for name, latency in crew["task_latency_s"].items():
+        print(f"{name:<32}{latency:>12.3f}")
+    print(f"\nCrew wall time: {crew['wall_s']:.3f}s (median {result['median_crew_wall_s']:.3f}s)")
+    print(f"LLM calls: {crew['llm_calls']}  search calls: {crew['search_calls']}  "
+          f"website calls: {crew['website_calls']}  peak memory: {crew['peak_memory_mb']} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline Cabo crew benchmark")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", help="Also write the full results to this file")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for scenario in args.scenario or list(SCENARIOS):
+        result = run_scenario(scenario, args.repeat)
+        print_report(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
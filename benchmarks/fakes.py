@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Deterministic local stand-ins for the search tools and LLM
+Lets the Cabo crew and its tools run offline with configurable latency and
+payload sizes, so benchmarks never spend Serper or OpenAI quota
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Type, Union, get_args, get_origin
+from crewai.llms.base_llm import BaseLLM
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+WORDS = (
+    "cabo los cabos resort luxury wellness spa fishing charter occupancy pricing "
+    "booking bilingual concierge review guest experience season marina villa "
+    "tour operator demand revenue adoption staff technology whale sunset"
+).split()
+
+
+class LatencyProfile(BaseModel):
+    """Log-normal latency and payload size distribution for a fake backend"""
+    mean_ms: float = Field(default=300, description="Median latency in milliseconds")
+    sigma: float = Field(default=0.35, description="Log-normal spread of latency")
+    mean_chars: int = Field(default=2000, description="Median response size in characters")
+    size_sigma: float = Field(default=0.25, description="Log-normal spread of response size")
+
+    def sample(self, rng: random.Random):
+        latency = rng.lognormvariate(0, self.sigma) * self.mean_ms / 1000
+        size = max(1, int(rng.lognormvariate(0, self.size_sigma) * self.mean_chars))
+        return latency, size
+
+
+def _filler(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def _sample_value(annotation: Any, rng: random.Random, size: int) -> Any:
+    if get_origin(annotation) in (list, List):
+        item = (get_args(annotation) or (str,))[0]
+        return [_sample_value(item, rng, size // 3) for _ in range(3)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return sample_model(annotation, rng, size)
+    if annotation is int:
+        return rng.randint(1, 10)
+    if annotation is float:
+        return round(rng.uniform(0, 1), 2)
+    if annotation is bool:
+        return rng.random() < 0.5
+    return _filler(rng, max(8, size))
+
+
+def sample_model(model: Type[BaseModel], rng: random.Random, size: int) -> Dict[str, Any]:
+    """Synthetic instance of a pydantic model, roughly size characters of text in total"""
+    fields = model.model_fields
+    share = size // max(1, len(fields))
+    return {name: _sample_value(field.annotation, rng, share) for name, field in fields.items()}
+
+
+def _seeded_rng(seed: int, text: str) -> random.Random:
+    # Same seed and input always produce the same latency and payload
+    return random.Random(f"{seed}:{text}")
+
+
+class FakeSearchTool(BaseTool):
+    """Stand-in for SerperDevTool/WebsiteSearchTool returning synthetic results"""
+    name: str = "Search the internet"
+    description: str = "Searches the internet for the given query and returns relevant results."
+    profile: LatencyProfile = Field(default_factory=LatencyProfile)
+    seed: int = 7
+
+    _calls: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def _run(self, *args: Any, **kwargs: Any) -> str:
+        query = str(args[0] if args else next(iter(kwargs.values()), ""))
+        with self._lock:
+            self._calls += 1
+        rng = _seeded_rng(self.seed, query)
+        latency, size = self.profile.sample(rng)
+        time.sleep(latency)
+        return json.dumps({
+            "searchParameters": {"q": query},
+            "organic": [{"title": query.title(), "snippet": _filler(rng, size)}],
+        })
+
+
+class FakeLLM(BaseLLM):
+    """
+    Stand-in LLM that drives agents through a fixed number of tool calls.
+
+    It answers in the ReAct format crewai agents parse: the first
+    tool_calls_per_task turns pick a tool advertised in the prompt, after
+    which it returns a final answer of the configured size. When the prompt
+    asks for the format of one of response_models (a task's output_pydantic),
+    the final answer is valid JSON for that model, so crewai never falls back
+    to its converter retries.
+    """
+
+    def __init__(
+        self,
+        profile: Optional[LatencyProfile] = None,
+        tool_calls_per_task: int = 1,
+        seed: int = 7,
+        response_models: Sequence[Type[BaseModel]] = (),
+    ):
+        super().__init__(model="fake-llm", temperature=0)
+        self.profile = profile or LatencyProfile(mean_ms=800, mean_chars=3000)
+        self.tool_calls_per_task = tool_calls_per_task
+        self.seed = seed
+        self.response_models = list(response_models)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> str:
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+
+        with self._lock:
+            self.calls += 1
+        rng = _seeded_rng(self.seed, prompt[-2000:])
+        latency, size = self.profile.sample(rng)
+        time.sleep(latency)
+
+        observations = prompt.count("Observation:")
+        tool = self._pick_tool(prompt, observations)
+        if tool is not None and observations < self.tool_calls_per_task:
+            name, args = tool
+            return (
+                f"Thought: I should gather more data.\n"
+                f"Action: {name}\n"
+                f"Action Input: {json.dumps({arg: 'Los Cabos boutique hotels' for arg in args})}"
+            )
+        model = self._response_model(prompt)
+        answer = json.dumps(sample_model(model, rng, size)) if model else _filler(rng, size)
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+    def _response_model(self, prompt: str) -> Optional[Type[BaseModel]]:
+        # crewai appends "...in the following format: <schema>" for output_pydantic tasks; look
+        # only there, since context from earlier tasks can contain other models' field names
+        formats = re.findall(r"following format:(.*?)(?:Ensure the final output|$)", prompt, re.DOTALL)
+        if not formats:
+            return None
+        schema = formats[-1]
+        matches = [m for m in self.response_models
+                   if all(f'"{name}"' in schema for name in m.model_fields)]
+        return max(matches, key=lambda m: len(m.model_fields), default=None)
+
+    @staticmethod
+    def _pick_tool(prompt: str, turn: int):
+        tools = re.findall(r"Tool Name: (.+?)\nTool Arguments: (\{.*?\})\n", prompt)
+        if not tools:
+            return None
+        name, raw_args = tools[turn % len(tools)]
+        return name.strip(), re.findall(r"'(\w+)': \{", raw_args) or ["query"]
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 128000
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the Cabo research crew module
+Measures how long `import cabo_market_research_crew_improved` takes in a fresh
+interpreter, for the working tree and optionally for an earlier git revision
+
+Usage:
+    python3 benchmarks/import_time.py                  # current tree only
+    python3 benchmarks/import_time.py --baseline HEAD~1 # compare with a revision
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = "cabo_market_research_crew_improved"
+
+# Time only the import itself, not interpreter startup
+TIMER = (
+    "import time; t = time.perf_counter(); "
+    f"import {MODULE}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def time_import(module_dir: str, runs: int) -> List[float]:
+    """Import the module in `runs` fresh interpreters and return the timings"""
+    env = dict(os.environ)
+    # Run from module_dir (first on sys.path) so a baseline copy shadows the working tree version
+    env["PYTHONPATH"] = os.pathsep.join([REPO_ROOT, env.get("PYTHONPATH", "")])
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMER],
+            cwd=module_dir, env=env, capture_output=True, text=True, check=True
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def export_revision(revision: str) -> str:
+    """Write the module as it was at `revision` into a temp directory"""
+    source = subprocess.run(
+        ["git", "show", f"{revision}:{MODULE}.py"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    directory = tempfile.mkdtemp(prefix="cabo_import_bench_")
+    with open(os.path.join(directory, f"{MODULE}.py"), "w", encoding="utf-8") as f:
+        f.write(source)
+    return directory
+
+
+def report(label: str, timings: List[float]) -> float:
+    median = statistics.median(timings)
+    print(f"{label:<12} median {median * 1000:8.1f} ms   "
+          f"min {min(timings) * 1000:8.1f} ms   max {max(timings) * 1000:8.1f} ms")
+    return median
+
+
+def main(runs: int, baseline: Optional[str]):
+    print(f"Import time for {MODULE} ({runs} fresh interpreters each)")
+    print("-" * 80)
+    current = report("current", time_import(REPO_ROOT, runs))
+    if baseline:
+        before = report(baseline, time_import(export_revision(baseline), runs))
+        print("-" * 80)
+        print(f"Speedup: {before / current:.1f}x ({(before - current) * 1000:.0f} ms saved per import)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", help="git revision to compare against, e.g. HEAD~1")
+    args = parser.parse_args()
+    main(args.runs, args.baseline)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Batch kickoff driver for CrewAI research crews
+Runs a crew over every row of a CSV/JSONL input file on a bounded worker pool,
+streaming each result to a JSONL output file as soon as it finishes
+"""
+
+import argparse
+import csv
+import importlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+from dotenv import load_dotenv
+from cabo_result_writer import AppendFile, RESULT_COMPRESSION, with_suffix
+
+load_dotenv()
+
+DEFAULT_CREW = "crewai_example:research_crew"
+
+# Set per worker (thread pool shares one template, process pool loads one per process)
+_template_crew = None
+
+
+def load_inputs(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield one input dict per CSV row or JSONL line"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield {k.strip(): (v or "").strip() for k, v in row.items() if k}
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def _load_crew(spec: str):
+    module_name, attr = spec.split(":", 1)
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _init_worker(spec: str):
+    global _template_crew
+    _template_crew = _load_crew(spec)
+
+
+def run_one(index: int, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Kick off a private copy of the template crew for one set of inputs"""
+    started = time.perf_counter()
+    record = {"index": index, "inputs": inputs, "started_at": datetime.now().isoformat()}
+    try:
+        crew = _template_crew.copy()
+        record["result"] = str(crew.kickoff(inputs=inputs))
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["duration_s"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+class ResultStream:
+    """Append-only JSONL writer shared by all workers (fsync per record, optional compression)"""
+
+    def __init__(self, path: str):
+        self._file = AppendFile(path)
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line.encode("utf-8"))
+            self._file.sync()
+
+    def close(self):
+        self._file.close()
+
+
+def run_batch(
+    rows: List[Dict[str, Any]],
+    output_path: str,
+    crew_spec: str = DEFAULT_CREW,
+    workers: int = 4,
+    use_processes: bool = False,
+    report_every: int = 10,
+) -> Dict[str, Any]:
+    """
+    Run the crew once per input row and stream results to output_path.
+
+    Threads (the default) share one process, so the persistent search cache
+    and any in-memory client state are shared by every run. Processes give
+    CPU isolation and still share the on-disk caches.
+    """
+    global _template_crew
+    stream = ResultStream(output_path)
+    started = time.perf_counter()
+    done = failed = 0
+
+    if use_processes:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(crew_spec,)
+        )
+    else:
+        _template_crew = _load_crew(crew_spec)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cabo-batch")
+
+    try:
+        with executor:
+            futures = [executor.submit(run_one, i, row) for i, row in enumerate(rows)]
+            for future in as_completed(futures):
+                record = future.result()
+                stream.write(record)
+                done += 1
+                failed += record["status"] != "ok"
+                if done % report_every == 0 or done == len(rows):
+                    elapsed = time.perf_counter() - started
+                    print(f"[{done}/{len(rows)}] {done / elapsed * 60:.1f} runs/minute, "
+                          f"{failed} failed")
+    finally:
+        stream.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "runs": done,
+        "failed": failed,
+        "elapsed_s": round(elapsed, 1),
+        "runs_per_minute": round(done / elapsed * 60, 2) if elapsed else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a research crew over many inputs")
+    parser.add_argument("inputs", help="CSV with a header row, or JSONL with one object per line")
+    parser.add_argument("-o", "--output", help="JSONL file results are appended to")
+    parser.add_argument("--crew", default=DEFAULT_CREW, help="module:attribute of the crew to run")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BATCH_WORKERS", "4")))
+    parser.add_argument("--processes", action="store_true",
+                        help="Use a process pool instead of threads")
+    parser.add_argument("--limit", type=int, help="Only run the first N inputs")
+    args = parser.parse_args()
+
+    rows = list(load_inputs(args.inputs))[:args.limit]
+    output = with_suffix(
+        args.output or f"batch_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+        RESULT_COMPRESSION
+    )
+
+    print(f"Running {len(rows)} crews with {args.workers} "
+          f"{'processes' if args.processes else 'threads'} -> {output}")
+    print("-" * 80)
+    summary = run_batch(rows, output, args.crew, args.workers, args.processes)
+    print("=" * 80)
+    print(f"Completed {summary['runs']} runs ({summary['failed']} failed) in "
+          f"{summary['elapsed_s']}s - {summary['runs_per_minute']} runs/minute")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Persistent key/value cache for the Cabo research crew
+SQLite-backed store with per-entry TTL, size-bounded LRU eviction and hit/miss counters
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+def content_key(*parts: Any) -> str:
+    """Build a content-addressed key from JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PersistentCache:
+    """
+    SQLite-backed cache shared across processes and runs.
+
+    Values are stored as JSON. Entries expire after their TTL and the least
+    recently used entries are evicted once the store grows past max_bytes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        default_ttl: Optional[float] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        bypass: bool = False,
+    ):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None on a miss, expiry or bypass"""
+        if self.bypass:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value (ttl of 0 never expires).
+
+        Bypass mode still writes, so fresh results refresh the cache.
+        """
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        """Store several values in one transaction"""
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        rows = []
+        for key, value in items.items():
+            payload = json.dumps(value, ensure_ascii=False, default=str)
+            rows.append((key, payload, len(payload.encode("utf-8")), now, expires_at, now))
+
+        with self._lock:
+            self._conn.executemany(
+                """INSERT OR REPLACE INTO entries
+                   (key, value, size, created_at, expires_at, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def _evict_locked(self, now: float):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        self._conn.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus current store size"""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
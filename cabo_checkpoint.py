@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Checkpoint store for long Cabo research crew runs
+Persists each task's output, tool transcript and token usage as soon as it completes
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from crewai import Crew, Task
+from crewai.tasks.task_output import TaskOutput
+from dotenv import load_dotenv
+from cabo_models import validate_report
+
+load_dotenv()
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", ".cabo_checkpoints")
+
+
+def task_key(task: Task, index: int) -> str:
+    """Stable identifier for a task inside a run"""
+    return task.name or f"task_{index}"
+
+
+def _token_summary(agent: Any) -> Dict[str, int]:
+    token_process = getattr(agent, "_token_process", None)
+    if token_process is None:
+        return {}
+    summary = token_process.get_summary()
+    return summary.model_dump() if hasattr(summary, "model_dump") else dict(summary)
+
+
+def _describe_step(step: Any) -> Dict[str, Any]:
+    """Reduce an agent step (tool action or final answer) to JSON-safe fields"""
+    record = {"type": type(step).__name__, "at": datetime.now().isoformat()}
+    for field in ("thought", "tool", "tool_input", "result", "output"):
+        value = getattr(step, field, None)
+        if value is not None:
+            record[field] = str(value)
+    return record
+
+
+class CheckpointStore:
+    """
+    Directory of per-task checkpoint files for one run.
+
+    Layout: <CHECKPOINT_DIR>/<run_id>/manifest.json plus one <task>.json per
+    completed task. Files are written atomically so a crash mid-write never
+    leaves a truncated checkpoint behind.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, root: str = CHECKPOINT_DIR):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(root, self.run_id)
+        self._crew: Optional[Crew] = None
+        self._transcripts: Dict[int, List[Dict[str, Any]]] = {}
+        self._token_baseline: Dict[int, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    @classmethod
+    def resume(cls, run_id: str, root: str = CHECKPOINT_DIR) -> "CheckpointStore":
+        if not os.path.isdir(os.path.join(root, run_id)):
+            raise FileNotFoundError(f"No checkpoint found for run {run_id} in {root}")
+        return cls(run_id=run_id, root=root)
+
+    def _write_json(self, filename: str, data: Dict[str, Any]):
+        target = os.path.join(self.path, filename)
+        tmp = target + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+
+    def completed_tasks(self) -> Dict[str, Dict[str, Any]]:
+        """Checkpoint records keyed by task key"""
+        records = {}
+        for filename in os.listdir(self.path):
+            if filename.endswith(".json") and filename != "manifest.json":
+                with open(os.path.join(self.path, filename), encoding="utf-8") as f:
+                    record = json.load(f)
+                records[record["task"]] = record
+        return records
+
+    def attach(self, crew: Crew):
+        """Record tool transcripts and token baselines for every agent in the crew"""
+        self._crew = crew
+        self._write_json("manifest.json", {
+            "run_id": self.run_id,
+            "updated_at": datetime.now().isoformat(),
+            "tasks": [task_key(task, i) for i, task in enumerate(crew.tasks)],
+        })
+
+        for agent in crew.agents:
+            self._token_baseline[id(agent)] = _token_summary(agent)
+            previous = agent.step_callback
+
+            def record_step(step, agent=agent, previous=previous):
+                with self._lock:
+                    self._transcripts.setdefault(id(agent), []).append(_describe_step(step))
+                if previous:
+                    previous(step)
+
+            agent.step_callback = record_step
+
+    def restore_outputs(self, crew: Crew) -> Dict[int, TaskOutput]:
+        """Rebuild TaskOutputs for finished tasks so they can be skipped and reused as context"""
+        records = self.completed_tasks()
+        restored = {}
+        for i, task in enumerate(crew.tasks):
+            record = records.get(task_key(task, i))
+            if record is None:
+                continue
+            output = TaskOutput(
+                name=task.name,
+                description=task.description,
+                expected_output=task.expected_output,
+                raw=record["output"],
+                agent=record["agent"],
+            )
+            if record.get("structured") and task.output_pydantic:
+                output.pydantic = validate_report(task.output_pydantic, record["structured"])
+            task.output = output
+            restored[i] = output
+        return restored
+
+    def on_task_complete(self, task: Task, output: TaskOutput):
+        """Scheduler callback: persist the finished task immediately"""
+        tasks = self._crew.tasks if self._crew else [task]
+        index = next(i for i, t in enumerate(tasks) if t is task)
+        agent = task.agent
+
+        with self._lock:
+            transcript = self._transcripts.pop(id(agent), [])
+            current = _token_summary(agent)
+            baseline = self._token_baseline.get(id(agent), {})
+            self._token_baseline[id(agent)] = current
+
+        token_usage = {
+            k: v - baseline.get(k, 0) for k, v in current.items() if isinstance(v, (int, float))
+        }
+        key = task_key(task, index)
+        self._write_json(f"{key}.json", {
+            "task": key,
+            "agent": agent.role if agent else "",
+            "completed_at": datetime.now().isoformat(),
+            "output": output.raw,
+            "structured": output.pydantic.model_dump(mode="json") if output.pydantic else None,
+            "tool_transcript": transcript,
+            "token_usage": token_usage,
+        })
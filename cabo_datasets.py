@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+"""
+Local tourism dataset cache for the Cabo research crew
+CSV exports (hotel rosters, occupancy exports, review dumps) are ingested once into
+typed NumPy columns with sort/offset indexes and a row-aligned embedding matrix,
+then filtered and searched by agents without re-reading or re-embedding the file
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+from array import array
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+import numpy as np
+from crewai.tools import BaseTool
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+
+load_dotenv()
+
+DATASET_DIR = os.getenv("DATASET_DIR", "data/datasets")
+DATASET_TEXT_MIN_CHARS = int(os.getenv("DATASET_TEXT_MIN_CHARS", "40"))  # Mean length that marks a text column
+DATASET_MAX_ROWS = int(os.getenv("DATASET_MAX_ROWS", "20"))  # Rows returned per tool call
+
+MISSING = {"", "na", "n/a", "null", "none", "nan", "-"}
+CELL_CHARS = 300            # Per-cell truncation in tool output
+EMBED_TEXT_CHARS = 2000     # Per-row text sent to the embedder
+EMBED_CHUNK_ROWS = 1024     # Rows embedded and appended per batch
+SEARCH_BLOCK_ROWS = 65536   # Embedding rows scored per block during search
+
+THOUSANDS = re.compile(r"^-?\d{1,3}(,\d{3})+(\.\d+)?$")
+
+
+def dataset_name(path: str) -> str:
+    base = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r"[^a-z0-9_]+", "_", base.lower()).strip("_") or "dataset"
+
+
+def _is_missing(value: str) -> bool:
+    return value.strip().lower() in MISSING
+
+
+def _to_number(value: str) -> float:
+    value = value.strip().lstrip("$").rstrip("%")
+    if THOUSANDS.match(value):
+        value = value.replace(",", "")
+    return float(value)
+
+
+def _infer(values: List[str]) -> Tuple[str, Optional[np.ndarray]]:
+    """
+    Column type from its distinct values, plus the typed value of each distinct value.
+
+    Inference only looks at the dictionary, so it costs O(distinct values)
+    however many rows the column has.
+    """
+    present = [v for v in values if not _is_missing(v)]
+    if not present:
+        return "string", None
+    try:
+        return "number", np.array([np.nan if _is_missing(v) else _to_number(v) for v in values])
+    except ValueError:
+        pass
+    try:
+        for v in present:
+            date.fromisoformat(v.strip()[:10])
+        return "date", np.array([np.datetime64("NaT") if _is_missing(v) else np.datetime64(v.strip()[:10], "D")
+                                 for v in values], dtype="datetime64[D]")
+    except ValueError:
+        return "string", None
+
+
+def _coerce(value: Any, kind: str) -> Any:
+    if kind == "date":
+        return np.datetime64(str(value)[:10], "D")
+    if kind == "number":
+        return value if isinstance(value, (int, float)) else _to_number(str(value))
+    return str(value)
+
+
+class Dataset:
+    """
+    One ingested CSV: per-column .npy files read through memory maps.
+
+    Numbers and dates are stored typed with a sorted copy and its permutation,
+    so range filters are a binary search. Strings are dictionary-encoded with a
+    sorted dictionary, and rows are grouped by code so an equality, range or
+    substring filter touches only the matching rows.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.name = self.meta["name"]
+        self.n_rows = self.meta["n_rows"]
+        self.columns: List[Dict[str, Any]] = self.meta["columns"]
+        self._by_name = {c["name"].lower(): i for i, c in enumerate(self.columns)}
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._dictionaries: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def _column(self, name: str) -> int:
+        try:
+            return self._by_name[name.lower()]
+        except KeyError:
+            raise KeyError(f"Dataset {self.name!r} has no column {name!r}; "
+                           f"columns: {', '.join(c['name'] for c in self.columns)}") from None
+
+    def _array(self, filename: str) -> np.ndarray:
+        with self._lock:
+            if filename not in self._arrays:
+                self._arrays[filename] = np.load(os.path.join(self.directory, filename), mmap_mode="r")
+            return self._arrays[filename]
+
+    def dictionary(self, i: int) -> List[str]:
+        with self._lock:
+            if i not in self._dictionaries:
+                with open(os.path.join(self.directory, f"col{i}.values.json"), encoding="utf-8") as f:
+                    self._dictionaries[i] = json.load(f)
+            return self._dictionaries[i]
+
+    def _code_rows(self, i: int, codes: Sequence[int]) -> np.ndarray:
+        order, offsets = self._array(f"col{i}.sort.npy"), self._array(f"col{i}.offsets.npy")
+        parts = [order[offsets[c]:offsets[c + 1]] for c in codes]
+        return np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+
+    def _string_rows(self, i: int, condition: Any) -> np.ndarray:
+        values = self.dictionary(i)
+        if isinstance(condition, dict):
+            unknown = set(condition) - {"contains", "min", "max"}
+            if unknown:
+                raise ValueError(f"Unsupported filter on {self.columns[i]['name']!r}: {', '.join(unknown)}")
+            if "contains" in condition:
+                needle = str(condition["contains"]).lower()
+                return self._code_rows(i, [c for c, v in enumerate(values) if needle in v.lower()])
+            # Codes follow the sorted dictionary, so a lexicographic range is a code range
+            lo = bisect.bisect_left(values, str(condition["min"])) if "min" in condition else 0
+            hi = bisect.bisect_right(values, str(condition["max"])) if "max" in condition else len(values)
+            offsets = self._array(f"col{i}.offsets.npy")
+            return np.sort(self._array(f"col{i}.sort.npy")[offsets[lo]:offsets[hi]])
+        wanted = {str(v).lower() for v in (condition if isinstance(condition, list) else [condition])}
+        return self._code_rows(i, [c for c, v in enumerate(values) if v.lower() in wanted])
+
+    def _typed_rows(self, i: int, condition: Any) -> np.ndarray:
+        kind = self.columns[i]["type"]
+        ordered, order = self._array(f"col{i}.sorted.npy"), self._array(f"col{i}.sort.npy")
+        if isinstance(condition, list):
+            parts = [self._typed_rows(i, value) for value in condition]
+            return np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+        if not isinstance(condition, dict):
+            condition = {"min": condition, "max": condition}
+        unknown = set(condition) - {"min", "max"}
+        if unknown:
+            raise ValueError(f"Unsupported filter on {self.columns[i]['name']!r}: {', '.join(unknown)}")
+        # Missing values (NaN/NaT) sort last and are excluded from every range
+        end = self.columns[i]["present"]
+        lo = int(np.searchsorted(ordered[:end], _coerce(condition["min"], kind), "left")) \
+            if "min" in condition else 0
+        hi = int(np.searchsorted(ordered[:end], _coerce(condition["max"], kind), "right")) \
+            if "max" in condition else end
+        return np.sort(order[lo:max(lo, hi)])
+
+    def filter(self, where: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Sorted row ids matching every condition.
+
+        A condition is a value (equality, case-insensitive for strings), a list
+        of values, {"min": x, "max": y} (either bound optional) or, for string
+        columns, {"contains": "text"}.
+        """
+        if not where:
+            return np.arange(self.n_rows)
+        matches = []
+        for name, condition in where.items():
+            i = self._column(name)
+            rows = self._string_rows(i, condition) if self.columns[i]["type"] == "string" \
+                else self._typed_rows(i, condition)
+            matches.append(rows)
+        matches.sort(key=len)
+        rows = matches[0]
+        for other in matches[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def _values(self, i: int, rows: np.ndarray) -> List[Any]:
+        column = self.columns[i]
+        data = self._array(f"col{i}.npy")[rows]
+        if column["type"] == "string":
+            values = self.dictionary(i)
+            return [None if _is_missing(values[c]) else values[c][:CELL_CHARS] for c in data]
+        if column["type"] == "date":
+            return [None if np.isnat(v) else str(v) for v in data]
+        if column.get("integer"):
+            return [None if np.isnan(v) else int(v) for v in data]
+        return [None if np.isnan(v) else float(v) for v in data]
+
+    def rows(self, row_ids: np.ndarray, columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        indexes = [self._column(c) for c in columns] if columns else range(len(self.columns))
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        values = {self.columns[i]["name"]: self._values(i, row_ids) for i in indexes}
+        return [{name: column[r] for name, column in values.items()} for r in range(len(row_ids))]
+
+    def group(self, row_ids: np.ndarray, by: str, mean_of: Optional[str] = None,
+              limit: int = DATASET_MAX_ROWS) -> List[Dict[str, Any]]:
+        """Row count (and optional mean of a number column) per value of `by`, largest groups first"""
+        i = self._column(by)
+        keys = self._array(f"col{i}.npy")[row_ids]
+        uniques, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        means = None
+        if mean_of is not None:
+            j = self._column(mean_of)
+            if self.columns[j]["type"] != "number":
+                raise ValueError(f"mean_of needs a number column, {mean_of!r} is {self.columns[j]['type']}")
+            values = np.asarray(self._array(f"col{j}.npy")[row_ids], dtype=np.float64)
+            valid = ~np.isnan(values)
+            sums = np.bincount(inverse[valid], weights=values[valid], minlength=len(uniques))
+            present = np.bincount(inverse[valid], minlength=len(uniques))
+            means = np.divide(sums, present, out=np.full(len(uniques), np.nan), where=present > 0)
+        top = np.argsort(-counts, kind="stable")[:limit]
+        kind = self.columns[i]["type"]
+        if kind == "string":
+            values = self.dictionary(i)
+            labels = [None if _is_missing(values[uniques[g]]) else values[uniques[g]] for g in top]
+        elif kind == "date":
+            labels = [None if np.isnat(uniques[g]) else str(uniques[g]) for g in top]
+        else:
+            labels = [None if np.isnan(uniques[g]) else float(uniques[g]) for g in top]
+        result = []
+        for label, g in zip(labels, top):
+            entry: Dict[str, Any] = {by: label, "count": int(counts[g])}
+            if means is not None:
+                entry[f"mean_{mean_of}"] = None if np.isnan(means[g]) else round(float(means[g]), 4)
+            result.append(entry)
+        return result
+
+    def search(self, query: str, k: int = DATASET_MAX_ROWS,
+               row_ids: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """Top-k (row id, cosine score) against the precomputed row embeddings"""
+        embedding = self.meta.get("embedding")
+        if not embedding:
+            raise ValueError(f"Dataset {self.name!r} has no embedding index; re-ingest with text columns to embed")
+        from cabo_embeddings import get_embedder
+        embedder = get_embedder()
+        if embedder.model_id != embedding["model_id"]:
+            raise ValueError(f"Dataset {self.name!r} was embedded with {embedding['model_id']}, "
+                             f"current embedder is {embedder.model_id}; re-ingest it")
+        q = embedder.embed([query])[0]
+        matrix = np.memmap(os.path.join(self.directory, "embeddings.f32"), dtype=np.float32, mode="r",
+                           shape=(self.n_rows, embedding["dim"]))
+        candidates = np.arange(self.n_rows) if row_ids is None else np.asarray(row_ids, dtype=np.int64)
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        # Score in blocks so memory stays bounded on multi-GB embedding files
+        for start in range(0, len(candidates), SEARCH_BLOCK_ROWS):
+            block = candidates[start:start + SEARCH_BLOCK_ROWS]
+            rows = np.concatenate([best_rows, block])
+            scores = np.concatenate([best_scores, matrix[block] @ q])
+            keep = np.argpartition(-scores, min(k, len(scores)) - 1)[:k] if len(scores) > k \
+                else np.arange(len(scores))
+            best_rows, best_scores = rows[keep], scores[keep]
+        order = np.argsort(-best_scores)
+        return [(int(best_rows[i]), float(best_scores[i])) for i in order]
+
+    def describe(self) -> Dict[str, Any]:
+        columns = []
+        for i, column in enumerate(self.columns):
+            entry = {"name": column["name"], "type": column["type"], "missing": self.n_rows - column["present"]}
+            if column["type"] == "string":
+                entry["distinct"] = column["distinct"]
+            elif column["present"]:
+                ordered = self._array(f"col{i}.sorted.npy")
+                entry["min"], entry["max"] = (str(ordered[0]), str(ordered[column["present"] - 1])) \
+                    if column["type"] == "date" else (float(ordered[0]), float(ordered[column["present"] - 1]))
+            columns.append(entry)
+        return {"name": self.name, "rows": self.n_rows, "source": self.meta["source"],
+                "embedded_columns": (self.meta.get("embedding") or {}).get("columns", []),
+                "columns": columns}
+
+
+def _write_column(directory: str, i: int, codes: np.ndarray, values: List[str]) -> Dict[str, Any]:
+    """Store one column typed, with its indexes; returns its metadata"""
+    kind, typed = _infer(values)
+    if kind == "string":
+        # Re-code against the sorted dictionary so code order is lexicographic
+        order = sorted(range(len(values)), key=values.__getitem__)
+        remap = np.empty(len(values), dtype=np.int32)
+        remap[order] = np.arange(len(values), dtype=np.int32)
+        codes = remap[codes] if len(values) else codes
+        sorted_values = [values[c] for c in order]
+        np.save(os.path.join(directory, f"col{i}.npy"), codes)
+        np.save(os.path.join(directory, f"col{i}.sort.npy"), np.argsort(codes, kind="stable"))
+        counts = np.bincount(codes, minlength=len(values))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        np.save(os.path.join(directory, f"col{i}.offsets.npy"), offsets)
+        with open(os.path.join(directory, f"col{i}.values.json"), "w", encoding="utf-8") as f:
+            json.dump(sorted_values, f, ensure_ascii=False)
+        lengths = np.array([0 if _is_missing(v) else len(v) for v in sorted_values], dtype=np.int64)
+        present = int(counts[lengths > 0].sum())
+        mean_chars = float(counts @ lengths) / max(len(codes), 1)
+        return {"type": kind, "present": present, "distinct": len(values), "mean_chars": round(mean_chars, 1)}
+
+    column = typed[codes]
+    order = np.argsort(column, kind="stable")  # NaN / NaT sort last
+    present = int(np.count_nonzero(~(np.isnat(column) if kind == "date" else np.isnan(column))))
+    np.save(os.path.join(directory, f"col{i}.npy"), column)
+    np.save(os.path.join(directory, f"col{i}.sort.npy"), order)
+    np.save(os.path.join(directory, f"col{i}.sorted.npy"), column[order])
+    meta: Dict[str, Any] = {"type": kind, "present": present}
+    if kind == "number":
+        valid = column[~np.isnan(column)]
+        meta["integer"] = bool(len(valid)) and bool(np.all(valid == np.round(valid)))
+    return meta
+
+
+def _embed_rows(directory: str, dataset: "Dataset", columns: List[int]) -> Optional[Dict[str, Any]]:
+    """Write one vector per row (zeros for rows without text); None if no row has any text"""
+    from cabo_embeddings import get_embedder
+    embedder = get_embedder()
+    path = os.path.join(directory, "embeddings.f32")
+    dim = None
+    leading_empty = 0  # Rows seen before the first text, written once the dimension is known
+    with open(path, "wb") as f:
+        for start in range(0, dataset.n_rows, EMBED_CHUNK_ROWS):
+            rows = np.arange(start, min(start + EMBED_CHUNK_ROWS, dataset.n_rows))
+            parts = [dataset._values(i, rows) for i in columns]
+            texts = [" | ".join(str(p) for p in row if p is not None and p != "")[:EMBED_TEXT_CHARS]
+                     for row in zip(*parts)]
+            filled = [j for j, text in enumerate(texts) if text]
+            if not filled and dim is None:
+                leading_empty += len(rows)
+                continue
+            # Row vectors live in the dataset's own memmap; keep them out of the shared embedding cache
+            vectors = embedder.embed([texts[j] for j in filled], use_cache=False) if filled else None
+            if dim is None:
+                dim = vectors.shape[1]
+                f.write(np.zeros((leading_empty, dim), dtype=np.float32).tobytes())
+            block = np.zeros((len(rows), dim), dtype=np.float32)
+            if vectors is not None:
+                block[filled] = vectors
+            f.write(block.tobytes())
+    if dim is None:
+        os.remove(path)
+        return None
+    return {"model_id": embedder.model_id, "dim": dim,
+            "columns": [dataset.columns[i]["name"] for i in columns]}
+
+
+class DatasetStore:
+    """Directory of ingested datasets, one subdirectory each, swapped in atomically on re-ingest"""
+
+    def __init__(self, root: str = DATASET_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._datasets: Dict[str, Tuple[float, Dataset]] = {}
+        self._lock = threading.Lock()
+
+    def names(self) -> List[str]:
+        return sorted(d for d in os.listdir(self.root)
+                      if os.path.exists(os.path.join(self.root, d, "meta.json")))
+
+    def get(self, name: str) -> Dataset:
+        meta_path = os.path.join(self.root, name, "meta.json")
+        if not os.path.exists(meta_path):
+            raise KeyError(f"No dataset {name!r}; available: {', '.join(self.names()) or 'none'}")
+        version = os.path.getmtime(meta_path)
+        with self._lock:
+            cached = self._datasets.get(name)
+            if cached is None or cached[0] != version:
+                cached = (version, Dataset(os.path.join(self.root, name)))
+                self._datasets[name] = cached
+            return cached[1]
+
+    def ingest_csv(self, path: str, name: Optional[str] = None,
+                   embed_columns: Optional[Sequence[str]] = None, force: bool = False) -> Dataset:
+        """
+        Load a CSV into the columnar cache in one streaming pass.
+
+        Unchanged files (same size and mtime) are skipped unless force is set.
+        embed_columns=None embeds the columns whose mean length reaches
+        DATASET_TEXT_MIN_CHARS; pass [] to skip the embedding index.
+        """
+        name = name or dataset_name(path)
+        stat = os.stat(path)
+        source = {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        if not force and name in self.names():
+            existing = self.get(name)
+            if existing.meta["source"] == source and (
+                    embed_columns is None or
+                    sorted(embed_columns) == sorted((existing.meta.get("embedding") or {}).get("columns", []))):
+                return existing
+
+        csv.field_size_limit(sys.maxsize)
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            header = [h.strip() or f"column_{i}" for i, h in enumerate(next(reader))]
+            dictionaries: List[Dict[str, int]] = [{} for _ in header]
+            codes = [array("i") for _ in header]
+            n_rows = 0
+            for row in reader:
+                if not row:
+                    continue
+                row = row + [""] * (len(header) - len(row))
+                for i, dictionary in enumerate(dictionaries):
+                    value = row[i]
+                    code = dictionary.get(value)
+                    if code is None:
+                        code = dictionary[value] = len(dictionary)
+                    codes[i].append(code)
+                n_rows += 1
+
+        if embed_columns is not None:
+            lookup = {c.lower(): i for i, c in enumerate(header)}
+            missing = [c for c in embed_columns if c.lower() not in lookup]
+            if missing:
+                raise KeyError(f"{path} has no column(s) {', '.join(missing)}; available: {', '.join(header)}")
+
+        final = os.path.join(self.root, name)
+        staging = f"{final}.tmp-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        try:
+            columns = []
+            for i, column in enumerate(header):
+                values = list(dictionaries[i])
+                meta = _write_column(staging, i, np.frombuffer(codes[i], dtype=np.int32), values)
+                columns.append({"name": column, **meta})
+                dictionaries[i], codes[i] = {}, array("i")  # Free each column once written
+            meta = {"name": name, "source": source, "n_rows": n_rows, "columns": columns}
+            with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+
+            if embed_columns is None:
+                to_embed = [i for i, c in enumerate(columns)
+                            if c["type"] == "string" and c.get("mean_chars", 0) >= DATASET_TEXT_MIN_CHARS]
+            else:
+                to_embed = [lookup[c.lower()] for c in embed_columns]
+            embedding = _embed_rows(staging, Dataset(staging), to_embed) if to_embed and n_rows else None
+            if embedding:
+                meta["embedding"] = embedding
+                with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+                    json.dump(meta, f, indent=2)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        retired = f"{final}.old-{os.getpid()}"
+        with self._lock:
+            if os.path.exists(final):
+                os.rename(final, retired)
+            os.rename(staging, final)
+            self._datasets.pop(name, None)
+        shutil.rmtree(retired, ignore_errors=True)
+        return self.get(name)
+
+
+_store: Optional[DatasetStore] = None
+_store_lock = threading.Lock()
+
+
+def get_dataset_store() -> DatasetStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DatasetStore(DATASET_DIR)
+        return _store
+
+
+class DatasetQuerySchema(BaseModel):
+    """Input for DatasetQueryTool"""
+    dataset: str = Field(..., description="Dataset name; an unknown name lists the available datasets")
+    where: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description='Filters per column: a value, a list of values, {"min": x, "max": y} '
+                    'or {"contains": "text"}; e.g. {"city": "Cabo San Lucas", "rating": {"max": 2}}'
+    )
+    query: Optional[str] = Field(default=None, description="Semantic search over the dataset's text columns")
+    columns: Optional[List[str]] = Field(default=None, description="Columns to return (default: all)")
+    group_by: Optional[str] = Field(default=None, description="Count matching rows per value of this column")
+    mean_of: Optional[str] = Field(default=None, description="With group_by, also average this number column")
+    limit: int = Field(default=DATASET_MAX_ROWS, description="Maximum rows or groups to return")
+
+
+class DatasetQueryTool(BaseTool):
+    """Filter, group and semantically search ingested CSV datasets (replaces CSVSearchTool)"""
+    name: str = "Query local tourism datasets"
+    description: str = (
+        "Look up rows in our own ingested tourism datasets (hotel rosters, occupancy exports, "
+        "review dumps). Filter by column values or ranges, count rows per group, or run a "
+        "semantic search over review text. Returns JSON with the total match count."
+    )
+    args_schema: Type[BaseModel] = DatasetQuerySchema
+
+    def _run(self, dataset: str, where: Optional[Dict[str, Any]] = None, query: Optional[str] = None,
+             columns: Optional[List[str]] = None, group_by: Optional[str] = None,
+             mean_of: Optional[str] = None, limit: int = DATASET_MAX_ROWS, **kwargs: Any) -> str:
+        store = get_dataset_store()
+        try:
+            data = store.get(dataset)
+        except KeyError:
+            return json.dumps({"error": f"Unknown dataset {dataset!r}",
+                               "datasets": [store.get(n).describe() for n in store.names()]})
+        limit = max(1, min(limit, DATASET_MAX_ROWS))
+        try:
+            rows = data.filter(where)
+            result: Dict[str, Any] = {"dataset": data.name, "matched": int(len(rows))}
+            if group_by:
+                result["groups"] = data.group(rows, group_by, mean_of, limit)
+            elif query:
+                hits = data.search(query, limit, rows if where else None)
+                ids = np.array([r for r, _ in hits], dtype=np.int64)
+                result["rows"] = [{"_score": round(score, 4), **row}
+                                  for (_, score), row in zip(hits, data.rows(ids, columns))]
+            else:
+                result["rows"] = data.rows(rows[:limit], columns)
+        except (KeyError, ValueError) as e:
+            return json.dumps({"error": e.args[0] if e.args else str(e), "schema": data.describe()})
+        return json.dumps(result, ensure_ascii=False, default=str)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest and query local tourism datasets")
+    parser.add_argument("--dir", default=DATASET_DIR, help="Dataset cache directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Load CSV files into the columnar cache")
+    ingest.add_argument("files", nargs="+")
+    ingest.add_argument("--name", help="Dataset name (single file only; default: file name)")
+    ingest.add_argument("--embed", nargs="*", help="Columns to embed (default: long text columns)")
+    ingest.add_argument("--force", action="store_true", help="Re-ingest unchanged files")
+    commands.add_parser("list", help="Describe every ingested dataset")
+    query = commands.add_parser("query", help="Run a DatasetQueryTool call")
+    query.add_argument("dataset")
+    query.add_argument("--where", type=json.loads)
+    query.add_argument("--query")
+    query.add_argument("--group-by")
+    query.add_argument("--mean-of")
+    query.add_argument("--limit", type=int, default=DATASET_MAX_ROWS)
+    args = parser.parse_args()
+
+    _store = DatasetStore(args.dir)
+    if args.command == "ingest":
+        for path in args.files:
+            data = _store.ingest_csv(path, args.name if len(args.files) == 1 else None, args.embed, args.force)
+            print(f"{path}: {data.name} ({data.n_rows} rows, {len(data.columns)} columns)")
+    elif args.command == "list":
+        for name in _store.names():
+            print(json.dumps(_store.get(name).describe(), ensure_ascii=False))
+    else:
+        print(DatasetQueryTool()._run(args.dataset, args.where, args.query, None,
+                                      args.group_by, args.mean_of, args.limit))
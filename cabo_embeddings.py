@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Embedding cache and local vector index for the Cabo research crew
+Website searches fetch and embed a page once per content version; later searches
+are answered from an on-disk NumPy memmap index without any embedding API calls
+"""
+
+import base64
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+import numpy as np
+from crewai.tools import BaseTool
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+from cabo_cache import PersistentCache, content_key
+from cabo_instrumentation import count_tokens, instrument, llm_cost
+from cabo_rate_limit import get_limiter
+
+load_dotenv()
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").lower()  # openai or local
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cabo_cache/embeddings.sqlite3")
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "512"))
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", ".cabo_cache/vectors")
+WEBSITE_CACHE_TTL = float(os.getenv("WEBSITE_CACHE_TTL", str(24 * 3600)))
+WEBSITE_SEARCH_TOP_K = int(os.getenv("WEBSITE_SEARCH_TOP_K", "5"))
+
+CHUNK_CHARS = 1000
+CHUNK_OVERLAP = 200
+
+_cache: Optional[PersistentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> PersistentCache:
+    """Process-wide cache for embeddings (no expiry) and fetched page text (WEBSITE_CACHE_TTL)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PersistentCache(
+                EMBEDDING_CACHE_PATH, default_ttl=0,
+                max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+            )
+        return _cache
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def _encode(vector: np.ndarray) -> str:
+    return base64.b64encode(vector.astype(np.float32).tobytes()).decode("ascii")
+
+
+def _decode(payload: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(payload), dtype=np.float32)
+
+
+class Embedder:
+    """
+    Batched text embedder with a content-addressed persistent cache.
+
+    Each text is keyed by (model, sha256 of the text), so an unchanged chunk is
+    never embedded twice, whichever page or run it comes from.
+    """
+
+    def __init__(self, backend: str = EMBEDDING_BACKEND, model: Optional[str] = None,
+                 cache: Optional[PersistentCache] = None):
+        if backend not in ("openai", "local"):
+            raise ValueError(f"Unknown embedding backend {backend!r} (expected 'openai' or 'local')")
+        self.backend = backend
+        self.model = model or (EMBEDDING_MODEL if backend == "openai" else LOCAL_EMBEDDING_MODEL)
+        self.model_id = f"{backend}:{self.model}"
+        self.cache = cache or get_embedding_cache()
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                if self.backend == "openai":
+                    from openai import OpenAI
+                    self._client = OpenAI()
+                else:
+                    from sentence_transformers import SentenceTransformer
+                    self._client = SentenceTransformer(self.model)
+            return self._client
+
+    def _embed_uncached(self, texts: List[str]) -> np.ndarray:
+        client = self._get_client()
+        if self.backend == "local":
+            return client.encode(texts, batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True)
+
+        vectors = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            batch = texts[start:start + EMBEDDING_BATCH_SIZE]
+            tokens = sum(count_tokens(t) for t in batch)
+            with instrument("embedding", self.model, input=f"{len(batch)} texts") as event:
+                response = get_limiter("llm").call(
+                    client.embeddings.create, model=self.model, input=batch, tokens=tokens
+                )
+                event["prompt_tokens"] = tokens
+                event["cost_usd"] = llm_cost(self.model, tokens, 0)
+            vectors.extend(item.embedding for item in response.data)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def embed(self, texts: Sequence[str], use_cache: bool = True) -> np.ndarray:
+        """
+        Unit-normalized float32 embeddings, one row per text.
+
+        use_cache=False skips the persistent cache (still embedding each distinct
+        text once), for callers that store the vectors themselves.
+        """
+        if not use_cache:
+            unique = list(dict.fromkeys(texts))
+            if not unique:
+                return np.zeros((0, 0), dtype=np.float32)
+            fresh = _normalize(self._embed_uncached(unique))
+            position = {text: i for i, text in enumerate(unique)}
+            return fresh[[position[t] for t in texts]]
+
+        keys = [content_key("embedding", self.model_id, text_hash(t)) for t in texts]
+        vectors: List[Optional[np.ndarray]] = []
+        missing: Dict[str, List[int]] = {}
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key)
+            vectors.append(_decode(cached) if cached is not None else None)
+            if cached is None:
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            first = [positions[0] for positions in missing.values()]
+            fresh = _normalize(self._embed_uncached([texts[i] for i in first]))
+            self.cache.set_many({keys[i]: _encode(v) for i, v in zip(first, fresh)})
+            for positions, vector in zip(missing.values(), fresh):
+                for i in positions:
+                    vectors[i] = vector
+
+        return np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+
+class VectorIndex:
+    """
+    Append-only on-disk vector index for one embedding model.
+
+    Vectors live in a flat float32 file read through a NumPy memmap; SQLite maps
+    each (source, content version) to its row range and stores the chunk text.
+    Re-indexing a changed page appends new rows and repoints the source, so
+    concurrent readers never see a half-written range.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (row INTEGER PRIMARY KEY, text TEXT NOT NULL)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sources (
+                source TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                first_row INTEGER NOT NULL,
+                n_rows INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+        self.dim: Optional[int] = int(row[0]) if row else None
+        self._matrix: Optional[np.memmap] = None
+
+    def has(self, source: str, version: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM sources WHERE source = ?", (source,)
+            ).fetchone()
+        return row is not None and row[0] == version
+
+    def add(self, source: str, version: str, texts: Sequence[str], vectors: np.ndarray):
+        """Append the chunks of one source version and make them the source's current rows"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            # BEGIN IMMEDIATE serializes appends from other processes sharing the index
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+                if row is None:
+                    self._conn.execute("INSERT INTO meta VALUES ('dim', ?)", (str(vectors.shape[1]),))
+                self.dim = int(row[0]) if row else int(vectors.shape[1])
+                if vectors.shape[1] != self.dim:
+                    raise ValueError(f"Index holds {self.dim}-d vectors, got {vectors.shape[1]}-d")
+                row_bytes = self.dim * 4
+                size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+                if size % row_bytes:
+                    # Drop a torn row left by a crash mid-append so offsets stay aligned
+                    os.truncate(self._vectors_path, size - size % row_bytes)
+                with open(self._vectors_path, "ab") as f:
+                    first_row = f.tell() // row_bytes
+                    f.write(vectors.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunks (row, text) VALUES (?, ?)",
+                    [(first_row + i, text) for i, text in enumerate(texts)]
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+                    (source, version, first_row, len(texts), time.time())
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _rows(self) -> np.ndarray:
+        """Memmap over the whole vector file, reopened only when it has grown"""
+        rows = os.path.getsize(self._vectors_path) // (self.dim * 4)
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                     shape=(rows, self.dim))
+        return self._matrix
+
+    def search(self, query: np.ndarray, k: int = WEBSITE_SEARCH_TOP_K,
+               sources: Optional[Sequence[str]] = None) -> List[Tuple[float, str, str]]:
+        """Top-k (score, source, text) by cosine similarity, optionally within given sources"""
+        with self._lock:
+            if self.dim is None:
+                row = self._conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+                self.dim = int(row[0]) if row else None
+            if self.dim is None or not os.path.exists(self._vectors_path):
+                return []
+            sql = "SELECT source, first_row, n_rows FROM sources"
+            params: Tuple[Any, ...] = ()
+            if sources is not None:
+                sql += f" WHERE source IN ({', '.join('?' * len(sources))})"
+                params = tuple(sources)
+            ranges = self._conn.execute(sql, params).fetchall()
+            if not ranges:
+                return []
+            matrix = self._rows()
+
+            row_ids = np.concatenate([np.arange(first, first + n) for _, first, n in ranges])
+            owners = np.concatenate([np.full(n, i) for i, (_, _, n) in enumerate(ranges)])
+            scores = matrix[row_ids] @ query.astype(np.float32)
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            texts = dict(self._conn.execute(
+                f"SELECT row, text FROM chunks WHERE row IN ({', '.join('?' * k)})",
+                tuple(int(row_ids[i]) for i in top)
+            ).fetchall())
+        return [(float(scores[i]), ranges[owners[i]][0], texts[int(row_ids[i])]) for i in top]
+
+    def close(self):
+        with self._lock:
+            self._matrix = None
+            self._conn.close()
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split text into overlapping windows, preferring to break at whitespace"""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            space = text.rfind(" ", start + size - overlap, end)
+            end = space if space > start else end
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return [c for c in chunks if c]
+
+
+def fetch_page_text(url: str) -> str:
+    """Visible text of a web page, cached for WEBSITE_CACHE_TTL seconds"""
+    cache = get_embedding_cache()
+    key = content_key("page", url)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    import requests
+    from bs4 import BeautifulSoup
+    with instrument("tool", "website_fetch", input=url) as event:
+        response = requests.get(url, timeout=20, headers={"User-Agent": "Mozilla/5.0 (CaboResearch)"})
+        response.raise_for_status()
+        soup = BeautifulSoup(response.text, "html.parser")
+        for tag in soup(["script", "style", "noscript"]):
+            tag.decompose()
+        text = re.sub(r"\s+", " ", soup.get_text(" ")).strip()
+        event["output"] = text
+    cache.set(key, text, ttl=WEBSITE_CACHE_TTL)
+    return text
+
+
+_embedder: Optional[Embedder] = None
+_indexes: Dict[str, VectorIndex] = {}
+_source_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder:
+    global _embedder
+    with _registry_lock:
+        if _embedder is None:
+            _embedder = Embedder()
+        return _embedder
+
+
+def get_vector_index(model_id: str) -> VectorIndex:
+    """Process-wide index for one embedding model (dimensions differ between models)"""
+    with _registry_lock:
+        if model_id not in _indexes:
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id)
+            _indexes[model_id] = VectorIndex(os.path.join(VECTOR_INDEX_DIR, slug))
+        return _indexes[model_id]
+
+
+def index_source(source: str, text: str, embedder: Optional[Embedder] = None) -> VectorIndex:
+    """Embed and index text under source unless this exact content is already indexed"""
+    embedder = embedder or get_embedder()
+    index = get_vector_index(embedder.model_id)
+    version = text_hash(text)
+    with _registry_lock:
+        lock = _source_locks.setdefault(source, threading.Lock())
+    # Agents searching the same site concurrently index it once
+    with lock:
+        if not index.has(source, version):
+            chunks = chunk_text(text)
+            if chunks:
+                index.add(source, version, chunks, embedder.embed(chunks))
+    return index
+
+
+class WebsiteSearchSchema(BaseModel):
+    """Input for CachedWebsiteSearchTool"""
+    search_query: str = Field(description="Mandatory search query you want to use to search a specific website")
+    website: str = Field(description="Mandatory valid website URL you want to search on")
+
+
+class CachedWebsiteSearchTool(BaseTool):
+    """Drop-in for WebsiteSearchTool backed by the embedding cache and local vector index"""
+    name: str = "Search in a specific website"
+    description: str = "A tool that can be used to semantic search a query from a specific URL content."
+    args_schema: Type[BaseModel] = WebsiteSearchSchema
+    top_k: int = WEBSITE_SEARCH_TOP_K
+
+    def _run(self, search_query: str, website: str, **kwargs: Any) -> str:
+        embedder = get_embedder()
+        try:
+            text = fetch_page_text(website)
+        except Exception as e:
+            return f"Error fetching {website}: {e}"
+        index = index_source(website, text, embedder)
+        hits = index.search(embedder.embed([search_query])[0], self.top_k, sources=[website])
+        if not hits:
+            return f"No content found on {website}"
+        return "Relevant Content:\n" + "\n\n".join(text for _, _, text in hits)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Concurrent query fan-out for the Cabo research tools
+Runs a batch of search queries in parallel and returns results in query order
+"""
+
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Defaults can be tuned per deployment via .env
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))
+DEFAULT_QUERY_TIMEOUT = float(os.getenv("SEARCH_QUERY_TIMEOUT", "30"))
+
+
+def fan_out_queries(
+    run_query: Callable[[str], str],
+    queries: List[str],
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> List[str]:
+    """
+    Run every query through run_query concurrently.
+
+    Results are returned in the same order as queries. A query that raises
+    or exceeds the per-query timeout yields an error string in its slot so
+    the other results are still usable.
+    """
+    if not queries:
+        return []
+
+    max_concurrency = max(1, max_concurrency or DEFAULT_MAX_CONCURRENCY)
+    timeout = DEFAULT_QUERY_TIMEOUT if timeout is None else timeout
+
+    # Each window gets its own short-lived pool: a query that hangs past the timeout
+    # keeps only its own abandoned thread instead of a worker other callers need.
+    # The process-wide request rate is capped separately by cabo_rate_limit.
+    results: List[str] = []
+    for start in range(0, len(queries), max_concurrency):
+        window = queries[start:start + max_concurrency]
+        executor = ThreadPoolExecutor(max_workers=len(window), thread_name_prefix="cabo-fanout")
+        try:
+            # Each query runs in a copy of the caller's context (e.g. the current agent for metrics)
+            futures = [executor.submit(contextvars.copy_context().run, run_query, q) for q in window]
+            deadline = time.monotonic() + timeout
+            for query, future in zip(window, futures):
+                try:
+                    remaining = max(0.0, deadline - time.monotonic())
+                    results.append(future.result(timeout=remaining))
+                except FutureTimeoutError:
+                    results.append(f"Error searching for {query}: timed out after {timeout:.0f}s")
+                except Exception as e:
+                    results.append(f"Error searching for {query}: {str(e)}")
+        except Exception as e:
+            results.extend(f"Error searching for {q}: {str(e)}" for q in window[len(results) - start:])
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
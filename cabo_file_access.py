@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Bounded file access for agents working over large scraped archives
+Files are memory-mapped and read by line window or byte range, searched grep-style
+returning only matching spans, and directory listings are cached until an mtime changes
+"""
+
+import fnmatch
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+import numpy as np
+from crewai.tools import BaseTool
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+
+load_dotenv()
+
+FILE_READ_MAX_CHARS = int(os.getenv("FILE_READ_MAX_CHARS", "8000"))      # Per read tool call
+FILE_GREP_MAX_MATCHES = int(os.getenv("FILE_GREP_MAX_MATCHES", "50"))    # Per search tool call
+DIR_LISTING_MAX_ENTRIES = int(os.getenv("DIR_LISTING_MAX_ENTRIES", "500"))
+MAX_OPEN_MAPS = 32          # Memory maps kept open (LRU)
+LINE_INDEX_STRIDE = 1024    # Keep the offset of every Nth line
+SCAN_BLOCK_BYTES = 64 * 1024 * 1024
+SPAN_CHARS = 300            # Characters kept around each grep match
+BINARY_SNIFF_BYTES = 8192
+
+
+class MappedFile:
+    """
+    Read-only memory map of one file version with a sparse line index.
+
+    The index holds the byte offset of every LINE_INDEX_STRIDE-th line and is
+    built lazily in one vectorized pass, so a line window anywhere in a
+    multi-GB file is one lookup plus at most a stride of newline scans.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        stat = os.stat(path)
+        self.version = (stat.st_size, stat.st_mtime_ns)
+        self.size = stat.st_size
+        self._file = open(path, "rb")
+        # mmap cannot map an empty file
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self._line_index: Optional[np.ndarray] = None
+        self.n_lines: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_binary(self) -> bool:
+        return b"\0" in self.data[:BINARY_SNIFF_BYTES]
+
+    def _build_line_index(self):
+        with self._lock:
+            if self._line_index is not None:
+                return
+            starts = [np.zeros(1, dtype=np.int64)]
+            newlines = 0
+            for block_start in range(0, self.size, SCAN_BLOCK_BYTES):
+                block = np.frombuffer(self.data, dtype=np.uint8, count=min(SCAN_BLOCK_BYTES, self.size - block_start),
+                                      offset=block_start)
+                positions = np.flatnonzero(block == 10) + block_start + 1
+                # Line k starts after newline k-1; keep lines k where k % stride == 0
+                first = (-newlines - 1) % LINE_INDEX_STRIDE
+                starts.append(positions[first::LINE_INDEX_STRIDE])
+                newlines += len(positions)
+            ends_with_newline = self.size and self.data[self.size - 1:self.size] == b"\n"
+            self.n_lines = newlines + (0 if ends_with_newline or not self.size else 1)
+            self._line_index = np.concatenate(starts)
+
+    def count_newlines(self, start: int, end: int) -> int:
+        """Newlines in data[start:end], counted over the map in fixed-size blocks without copying"""
+        count = 0
+        for block_start in range(start, end, SCAN_BLOCK_BYTES):
+            block = np.frombuffer(self.data, dtype=np.uint8, count=min(SCAN_BLOCK_BYTES, end - block_start),
+                                  offset=block_start)
+            count += int(np.count_nonzero(block == 10))
+        return count
+
+    def line_offset(self, line: int) -> int:
+        """Byte offset where 0-based line `line` starts (the file size past the end)"""
+        self._build_line_index()
+        anchor = min(line // LINE_INDEX_STRIDE, len(self._line_index) - 1)
+        offset = int(self._line_index[anchor])
+        for _ in range(line - anchor * LINE_INDEX_STRIDE):
+            found = self.data.find(b"\n", offset)
+            if found < 0:
+                return self.size
+            offset = found + 1
+        return offset
+
+    def read_lines(self, start: int, count: int, max_chars: int = FILE_READ_MAX_CHARS) -> Tuple[str, int]:
+        """Up to `count` lines from 0-based line `start`, capped at max_chars; returns (text, lines read)"""
+        begin = self.line_offset(start)
+        # A UTF-8 character is at most 4 bytes, so this many bytes always covers max_chars
+        limit = min(self.size, begin + max_chars * 4)
+        end = begin
+        lines = 0
+        while lines < count and end < limit:
+            found = self.data.find(b"\n", end, limit)
+            end = limit if found < 0 else found + 1
+            lines += 1
+        text = self.data[begin:end].decode("utf-8", errors="replace")
+        if len(text) > max_chars:
+            text = text[:max_chars]
+            complete = text.count("\n")
+            # Drop the cut-off line unless it is the only one, so paging never stalls
+            text = text[:text.rfind("\n") + 1] if complete else text
+            lines = max(complete, 1)
+        return text, lines
+
+    def read_range(self, offset: int, length: int) -> str:
+        offset = max(0, min(offset, self.size))
+        return self.data[offset:offset + max(0, length)].decode("utf-8", errors="replace")
+
+    def grep(self, pattern: "re.Pattern[bytes]", max_matches: int = FILE_GREP_MAX_MATCHES,
+             context_lines: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Yield matching spans with their 1-based line number and byte offset.
+
+        The regex runs directly over the memory map; line numbers and line
+        starts are tracked incrementally between matches, and the search resumes
+        after the matched line, so the work stays linear in the file size even
+        for a single huge line.
+        """
+        line, counted_to, line_start, found, pos = 1, 0, 0, 0, 0
+        while found < max_matches and pos <= self.size:
+            match = pattern.search(self.data, pos)
+            if match is None:
+                return
+            start = match.start()
+            line += self.count_newlines(counted_to, start)
+            newline = self.data.rfind(b"\n", counted_to, start)
+            if newline >= 0:
+                line_start = newline + 1
+            counted_to = start
+            line_end = self.data.find(b"\n", start)
+            line_end = self.size if line_end < 0 else line_end
+            # Keep a window around the match rather than the whole (possibly huge) line
+            lo = max(line_start, start - SPAN_CHARS // 2)
+            hi = min(line_end, max(match.end(), lo + SPAN_CHARS), lo + 2 * SPAN_CHARS)
+            span = {"line": line, "offset": start,
+                    "text": self.data[lo:hi].decode("utf-8", errors="replace").strip()}
+            if context_lines:
+                before = self.line_offset(max(0, line - 1 - context_lines))
+                after_text, _ = self.read_lines(line, context_lines, SPAN_CHARS * context_lines)
+                before = max(before, line_start - 4 * SPAN_CHARS * context_lines)  # Bound the copy on huge lines
+                span["before"] = self.data[before:line_start].decode("utf-8", errors="replace")[-SPAN_CHARS * context_lines:]
+                span["after"] = after_text
+            found += 1
+            yield span
+            pos = line_end + 1  # One span per line
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+
+class FileAccess:
+    """Open memory maps (LRU, reopened when a file changes) and cached directory listings"""
+
+    def __init__(self, max_open: int = MAX_OPEN_MAPS):
+        self.max_open = max_open
+        self._maps: "OrderedDict[str, MappedFile]" = OrderedDict()
+        self._listings: Dict[Tuple[Any, ...], Tuple[Dict[str, int], List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def open(self, path: str) -> MappedFile:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            mapped = self._maps.pop(path, None)
+            if mapped is not None and mapped.version != (stat.st_size, stat.st_mtime_ns):
+                mapped = None  # Changed on disk; in-flight readers keep the old map until done
+            if mapped is None:
+                mapped = MappedFile(path)
+            self._maps[path] = mapped
+            while len(self._maps) > self.max_open:
+                # Readers still holding an evicted map keep it alive until they finish
+                self._maps.popitem(last=False)
+            return mapped
+
+    def list_directory(self, directory: str, pattern: Optional[str] = None,
+                       recursive: bool = True) -> List[Dict[str, Any]]:
+        """
+        Files under a directory as {path, size} relative to it, sorted by path.
+
+        A directory's mtime changes whenever an entry is added, removed or
+        renamed in it, so a cached listing stays valid while every directory
+        it walked keeps its mtime; revalidating costs one stat per directory.
+        """
+        directory = os.path.abspath(directory)
+        key = (directory, pattern, recursive)
+        with self._lock:
+            cached = self._listings.get(key)
+        if cached is not None:
+            mtimes, entries = cached
+            try:
+                if all(os.stat(d).st_mtime_ns == m for d, m in mtimes.items()):
+                    return entries
+            except FileNotFoundError:
+                pass
+
+        mtimes: Dict[str, int] = {}
+        entries: List[Dict[str, Any]] = []
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            mtimes[current] = os.stat(current).st_mtime_ns
+            with os.scandir(current) as scan:
+                for entry in scan:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                        continue
+                    relative = os.path.relpath(entry.path, directory)
+                    if pattern and not fnmatch.fnmatch(relative, pattern) and not fnmatch.fnmatch(entry.name, pattern):
+                        continue
+                    try:
+                        size = entry.stat().st_size
+                    except FileNotFoundError:
+                        continue
+                    entries.append({"path": relative, "size": size})
+        entries.sort(key=lambda e: e["path"])
+        with self._lock:
+            self._listings[key] = (mtimes, entries)
+        return entries
+
+    def close(self):
+        with self._lock:
+            maps, self._maps = list(self._maps.values()), OrderedDict()
+            self._listings.clear()
+        for mapped in maps:
+            mapped.close()
+
+
+_access: Optional[FileAccess] = None
+_access_lock = threading.Lock()
+
+
+def get_file_access() -> FileAccess:
+    global _access
+    with _access_lock:
+        if _access is None:
+            _access = FileAccess()
+        return _access
+
+
+def compile_pattern(pattern: str, regex: bool = False, ignore_case: bool = True) -> "re.Pattern[bytes]":
+    source = pattern.encode("utf-8")
+    return re.compile(source if regex else re.escape(source), re.IGNORECASE if ignore_case else 0)
+
+
+def _size(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return str(n)
+
+
+class FileReadSchema(BaseModel):
+    """Input for MappedFileReadTool"""
+    file_path: str = Field(..., description="Path of the file to read")
+    start_line: Optional[int] = Field(default=1, description="1-based line to start reading from")
+    line_count: Optional[int] = Field(default=None, description="Number of lines to read (default: as many as fit)")
+
+
+class MappedFileReadTool(BaseTool):
+    """Drop-in for FileReadTool that reads a bounded line window through a memory map"""
+    name: str = "Read a file's content"
+    description: str = (
+        "Read a window of lines from a file (any size). Use start_line and line_count to page "
+        "through large files; the output says where to continue."
+    )
+    args_schema: Type[BaseModel] = FileReadSchema
+
+    def _run(self, file_path: str, start_line: Optional[int] = 1, line_count: Optional[int] = None,
+             **kwargs: Any) -> str:
+        try:
+            mapped = get_file_access().open(file_path)
+        except OSError as e:
+            return f"Error: failed to read file {file_path}. {e}"
+        if not mapped.size:
+            return f"{file_path} is empty"
+        if mapped.is_binary:
+            return f"{file_path} is a binary file ({_size(mapped.size)}); not reading it as text"
+        start = max(1, start_line or 1) - 1
+        text, lines = mapped.read_lines(start, line_count or 1 << 62)
+        if not text and start:
+            return f"{file_path} has fewer than {start + 1} lines"
+        if mapped.line_offset(start + lines) < mapped.size:
+            text += f"\n[... more lines; continue with start_line={start + lines + 1}]"
+        return text
+
+
+class FileSearchSchema(BaseModel):
+    """Input for FileSearchTool"""
+    path: str = Field(..., description="File or directory to search")
+    pattern: str = Field(..., description="Text (or regular expression with regex=true) to find")
+    regex: bool = Field(default=False, description="Treat pattern as a regular expression")
+    ignore_case: bool = Field(default=True, description="Case-insensitive matching")
+    file_pattern: Optional[str] = Field(default=None, description="Only search files matching this glob, e.g. *.jsonl")
+    context_lines: int = Field(default=0, description="Lines of context before and after each match")
+
+
+class FileSearchTool(BaseTool):
+    """grep over memory-mapped files that returns only the matching spans"""
+    name: str = "Search file contents"
+    description: str = (
+        "Find lines matching a pattern in a file or every file under a directory. Returns "
+        "file, line number and the matching span only, so it is safe on multi-GB archives; "
+        "read around a hit with the file read tool."
+    )
+    args_schema: Type[BaseModel] = FileSearchSchema
+
+    def _run(self, path: str, pattern: str, regex: bool = False, ignore_case: bool = True,
+             file_pattern: Optional[str] = None, context_lines: int = 0, **kwargs: Any) -> str:
+        access = get_file_access()
+        try:
+            compiled = compile_pattern(pattern, regex, ignore_case)
+            files = [path] if os.path.isfile(path) else [
+                os.path.join(path, e["path"]) for e in access.list_directory(path, file_pattern)
+            ]
+        except (OSError, re.error) as e:
+            return f"Error: {e}"
+        results = []
+        remaining = FILE_GREP_MAX_MATCHES
+        for file in files:
+            try:
+                mapped = access.open(file)
+            except OSError:
+                continue
+            if not mapped.size or mapped.is_binary:
+                continue
+            for span in mapped.grep(compiled, remaining, min(context_lines, 5)):
+                shown = os.path.relpath(file, path) if file != path else os.path.basename(file)
+                block = f"{shown}:{span['line']}: {span['text']}"
+                if context_lines:
+                    block = f"{span['before']}{block}\n{span['after']}".strip()
+                results.append(block)
+                remaining -= 1
+            if remaining <= 0:
+                results.append(f"[stopped after {FILE_GREP_MAX_MATCHES} matches]")
+                break
+        return "\n".join(results) if results else f"No matches for {pattern!r} in {path}"
+
+
+class DirectoryReadSchema(BaseModel):
+    """Input for CachedDirectoryReadTool"""
+    directory: str = Field(..., description="Directory to list")
+    pattern: Optional[str] = Field(default=None, description="Only list files matching this glob, e.g. *.csv")
+    recursive: bool = Field(default=True, description="Include files in subdirectories")
+
+
+class CachedDirectoryReadTool(BaseTool):
+    """Drop-in for DirectoryReadTool with mtime-validated cached listings and a bounded output"""
+    name: str = "List files in directory"
+    description: str = (
+        "List files (with sizes) under a directory, optionally filtered by a glob pattern. "
+        "Long listings are truncated to a summary."
+    )
+    args_schema: Type[BaseModel] = DirectoryReadSchema
+
+    def _run(self, directory: str, pattern: Optional[str] = None, recursive: bool = True,
+             **kwargs: Any) -> str:
+        try:
+            entries = get_file_access().list_directory(directory, pattern, recursive)
+        except OSError as e:
+            return f"Error: {e}"
+        total = sum(e["size"] for e in entries)
+        lines = [f"{len(entries)} files, {_size(total)} in {directory}"]
+        lines += [f"- {e['path']} ({_size(e['size'])})" for e in entries[:DIR_LISTING_MAX_ENTRIES]]
+        if len(entries) > DIR_LISTING_MAX_ENTRIES:
+            lines.append(f"[... {len(entries) - DIR_LISTING_MAX_ENTRIES} more; narrow with pattern]")
+        return "\n".join(lines)
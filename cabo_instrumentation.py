@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Latency, token and cost instrumentation for the Cabo research crew
+Records every tool and LLM call as a JSONL event and aggregates a per-run summary
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+METRICS_DIR = os.getenv("METRICS_DIR", "metrics")
+MAX_COST_PER_ANALYSIS = float(os.getenv("MAX_COST_PER_ANALYSIS", "0") or 0)
+SERPER_COST_PER_QUERY = float(os.getenv("SERPER_COST_PER_QUERY", "0.001"))
+
+# USD per 1K tokens (input, output); unknown models fall back to DEFAULT_PRICE
+MODEL_PRICES = {
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4": (0.03, 0.06),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "claude-3-5-sonnet": (0.003, 0.015),
+    "claude-3-haiku": (0.00025, 0.00125),
+    "text-embedding-3-small": (0.00002, 0.0),
+    "text-embedding-3-large": (0.00013, 0.0),
+}
+DEFAULT_PRICE = (0.01, 0.03)
+
+# Agent the current thread is working for; copied into fan-out worker threads
+current_agent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_agent", default=None
+)
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a chars/4 estimate
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def model_price(model: str):
+    model = (model or "").split("/")[-1]
+    for prefix, price in MODEL_PRICES.items():
+        if model.startswith(prefix):
+            return price
+    return DEFAULT_PRICE
+
+
+def llm_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = model_price(model)
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1000
+
+
+def _size(value: Any) -> int:
+    if value is None:
+        return 0
+    return len(value if isinstance(value, str) else json.dumps(value, default=str))
+
+
+class Instrumentation:
+    """
+    Collector for one run.
+
+    Every call becomes an event dict (kind, name, agent, start/end, sizes,
+    tokens, cost, cache_hit) appended to <METRICS_DIR>/<run_id>.jsonl as it
+    finishes; summary() aggregates the events per agent, tool and model.
+    Kinds: "tool" for agent-level tool calls, "search" for backend search
+    requests made by those tools, "llm" for model calls.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, metrics_dir: str = METRICS_DIR):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(metrics_dir, exist_ok=True)
+        self.path = os.path.join(metrics_dir, f"{self.run_id}.jsonl")
+        self.started_at = time.time()
+        self.events: List[Dict[str, Any]] = []
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, event: Dict[str, Any]):
+        event.setdefault("run_id", self.run_id)
+        event.setdefault("agent", current_agent.get())
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            self.events.append(event)
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    @contextmanager
+    def span(self, kind: str, name: str, input: Any = None, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """Time a block; the caller may set output, cache_hit or cost_usd on the yielded dict"""
+        event = {"kind": kind, "name": name, "input_chars": _size(input), **fields}
+        event["start"] = time.time()
+        try:
+            yield event
+        except Exception as e:
+            event["error"] = str(e)
+            raise
+        finally:
+            event["end"] = time.time()
+            event["duration_s"] = round(event["end"] - event["start"], 4)
+            event["output_chars"] = _size(event.pop("output", None))
+            self.record(event)
+
+    def record_llm_call(self, model: str, messages: Any, response: Any,
+                        start: float, end: float, cache_hit: bool = False, error: str = None):
+        prompt = messages if isinstance(messages, str) else json.dumps(messages, default=str)
+        completion = response if isinstance(response, str) else json.dumps(response, default=str)
+        prompt_tokens = count_tokens(prompt)
+        completion_tokens = count_tokens(completion) if response is not None else 0
+        event = {
+            "kind": "llm",
+            "name": model,
+            "start": start,
+            "end": end,
+            "duration_s": round(end - start, 4),
+            "input_chars": len(prompt),
+            "output_chars": len(completion) if response is not None else 0,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": 0.0 if cache_hit else llm_cost(model, prompt_tokens, completion_tokens),
+            "cache_hit": cache_hit,
+        }
+        if error:
+            event["error"] = error
+        self.record(event)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate recorded events per agent, per tool/model and for the whole run"""
+        with self._lock:
+            events = list(self.events)
+
+        def bucket():
+            return {"calls": 0, "wall_s": 0.0, "cache_hits": 0, "errors": 0,
+                    "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+
+        agents: Dict[str, Dict[str, Any]] = {}
+        calls: Dict[str, Dict[str, Any]] = {}
+        totals = bucket()
+        for event in events:
+            key = f"{event['kind']}:{event['name']}"
+            agent = event.get("agent") or "unattributed"
+            for stats in (agents.setdefault(agent, bucket()), calls.setdefault(key, bucket()), totals):
+                stats["calls"] += 1
+                stats["wall_s"] += event.get("duration_s") or 0.0
+                stats["cache_hits"] += bool(event.get("cache_hit"))
+                stats["errors"] += bool(event.get("error"))
+                stats["prompt_tokens"] += event.get("prompt_tokens", 0)
+                stats["completion_tokens"] += event.get("completion_tokens", 0)
+                stats["cost_usd"] += event.get("cost_usd", 0.0)
+
+        for stats in [totals, *agents.values(), *calls.values()]:
+            stats["wall_s"] = round(stats["wall_s"], 3)
+            stats["cost_usd"] = round(stats["cost_usd"], 4)
+
+        return {
+            "run_id": self.run_id,
+            "events_file": self.path,
+            "elapsed_s": round(time.time() - self.started_at, 1),
+            "totals": totals,
+            "by_agent": agents,
+            "by_call": calls,
+            "budget_usd": MAX_COST_PER_ANALYSIS or None,
+            "over_budget": bool(MAX_COST_PER_ANALYSIS) and totals["cost_usd"] > MAX_COST_PER_ANALYSIS,
+        }
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+_active: Optional[Instrumentation] = None
+_crewai_attached = False
+_llm_starts = threading.local()
+
+
+def _attach_crewai():
+    """Subscribe once to crewai's event bus; handlers record into whichever run is active"""
+    global _crewai_attached
+    if _crewai_attached:
+        return
+    from crewai.utilities.events import crewai_event_bus
+    from crewai.utilities.events.llm_events import (
+        LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent
+    )
+    from crewai.utilities.events.tool_usage_events import (
+        ToolUsageFinishedEvent, ToolUsageErrorEvent
+    )
+
+    def llm_started(source, event):
+        _llm_starts.value = (time.time(), getattr(event, "messages", None))
+
+    def llm_finished(source, event):
+        start, messages = getattr(_llm_starts, "value", (time.time(), None))
+        if _active is not None:
+            _active.record_llm_call(
+                getattr(source, "model", "unknown"), messages,
+                getattr(event, "response", None), start, time.time(),
+                error=getattr(event, "error", None)
+            )
+
+    def tool_finished(source, event):
+        if _active is None:
+            return
+        started = getattr(event, "started_at", None)
+        finished = getattr(event, "finished_at", None)
+        error = getattr(event, "error", None)
+        _active.record({
+            "kind": "tool",
+            "name": event.tool_name,
+            "agent": getattr(event, "agent_role", None) or current_agent.get(),
+            "start": started.timestamp() if started else None,
+            "end": finished.timestamp() if finished else time.time(),
+            "duration_s": round((finished - started).total_seconds(), 4)
+            if started and finished else None,
+            "input_chars": _size(getattr(event, "tool_args", None)),
+            "output_chars": _size(getattr(event, "output", None)),
+            "cache_hit": bool(getattr(event, "from_cache", False)),
+            "error": str(error) if error else None,
+        })
+
+    crewai_event_bus.on(LLMCallStartedEvent)(llm_started)
+    crewai_event_bus.on(LLMCallCompletedEvent)(llm_finished)
+    crewai_event_bus.on(LLMCallFailedEvent)(llm_finished)
+    crewai_event_bus.on(ToolUsageFinishedEvent)(tool_finished)
+    crewai_event_bus.on(ToolUsageErrorEvent)(tool_finished)
+    _crewai_attached = True
+
+
+def start_run(run_id: Optional[str] = None, attach_crewai: bool = True) -> Instrumentation:
+    """Begin collecting for a run; instrumented code records into it until stop_run()"""
+    global _active
+    if attach_crewai:
+        _attach_crewai()
+    _active = Instrumentation(run_id)
+    return _active
+
+
+def stop_run() -> Optional[Dict[str, Any]]:
+    global _active
+    if _active is None:
+        return None
+    summary = _active.summary()
+    _active.close()
+    _active = None
+    return summary
+
+
+def get_instrumentation() -> Optional[Instrumentation]:
+    return _active
+
+
+@contextmanager
+def instrument(kind: str, name: str, input: Any = None, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """Span on the active run, or a throwaway dict when nothing is being recorded"""
+    if _active is None:
+        yield {}
+        return
+    with _active.span(kind, name, input, **fields) as event:
+        yield event
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+LLM wrapper for the Cabo research crew
+Routes every completion through the process-wide LLM rate limiter and a persistent
+response cache keyed on the full prompt
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+from crewai import LLM
+from dotenv import load_dotenv
+from cabo_cache import PersistentCache, content_key
+from cabo_instrumentation import count_tokens, get_instrumentation
+from cabo_rate_limit import get_limiter
+
+load_dotenv()
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cabo_cache/llm_cache.sqlite3")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+# off: no caching; record: store every response, serve hits only at temperature 0;
+# replay: also serve hits up to LLM_REPLAY_MAX_TEMPERATURE (deterministic re-runs)
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "record").lower()
+LLM_REPLAY_MAX_TEMPERATURE = float(os.getenv("LLM_REPLAY_MAX_TEMPERATURE", "0.5"))
+
+_llm_cache: Optional[PersistentCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> PersistentCache:
+    """Return the process-wide LLM response cache, opening it on first use"""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = PersistentCache(
+                LLM_CACHE_PATH,
+                default_ttl=LLM_CACHE_TTL,
+                max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024,
+            )
+        return _llm_cache
+
+
+def _prompt_text(messages: Union[str, List[Dict[str, Any]]]) -> str:
+    return messages if isinstance(messages, str) else json.dumps(messages, ensure_ascii=False)
+
+
+def llm_cache_key(model: str, temperature: Optional[float], max_tokens: Optional[int],
+                  messages: Union[str, List[Dict[str, Any]]], stop: Any = None) -> str:
+    """Cache key for one completion: sampling settings plus a hash of the exact messages"""
+    digest = hashlib.sha256(_prompt_text(messages).encode("utf-8")).hexdigest()
+    return content_key("llm", model, temperature, max_tokens, stop, digest)
+
+
+class RateLimitedLLM(LLM):
+    """
+    crewai LLM that reserves requests/min and tokens/min before each call.
+
+    Plain text completions are stored in the LLM response cache. A byte-identical
+    prompt is answered from it without a request when the call is deterministic
+    (temperature 0) or, in replay mode, at low temperature.
+    """
+
+    def _serves_cached(self) -> bool:
+        # An unset temperature means the provider default (usually 1.0), not deterministic
+        if self.temperature is None:
+            return False
+        if LLM_CACHE_MODE == "replay":
+            return self.temperature <= LLM_REPLAY_MAX_TEMPERATURE
+        return LLM_CACHE_MODE == "record" and self.temperature == 0.0
+
+    def call(self, messages: Union[str, List[Dict[str, Any]]], *args: Any, **kwargs: Any) -> Any:
+        # Function-calling requests may run tools as a side effect; never short-circuit them
+        cacheable = LLM_CACHE_MODE in ("record", "replay") and not args \
+            and not kwargs.get("tools") and not kwargs.get("available_functions")
+        key = llm_cache_key(self.model, self.temperature, self.max_tokens, messages,
+                            getattr(self, "stop", None)) if cacheable else None
+
+        if key is not None and self._serves_cached():
+            start = time.time()
+            cached = get_llm_cache().get(key)
+            if cached is not None:
+                instrumentation = get_instrumentation()
+                if instrumentation is not None:
+                    instrumentation.record_llm_call(self.model, messages, cached, start, time.time(),
+                                                    cache_hit=True)
+                return cached
+
+        limiter = get_limiter("llm")
+        prompt_tokens = count_tokens(_prompt_text(messages))
+        estimated = prompt_tokens + (self.max_tokens or 1000)
+
+        response = limiter.call(super().call, messages, *args, tokens=estimated, **kwargs)
+
+        completion_tokens = count_tokens(response) if isinstance(response, str) else 0
+        limiter.report_tokens(estimated, prompt_tokens + completion_tokens)
+        if key is not None and isinstance(response, str) and response:
+            get_llm_cache().set(key, response)
+        return response
@@ -2,59 +2,83 @@
 """
 Enhanced Cabo San Lucas Tourism Market Research Crew
 Improvements include better tools, more specific agents, and data persistence
+
+The LLM, tools, agents and crew are built on first use (see build_crew and
+get_component), so importing this module stays cheap for tests, CLI help and
+worker processes.
 """
 
 import os
-import json
+import argparse
+import threading
 from datetime import datetime
-from typing import Dict, List, Any
-from crewai import Agent, Task, Crew, Process
-from crewai_tools import (
-    SerperDevTool,
-    WebsiteSearchTool,
-    FileReadTool,
-    DirectoryReadTool,
-    CSVSearchTool
-)
-from langchain_openai import ChatOpenAI
+from typing import Callable, Dict, List, Any, Optional
 from langchain.tools import tool
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from cabo_fanout import fan_out_queries
+from cabo_models import MarketGap, MarketGapReport, ProductFeature, ProductFeatureReport, collect_structured
 
 # Load environment variables
 load_dotenv()
 
-# Initialize LLM with better configuration
-llm = ChatOpenAI(
-    model="gpt-4-turbo-preview",  # Better for analysis tasks
-    temperature=0.3,  # Lower temperature for more focused analysis
-    max_tokens=4000
-)
-
-# Initialize enhanced tools
-search_tool = SerperDevTool()
-website_tool = WebsiteSearchTool()
-file_tool = FileReadTool()
-directory_tool = DirectoryReadTool()
-csv_tool = CSVSearchTool()
-
-# Data models for structured output
-class MarketGap(BaseModel):
-    """Structured market gap analysis"""
-    gap_name: str = Field(description="Name of the identified market gap")
-    description: str = Field(description="Detailed description of the gap")
-    target_audience: str = Field(description="Who would benefit from addressing this gap")
-    estimated_market_size: str = Field(description="Rough estimate of market size")
-    competition_level: str = Field(description="Low/Medium/High competition")
-    implementation_difficulty: str = Field(description="Easy/Medium/Hard to implement")
-
-class ProductFeature(BaseModel):
-    """Structured product feature"""
-    feature_name: str = Field(description="Name of the feature")
-    description: str = Field(description="What the feature does")
-    priority: int = Field(description="Priority from 1-10")
-    estimated_dev_time: str = Field(description="Estimated development time")
-    roi_potential: str = Field(description="Low/Medium/High ROI potential")
+# Lazily constructed shared components (LLM and tools)
+def _build_llm():
+    from cabo_llm import RateLimitedLLM  # Shares the process-wide LLM rate limiter
+    return RateLimitedLLM(
+        model="gpt-4-turbo-preview",  # Better for analysis tasks
+        temperature=0.3,  # Lower temperature for more focused analysis
+        max_tokens=4000
+    )
+
+def _build_search_tool():
+    from cabo_search import CachedSerperDevTool
+    return CachedSerperDevTool()  # Persistent cache shared across runs
+
+def _build_website_tool():
+    from cabo_embeddings import CachedWebsiteSearchTool
+    return CachedWebsiteSearchTool()  # Pages embedded once, searched from a local vector index
+
+def _build_dataset_tool():
+    from cabo_datasets import DatasetQueryTool
+    return DatasetQueryTool()  # Ingested CSVs filtered/searched from the local columnar cache
+
+def _build_file_access_tool(name: str) -> Callable[[], Any]:
+    def build():
+        import cabo_file_access  # Memory-mapped, bounded reads for large scraped archives
+        return getattr(cabo_file_access, name)()
+    return build
+
+COMPONENT_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "llm": _build_llm,
+    "search_tool": _build_search_tool,
+    "website_tool": _build_website_tool,
+    "file_tool": _build_file_access_tool("MappedFileReadTool"),
+    "grep_tool": _build_file_access_tool("FileSearchTool"),
+    "directory_tool": _build_file_access_tool("CachedDirectoryReadTool"),
+    "csv_tool": _build_dataset_tool,
+}
+
+_components: Dict[str, Any] = {}
+_components_lock = threading.RLock()
+
+def get_component(name: str) -> Any:
+    """Return a shared component, constructing it on first use"""
+    if name not in _components:
+        with _components_lock:
+            if name not in _components:
+                _components[name] = COMPONENT_FACTORIES[name]()
+    return _components[name]
+
+def set_component(name: str, value: Any):
+    """Override a shared component (e.g. a local stand-in for benchmarks)"""
+    if name not in COMPONENT_FACTORIES:
+        raise KeyError(f"Unknown component: {name}")
+    with _components_lock:
+        _components[name] = value
+
+def _search(query: str) -> Any:
+    return get_component("search_tool").run(query)
 
 # Enhanced custom tools with better functionality
 @tool("Cabo Tourism Data Analyzer")
@@ -73,13 +97,7 @@ def analyze_cabo_tourism_data(query: str) -> str:
         f"{query} Los Cabos hotel occupancy rates trends"
     ]
     
-    results = []
-    for sq in search_queries:
-        try:
-            result = search_tool.run(sq)
-            results.append(result)
-        except Exception as e:
-            results.append(f"Error searching for {sq}: {str(e)}")
+    results = fan_out_queries(_search, search_queries)
     
     return "\n\n".join(results)
 
@@ -95,10 +113,10 @@ def analyze_competitors(business_type: str) -> str:
         f"{business_type} Los Cabos customer complaints reviews"
     ]
     
-    competitor_data = []
-    for query in queries:
-        result = search_tool.run(query)
-        competitor_data.append(f"Query: {query}\nResults: {result}")
+    competitor_data = [
+        f"Query: {query}\nResults: {result}"
+        for query, result in zip(queries, fan_out_queries(_search, queries))
+    ]
     
     return "\n\n".join(competitor_data)
 
@@ -114,10 +132,10 @@ def analyze_customer_sentiment(business_category: str) -> str:
         f"Facebook groups Cabo tourism {business_category} discussions"
     ]
     
-    sentiments = []
-    for source in sources:
-        result = search_tool.run(source)
-        sentiments.append(f"Source: {source}\nFindings: {result}")
+    sentiments = [
+        f"Source: {source}\nFindings: {result}"
+        for source, result in zip(sources, fan_out_queries(_search, sources))
+    ]
     
     return "\n\n".join(sentiments)
 
@@ -133,10 +151,10 @@ def predict_market_trends(industry_segment: str) -> str:
         f"{industry_segment} sustainability eco-tourism Los Cabos"
     ]
     
-    predictions = []
-    for query in trend_queries:
-        result = search_tool.run(query)
-        predictions.append(f"Trend area: {query}\nPredictions: {result}")
+    predictions = [
+        f"Trend area: {query}\nPredictions: {result}"
+        for query, result in zip(trend_queries, fan_out_queries(_search, trend_queries))
+    ]
     
     return "\n\n".join(predictions)
 
@@ -152,342 +170,503 @@ def calculate_roi_potential(product_type: str, target_market: str) -> str:
         f"{target_market} technology budget spending tourism"
     ]
     
-    roi_data = []
-    for factor in roi_factors:
-        result = search_tool.run(factor)
-        roi_data.append(f"ROI Factor: {factor}\nData: {result}")
+    roi_data = [
+        f"ROI Factor: {factor}\nData: {result}"
+        for factor, result in zip(roi_factors, fan_out_queries(_search, roi_factors))
+    ]
     
     return "\n\n".join(roi_data)
 
 # Enhanced Agents with specific expertise
-market_researcher = Agent(
-    role="Cabo Tourism Market Research Specialist",
-    goal="Identify specific, actionable market gaps in Cabo San Lucas tourism sector with focus on luxury resorts, adventure tourism, and wellness retreats.",
-    backstory="""You are a market research specialist with 15 years experience in Mexican tourism markets, 
-    particularly Los Cabos. You have deep connections with local hotel associations, tour operators, 
-    and understand both American/Canadian tourist preferences and local business challenges. 
-    You're fluent in English and Spanish market dynamics.""",
-    tools=[analyze_cabo_tourism_data, analyze_competitors, search_tool, website_tool],
-    llm=llm,
-    max_iter=5,
-    verbose=True
-)
-
-customer_insights_analyst = Agent(
-    role="Customer Experience & Sentiment Analyst",
-    goal="Extract deep insights from customer feedback across all platforms to identify unmet needs and pain points in Cabo tourism experiences.",
-    backstory="""You specialize in analyzing customer behavior and sentiment in luxury tourism markets. 
-    You're an expert at reading between the lines of reviews and understanding what customers really want 
-    but aren't explicitly saying. You have experience with both English and Spanish-speaking markets.""",
-    tools=[analyze_customer_sentiment, search_tool, website_tool],
-    llm=llm,
-    max_iter=4,
-    verbose=True
-)
-
-product_strategist = Agent(
-    role="AI Product Strategy Specialist",
-    goal="Design innovative AI-powered solutions specifically tailored for Cabo's tourism market that solve real problems and generate measurable ROI.",
-    backstory="""You're a product strategist who has successfully launched 10+ AI products in the 
-    hospitality industry. You understand the technical limitations of businesses in Mexico and know 
-    how to create solutions that work with existing infrastructure. You're particularly skilled at 
-    creating bilingual solutions.""",
-    tools=[predict_market_trends, calculate_roi_potential, search_tool],
-    llm=llm,
-    max_iter=4,
-    verbose=True
-)
-
-business_analyst = Agent(
-    role="Tourism Business Operations Analyst",
-    goal="Analyze operational challenges and technology adoption barriers specific to Cabo businesses to ensure proposed solutions are practical and implementable.",
-    backstory="""You've worked with dozens of hotels and tour operators in Los Cabos, understanding 
-    their operational challenges, staff capabilities, and technology infrastructure. You know what 
-    solutions will actually work vs. what sounds good on paper.""",
-    tools=[analyze_competitors, search_tool, website_tool],
-    llm=llm,
-    max_iter=3,
-    verbose=True
-)
-
-implementation_strategist = Agent(
-    role="Market Entry & Implementation Strategist",
-    goal="Create detailed, actionable implementation plans that consider local market conditions, partnerships, and go-to-market strategies specific to Cabo.",
-    backstory="""You've successfully launched multiple tech products in Mexican tourism markets. 
-    You understand local regulations, partnership dynamics, and have connections with key stakeholders 
-    in Los Cabos. You're skilled at creating phased rollout plans that minimize risk.""",
-    tools=[search_tool, website_tool],
-    llm=llm,
-    max_iter=3,
-    verbose=True
-)
+def build_agents(llm: Any = None) -> Dict[str, Any]:
+    """Create the five specialist agents, keyed by name"""
+    from crewai import Agent
+    
+    llm = llm or get_component("llm")
+    search_tool = get_component("search_tool")
+    website_tool = get_component("website_tool")
+    csv_tool = get_component("csv_tool")
+    # Scraped review/listing archives are browsed, grepped and paged rather than loaded whole
+    archive_tools = [get_component("directory_tool"), get_component("grep_tool"), get_component("file_tool")]
+    
+    market_researcher = Agent(
+        role="Cabo Tourism Market Research Specialist",
+        goal="Identify specific, actionable market gaps in Cabo San Lucas tourism sector with focus on luxury resorts, adventure tourism, and wellness retreats.",
+        backstory="""You are a market research specialist with 15 years experience in Mexican tourism markets, 
+        particularly Los Cabos. You have deep connections with local hotel associations, tour operators, 
+        and understand both American/Canadian tourist preferences and local business challenges. 
+        You're fluent in English and Spanish market dynamics.""",
+        tools=[analyze_cabo_tourism_data, analyze_competitors, search_tool, website_tool, csv_tool,
+               *archive_tools],
+        llm=llm,
+        max_iter=5,
+        verbose=True
+    )
+
+    customer_insights_analyst = Agent(
+        role="Customer Experience & Sentiment Analyst",
+        goal="Extract deep insights from customer feedback across all platforms to identify unmet needs and pain points in Cabo tourism experiences.",
+        backstory="""You specialize in analyzing customer behavior and sentiment in luxury tourism markets. 
+        You're an expert at reading between the lines of reviews and understanding what customers really want 
+        but aren't explicitly saying. You have experience with both English and Spanish-speaking markets.""",
+        tools=[analyze_customer_sentiment, search_tool, website_tool, csv_tool, *archive_tools],
+        llm=llm,
+        max_iter=4,
+        verbose=True
+    )
+
+    product_strategist = Agent(
+        role="AI Product Strategy Specialist",
+        goal="Design innovative AI-powered solutions specifically tailored for Cabo's tourism market that solve real problems and generate measurable ROI.",
+        backstory="""You're a product strategist who has successfully launched 10+ AI products in the 
+        hospitality industry. You understand the technical limitations of businesses in Mexico and know 
+        how to create solutions that work with existing infrastructure. You're particularly skilled at 
+        creating bilingual solutions.""",
+        tools=[predict_market_trends, calculate_roi_potential, search_tool],
+        llm=llm,
+        max_iter=4,
+        verbose=True
+    )
+
+    business_analyst = Agent(
+        role="Tourism Business Operations Analyst",
+        goal="Analyze operational challenges and technology adoption barriers specific to Cabo businesses to ensure proposed solutions are practical and implementable.",
+        backstory="""You've worked with dozens of hotels and tour operators in Los Cabos, understanding 
+        their operational challenges, staff capabilities, and technology infrastructure. You know what 
+        solutions will actually work vs. what sounds good on paper.""",
+        tools=[analyze_competitors, search_tool, website_tool, csv_tool, *archive_tools],
+        llm=llm,
+        max_iter=3,
+        verbose=True
+    )
+
+    implementation_strategist = Agent(
+        role="Market Entry & Implementation Strategist",
+        goal="Create detailed, actionable implementation plans that consider local market conditions, partnerships, and go-to-market strategies specific to Cabo.",
+        backstory="""You've successfully launched multiple tech products in Mexican tourism markets. 
+        You understand local regulations, partnership dynamics, and have connections with key stakeholders 
+        in Los Cabos. You're skilled at creating phased rollout plans that minimize risk.""",
+        tools=[search_tool, website_tool],
+        llm=llm,
+        max_iter=3,
+        verbose=True
+    )
+    
+    return {
+        "market_researcher": market_researcher,
+        "customer_insights_analyst": customer_insights_analyst,
+        "product_strategist": product_strategist,
+        "business_analyst": business_analyst,
+        "implementation_strategist": implementation_strategist
+    }
 
 # Enhanced Tasks with more specific outputs
-market_analysis_task = Task(
-    description="""
-    Conduct a comprehensive analysis of the Cabo San Lucas tourism market for 2025:
-    
-    1. Analyze current market conditions:
-       - Visitor demographics and spending patterns
-       - Seasonal trends and occupancy rates
-       - Popular activities and emerging trends
-    
-    2. Identify specific market gaps in:
-       - Luxury resort operations and guest experience
-       - Adventure tourism (fishing, water sports, ATV tours)
-       - Wellness and spa services
-       - Restaurant and dining experiences
-       - Transportation and logistics
-    
-    3. Analyze technology adoption:
-       - Current digital tools used by businesses
-       - Pain points with existing solutions
-       - Barriers to technology adoption
-    
-    4. Focus on opportunities for:
-       - AI-powered customer service (bilingual capabilities)
-       - Dynamic pricing optimization
-       - Personalized guest experiences
-       - Operational efficiency tools
-       - Marketing automation
-    
-    Provide specific examples and data points for each gap identified.
-    """,
-    agent=market_researcher,
-    expected_output="""A detailed market analysis report containing:
-    - 5-7 specific market gaps with supporting data
-    - Market size estimates for each opportunity
-    - Current competitor landscape
-    - Technology readiness assessment
-    - Ranked opportunities by potential impact"""
-)
-
-customer_insights_task = Task(
-    description="""
-    Analyze customer sentiment and extract insights from reviews and feedback:
-    
-    1. Analyze reviews from TripAdvisor, Google, Yelp for:
-       - Hotels and resorts
-       - Tour operators
-       - Restaurants
-       - Transportation services
-    
-    2. Identify common pain points:
-       - Communication issues (language barriers)
-       - Booking and reservation problems
-       - Pricing transparency concerns
-       - Service quality inconsistencies
-       - Technology frustrations
-    
-    3. Extract positive feedback patterns:
-       - What customers love about Cabo
-       - Services that exceed expectations
-       - Features customers are willing to pay premium for
-    
-    4. Identify unmet needs and wishes:
-       - Services customers expect but don't find
-       - Technology features requested
-       - Experience gaps between expectation and reality
-    
-    Focus on actionable insights that can be addressed with AI/technology solutions.
-    """,
-    agent=customer_insights_analyst,
-    expected_output="""A customer insights report with:
-    - Top 10 customer pain points with frequency data
-    - Sentiment analysis by business category
-    - Specific feature requests and unmet needs
-    - Opportunity areas for AI solutions
-    - Customer personas and their specific needs"""
-)
-
-solution_design_task = Task(
-    description="""
-    Based on market gaps and customer insights, design 3 specific AI-powered products:
-    
-    1. AI Customer Insights Dashboard:
-       - Real-time sentiment analysis
-       - Predictive analytics for customer behavior
-       - Automated response suggestions
-       - Multilingual support (English/Spanish)
-    
-    2. Bilingual AI Concierge Chatbot:
-       - Natural conversation in English/Spanish
-       - Integration with booking systems
-       - Local recommendations engine
-       - 24/7 availability with escalation
-    
-    3. Dynamic Pricing & Revenue Optimization Tool:
-       - Market demand analysis
-       - Competitor pricing monitoring
-       - Seasonal adjustment algorithms
-       - Occupancy optimization
-    
-    For each product:
-    - Define core features and capabilities
-    - Identify technical requirements
-    - Estimate development complexity
-    - Calculate potential ROI
-    - Define success metrics
-    """,
-    agent=product_strategist,
-    expected_output="""Product strategy document with:
-    - Detailed product specifications for each solution
-    - Feature prioritization matrix
-    - Technical architecture overview
-    - ROI projections with assumptions
-    - Competitive advantage analysis"""
-)
-
-feasibility_task = Task(
-    description="""
-    Analyze the feasibility of implementing the proposed solutions in Cabo market:
-    
-    1. Technical feasibility:
-       - Internet infrastructure reliability
-       - Integration with existing systems
-       - Staff technical capabilities
-       - Support and maintenance considerations
-    
-    2. Business feasibility:
-       - Budget constraints of target businesses
-       - Decision-making processes
-       - Seasonal cash flow impacts
-       - ROI timeline expectations
-    
-    3. Market feasibility:
-       - Competitor analysis
-       - Pricing sensitivity
-       - Market education needs
-       - Partnership opportunities
-    
-    4. Regulatory considerations:
-       - Data privacy laws (Mexican and international)
-       - Business licensing requirements
-       - Tax implications
-       - Cross-border data transfer rules
-    
-    Provide honest assessment of challenges and mitigation strategies.
-    """,
-    agent=business_analyst,
-    expected_output="""Feasibility analysis report with:
-    - Technical implementation challenges and solutions
-    - Business model recommendations
-    - Risk assessment matrix
-    - Mitigation strategies
-    - Go/No-go recommendations for each product"""
-)
-
-implementation_roadmap_task = Task(
-    description="""
-    Create a detailed 6-month implementation roadmap for the highest-priority product:
-    
-    1. Phase 1 (Months 1-2): Foundation
-       - Team assembly and training
-       - Technical infrastructure setup
-       - Initial partnership negotiations
-       - MVP development
-    
-    2. Phase 2 (Months 3-4): Pilot Program
-       - Select 3-5 pilot partners
-       - Deploy MVP with close support
-       - Gather feedback and iterate
-       - Refine pricing model
-    
-    3. Phase 3 (Months 5-6): Market Launch
-       - Full product launch
-       - Marketing campaign (focus on case studies)
-       - Sales team activation
-       - Support system establishment
-    
-    Include:
-    - Specific milestones and deliverables
-    - Resource requirements (team, budget)
-    - Partnership strategy
-    - Marketing and sales plan
-    - Success metrics and KPIs
-    """,
-    agent=implementation_strategist,
-    expected_output="""Implementation roadmap containing:
-    - Detailed timeline with milestones
-    - Resource allocation plan
-    - Budget breakdown
-    - Risk mitigation timeline
-    - Launch strategy with specific tactics
-    - First 10 customer acquisition plan"""
-)
+def build_tasks(agents: Dict[str, Any]) -> Dict[str, Any]:
+    """Create the five research tasks wired to their agents, keyed by name"""
+    from crewai import Task
+    
+    market_researcher = agents["market_researcher"]
+    customer_insights_analyst = agents["customer_insights_analyst"]
+    product_strategist = agents["product_strategist"]
+    business_analyst = agents["business_analyst"]
+    implementation_strategist = agents["implementation_strategist"]
+    
+    market_analysis_task = Task(
+        name="market_analysis",
+        description="""
+        Conduct a comprehensive analysis of the Cabo San Lucas tourism market for 2025:
+        
+        1. Analyze current market conditions:
+           - Visitor demographics and spending patterns
+           - Seasonal trends and occupancy rates
+           - Popular activities and emerging trends
+        
+        2. Identify specific market gaps in:
+           - Luxury resort operations and guest experience
+           - Adventure tourism (fishing, water sports, ATV tours)
+           - Wellness and spa services
+           - Restaurant and dining experiences
+           - Transportation and logistics
+        
+        3. Analyze technology adoption:
+           - Current digital tools used by businesses
+           - Pain points with existing solutions
+           - Barriers to technology adoption
+        
+        4. Focus on opportunities for:
+           - AI-powered customer service (bilingual capabilities)
+           - Dynamic pricing optimization
+           - Personalized guest experiences
+           - Operational efficiency tools
+           - Marketing automation
+        
+        Provide specific examples and data points for each gap identified.
+        """,
+        agent=market_researcher,
+        expected_output="""A detailed market analysis report containing:
+        - 5-7 specific market gaps with supporting data
+        - Market size estimates for each opportunity
+        - Current competitor landscape
+        - Technology readiness assessment
+        - Ranked opportunities by potential impact
+        Return JSON: a "summary" of the analysis and a "gaps" list ranked by impact.""",
+        output_pydantic=MarketGapReport
+    )
+
+    customer_insights_task = Task(
+        name="customer_insights",
+        description="""
+        Analyze customer sentiment and extract insights from reviews and feedback:
+        
+        1. Analyze reviews from TripAdvisor, Google, Yelp for:
+           - Hotels and resorts
+           - Tour operators
+           - Restaurants
+           - Transportation services
+        
+        2. Identify common pain points:
+           - Communication issues (language barriers)
+           - Booking and reservation problems
+           - Pricing transparency concerns
+           - Service quality inconsistencies
+           - Technology frustrations
+        
+        3. Extract positive feedback patterns:
+           - What customers love about Cabo
+           - Services that exceed expectations
+           - Features customers are willing to pay premium for
+        
+        4. Identify unmet needs and wishes:
+           - Services customers expect but don't find
+           - Technology features requested
+           - Experience gaps between expectation and reality
+        
+        Focus on actionable insights that can be addressed with AI/technology solutions.
+        """,
+        agent=customer_insights_analyst,
+        context=[],  # Independent of market analysis, runs alongside it
+        expected_output="""A customer insights report with:
+        - Top 10 customer pain points with frequency data
+        - Sentiment analysis by business category
+        - Specific feature requests and unmet needs
+        - Opportunity areas for AI solutions
+        - Customer personas and their specific needs"""
+    )
+
+    solution_design_task = Task(
+        name="solution_design",
+        description="""
+        Based on market gaps and customer insights, design 3 specific AI-powered products:
+        
+        1. AI Customer Insights Dashboard:
+           - Real-time sentiment analysis
+           - Predictive analytics for customer behavior
+           - Automated response suggestions
+           - Multilingual support (English/Spanish)
+        
+        2. Bilingual AI Concierge Chatbot:
+           - Natural conversation in English/Spanish
+           - Integration with booking systems
+           - Local recommendations engine
+           - 24/7 availability with escalation
+        
+        3. Dynamic Pricing & Revenue Optimization Tool:
+           - Market demand analysis
+           - Competitor pricing monitoring
+           - Seasonal adjustment algorithms
+           - Occupancy optimization
+        
+        For each product:
+        - Define core features and capabilities
+        - Identify technical requirements
+        - Estimate development complexity
+        - Calculate potential ROI
+        - Define success metrics
+        """,
+        agent=product_strategist,
+        context=[market_analysis_task, customer_insights_task],
+        expected_output="""Product strategy document with:
+        - Detailed product specifications for each solution
+        - Feature prioritization matrix
+        - Technical architecture overview
+        - ROI projections with assumptions
+        - Competitive advantage analysis
+        Return JSON: a "summary" of the strategy and a "features" list covering all products.""",
+        output_pydantic=ProductFeatureReport
+    )
+
+    feasibility_task = Task(
+        name="feasibility",
+        description="""
+        Analyze the feasibility of implementing the proposed solutions in Cabo market:
+        
+        1. Technical feasibility:
+           - Internet infrastructure reliability
+           - Integration with existing systems
+           - Staff technical capabilities
+           - Support and maintenance considerations
+        
+        2. Business feasibility:
+           - Budget constraints of target businesses
+           - Decision-making processes
+           - Seasonal cash flow impacts
+           - ROI timeline expectations
+        
+        3. Market feasibility:
+           - Competitor analysis
+           - Pricing sensitivity
+           - Market education needs
+           - Partnership opportunities
+        
+        4. Regulatory considerations:
+           - Data privacy laws (Mexican and international)
+           - Business licensing requirements
+           - Tax implications
+           - Cross-border data transfer rules
+        
+        Provide honest assessment of challenges and mitigation strategies.
+        """,
+        agent=business_analyst,
+        context=[market_analysis_task, customer_insights_task, solution_design_task],
+        expected_output="""Feasibility analysis report with:
+        - Technical implementation challenges and solutions
+        - Business model recommendations
+        - Risk assessment matrix
+        - Mitigation strategies
+        - Go/No-go recommendations for each product"""
+    )
+
+    implementation_roadmap_task = Task(
+        name="implementation_roadmap",
+        description="""
+        Create a detailed 6-month implementation roadmap for the highest-priority product:
+        
+        1. Phase 1 (Months 1-2): Foundation
+           - Team assembly and training
+           - Technical infrastructure setup
+           - Initial partnership negotiations
+           - MVP development
+        
+        2. Phase 2 (Months 3-4): Pilot Program
+           - Select 3-5 pilot partners
+           - Deploy MVP with close support
+           - Gather feedback and iterate
+           - Refine pricing model
+        
+        3. Phase 3 (Months 5-6): Market Launch
+           - Full product launch
+           - Marketing campaign (focus on case studies)
+           - Sales team activation
+           - Support system establishment
+        
+        Include:
+        - Specific milestones and deliverables
+        - Resource requirements (team, budget)
+        - Partnership strategy
+        - Marketing and sales plan
+        - Success metrics and KPIs
+        """,
+        agent=implementation_strategist,
+        context=[market_analysis_task, customer_insights_task, solution_design_task, feasibility_task],
+        expected_output="""Implementation roadmap containing:
+        - Detailed timeline with milestones
+        - Resource allocation plan
+        - Budget breakdown
+        - Risk mitigation timeline
+        - Launch strategy with specific tactics
+        - First 10 customer acquisition plan"""
+    )
+    
+    return {
+        "market_analysis_task": market_analysis_task,
+        "customer_insights_task": customer_insights_task,
+        "solution_design_task": solution_design_task,
+        "feasibility_task": feasibility_task,
+        "implementation_roadmap_task": implementation_roadmap_task
+    }
 
 # Create the crew with enhanced configuration
-cabo_research_crew = Crew(
-    agents=[
-        market_researcher,
-        customer_insights_analyst,
-        product_strategist,
-        business_analyst,
-        implementation_strategist
-    ],
-    tasks=[
-        market_analysis_task,
-        customer_insights_task,
-        solution_design_task,
-        feasibility_task,
-        implementation_roadmap_task
-    ],
-    process=Process.sequential,
-    memory=True,  # Enable memory for better context retention
-    cache=True,   # Enable caching for efficiency
-    max_rpm=10,   # Rate limiting for API calls
-    verbose=True
-)
-
-def save_results(result: Any, filename: str = None):
-    """Save results with timestamp and structure"""
-    if filename is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"cabo_market_research_{timestamp}.json"
-    
-    output = {
-        "timestamp": datetime.now().isoformat(),
-        "research_type": "Cabo Tourism Market Analysis",
-        "result": str(result),
-        "metadata": {
-            "crew_size": len(cabo_research_crew.agents),
-            "tasks_completed": len(cabo_research_crew.tasks),
-        }
+class CrewConfig(BaseModel):
+    """Settings for building a research crew"""
+    memory: bool = Field(default=True, description="Enable memory for better context retention")
+    cache: bool = Field(default=True, description="Enable caching for efficiency")
+    max_rpm: Optional[int] = Field(
+        default=None,
+        description="Static per-crew cap; by default cabo_rate_limit limits all crews per provider"
+    )
+    verbose: bool = Field(default=True, description="Detailed console logging")
+
+def build_crew(config: Optional[CrewConfig] = None) -> Any:
+    """Build a fresh research crew; shared LLM and tools are created on first use"""
+    from crewai import Crew, Process
+    
+    config = config or CrewConfig()
+    agents = build_agents()
+    tasks = build_tasks(agents)
+    
+    return Crew(
+        agents=list(agents.values()),
+        tasks=list(tasks.values()),
+        process=Process.sequential,  # kickoff() order; run_task_graph() uses task context instead
+        memory=config.memory,
+        cache=config.cache,
+        max_rpm=config.max_rpm,
+        verbose=config.verbose
+    )
+
+_default_crew = None
+
+def get_crew() -> Any:
+    """Return the module's default crew, building it on first use"""
+    global _default_crew
+    if _default_crew is None:
+        with _components_lock:
+            if _default_crew is None:
+                _default_crew = build_crew()
+    return _default_crew
+
+def __getattr__(name: str) -> Any:
+    # Keep the old module-level names working without building anything at import
+    if name == "cabo_research_crew":
+        return get_crew()
+    if name in COMPONENT_FACTORIES:
+        return get_component(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def save_results(result: Any, filename: str = None, crew: Any = None,
+                 metrics: Optional[Dict[str, Any]] = None, task_outputs: Optional[List[Any]] = None,
+                 writer: Any = None):
+    """
+    Close out a run's streamed JSONL/TXT artifacts and index it in the results store.
+
+    With a writer the task outputs were already appended as each task finished and
+    only the summary is added here; without one they are streamed now. metrics is
+    the instrumentation summary.
+    """
+    from cabo_result_writer import ResultWriter
+    crew = crew or get_crew()
+    outputs = task_outputs or [result]
+    if writer is None:
+        run_id = (metrics or {}).get("run_id") or datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.splitext(filename)[0] if filename else f"cabo_market_research_{run_id}"
+        writer = ResultWriter(base, run_id)
+        for output in outputs:
+            writer.write_task(None, output)
+    
+    # Validated MarketGap / ProductFeature lists, queryable without re-parsing the prose
+    structured = collect_structured(outputs)
+    metadata = {
+        "crew_size": len(crew.agents),
+        "tasks_completed": len(crew.tasks),
+        "instrumentation": metrics,
     }
+    writer.finish({"structured": structured, "metadata": metadata})
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
-    
-    # Also save a human-readable version
-    txt_filename = filename.replace('.json', '.txt')
-    with open(txt_filename, 'w', encoding='utf-8') as f:
-        f.write(f"Cabo Tourism Market Research Report\n")
-        f.write(f"Generated: {output['timestamp']}\n")
-        f.write("="*80 + "\n\n")
-        f.write(str(result))
+    # Index the run for cross-run trend queries (see cabo_results_store)
+    try:
+        from cabo_results_store import get_results_store
+        get_results_store().record_run(
+            writer.run_id,
+            writer.started_at,
+            research_type=writer.research_type,
+            crew_size=len(crew.agents),
+            task_outputs=[
+                {"task": getattr(o, "name", None), "agent": getattr(o, "agent", None), "output": str(o)}
+                for o in outputs
+            ],
+            structured=structured,
+            metrics=metrics,
+            source_file=writer.jsonl_path,
+        )
+    except Exception as e:
+        print(f"Warning: could not record run in results store: {e}")
     
-    return filename, txt_filename
+    return writer.jsonl_path, writer.txt_path
 
 # Main execution
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cabo Tourism Market Research Crew")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Resume a failed run, skipping tasks already checkpointed")
+    args = parser.parse_args()
+    
+    from cabo_search import get_search_cache
+    from cabo_llm import LLM_CACHE_MODE, get_llm_cache
+    from cabo_scheduler import run_task_graph
+    from cabo_checkpoint import CheckpointStore
+    from cabo_result_writer import ResultWriter
+    from cabo_instrumentation import current_agent, start_run, stop_run
+    import cabo_query_dedup
+    
+    cabo_research_crew = get_crew()
+    
     print("Starting Cabo Tourism Market Research Crew...")
     print("This analysis will identify opportunities for AI products in Cabo San Lucas tourism market")
     print("-" * 80)
     
+    checkpoint = CheckpointStore.resume(args.resume) if args.resume else CheckpointStore()
+    checkpoint.attach(cabo_research_crew)
+    completed = checkpoint.restore_outputs(cabo_research_crew)
+    print(f"Run ID: {checkpoint.run_id}")
+    if completed:
+        print(f"Resuming with {len(completed)} of {len(cabo_research_crew.tasks)} tasks already complete")
+    
+    # Task outputs are appended here as each task finishes; a resumed run continues the same files
+    writer = ResultWriter(f"cabo_market_research_{checkpoint.run_id}", checkpoint.run_id)
+    print(f"Streaming results to {writer.jsonl_path}")
+    
+    def on_task_complete(task, output):
+        writer.write_task(task, output)
+        checkpoint.on_task_complete(task, output)
+    
+    metrics = start_run(checkpoint.run_id)
+    cabo_query_dedup.start_run()
+    
     try:
-        # Execute the crew
-        result = cabo_research_crew.kickoff()
+        # Execute the crew, running independent tasks in parallel
+        task_outputs = run_task_graph(
+            cabo_research_crew,
+            on_task_complete=on_task_complete,
+            completed=completed,
+            on_task_start=lambda task: current_agent.set(task.agent.role)
+        )
+        result = task_outputs[-1]
+        summary = stop_run()
+        dedup = cabo_query_dedup.stop_run()
         
         # Save results
-        json_file, txt_file = save_results(result)
+        json_file, txt_file = save_results(result, crew=cabo_research_crew, metrics=summary,
+                                          task_outputs=task_outputs, writer=writer)
         
         print("\n" + "="*80)
         print("Research completed successfully!")
         print(f"Results saved to:")
-        print(f"  - JSON: {json_file}")
+        print(f"  - JSONL: {json_file}")
         print(f"  - Text: {txt_file}")
+        stats = get_search_cache().stats()
+        print(f"Search cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate)")
+        llm_stats = get_llm_cache().stats()
+        print(f"LLM cache ({LLM_CACHE_MODE}): {llm_stats['hits']} hits, {llm_stats['misses']} misses "
+              f"({llm_stats['hit_rate']:.0%} hit rate)")
+        print(f"Query dedup: {dedup['requests']} search requests, {dedup['collapsed']} "
+              f"collapsed into earlier equivalent queries")
+        totals = summary["totals"]
+        print(f"Estimated cost: ${totals['cost_usd']:.2f} "
+              f"({totals['prompt_tokens'] + totals['completion_tokens']} tokens, "
+              f"{totals['calls']} calls) - per-call metrics in {summary['events_file']}")
+        if summary["over_budget"]:
+            print(f"WARNING: cost exceeded MAX_COST_PER_ANALYSIS (${summary['budget_usd']:.2f})")
         print("="*80)
         
     except Exception as e:
+        stop_run()
+        writer.close()
         print(f"\nError during execution: {str(e)}")
-        print("Partial results may have been generated.")
\ No newline at end of file
+        print(f"Partial results: {writer.jsonl_path}")
+        print(f"Per-call metrics so far: {metrics.path}")
+        print(f"Completed tasks are checkpointed in {checkpoint.path}")
+        print(f"Resume with: python3 {os.path.basename(__file__)} --resume {checkpoint.run_id}")
+    finally:
+        # Never leave a run's deduplicator active (and its cached results alive) after a failure
+        cabo_query_dedup.stop_run()
@@ -6,10 +6,10 @@ This file shows how to enhance the market research crew with MCP servers
 
 import os
 from crewai import Agent, Task, Crew, Process
-from crewai_tools import MCPServerAdapter
 from mcp import StdioServerParameters
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from cabo_mcp_pool import get_mcp_pool
 
 load_dotenv()
 
@@ -22,7 +22,13 @@ def create_tourism_data_mcp():
         env={
             "GOOGLE_PLACES_API_KEY": os.getenv("GOOGLE_PLACES_API_KEY"),
             "TRIPADVISOR_API_KEY": os.getenv("TRIPADVISOR_API_KEY"),
-            "TOURISM_DB_URL": os.getenv("TOURISM_DB_URL")
+            "TOURISM_DB_URL": os.getenv("TOURISM_DB_URL"),
+            "TOURISM_STATS_DB": os.getenv("TOURISM_STATS_DB", "data/tourism_stats.sqlite3"),
+            "PLACES_MAX_IN_FLIGHT": os.getenv("PLACES_MAX_IN_FLIGHT", "8"),
+            "PLACES_HTTP_TIMEOUT": os.getenv("PLACES_HTTP_TIMEOUT", "15"),
+            "PLACES_STORE_DIR": os.getenv("PLACES_STORE_DIR", "data/places"),
+            "PLACES_RPM": os.getenv("PLACES_RPM", "600"),
+            "RATE_LIMIT_DB": os.getenv("RATE_LIMIT_DB", "")
         }
     )
 
@@ -33,7 +39,13 @@ def create_sentiment_analysis_mcp():
         args=["mcp_servers/sentiment_server.py"],
         env={
             "HUGGINGFACE_API_KEY": os.getenv("HUGGINGFACE_API_KEY"),
-            "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY")
+            "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
+            "SENTIMENT_MODEL": os.getenv("SENTIMENT_MODEL", "cardiffnlp/twitter-xlm-roberta-base-sentiment"),
+            "SENTIMENT_BATCH_SIZE": os.getenv("SENTIMENT_BATCH_SIZE", "32"),
+            "SENTIMENT_MAX_LENGTH": os.getenv("SENTIMENT_MAX_LENGTH", "256"),
+            "SENTIMENT_THREADS": os.getenv("SENTIMENT_THREADS", "0"),
+            "TREND_STORE_PATH": os.getenv("TREND_STORE_PATH", "data/sentiment_trends.npz"),
+            "TREND_EWMA_HALFLIFE": os.getenv("TREND_EWMA_HALFLIFE", "14")
         }
     )
 
@@ -54,87 +66,90 @@ def create_enhanced_cabo_crew():
     
     llm = ChatOpenAI(model="gpt-4-turbo-preview", temperature=0.3)
     
-    # Set up MCP servers
-    tourism_server = create_tourism_data_mcp()
-    sentiment_server = create_sentiment_analysis_mcp()
-    competitive_server = create_competitive_intelligence_mcp()
+    # Servers stay warm in the process-wide pool, so later crews reuse them
+    # instead of spawning fresh processes; the returned tools outlive this call
+    pool = get_mcp_pool()
+    pool.register("tourism", create_tourism_data_mcp())
+    pool.register("sentiment", create_sentiment_analysis_mcp())
+    pool.register("competitive", create_competitive_intelligence_mcp())
     
-    # Create MCP adapters
-    with MCPServerAdapter(tourism_server) as tourism_tools, \
-         MCPServerAdapter(sentiment_server) as sentiment_tools, \
-         MCPServerAdapter(competitive_server) as competitive_tools:
-        
-        # Enhanced agents with MCP tools
-        tourism_data_analyst = Agent(
-            role="Tourism Data Intelligence Specialist",
-            goal="Gather and analyze comprehensive tourism data using specialized tools",
-            backstory="""Expert in tourism data analysis with access to real-time APIs 
-            for Google Places, TripAdvisor, and tourism databases.""",
-            tools=list(tourism_tools),  # All tools from tourism MCP server
-            llm=llm,
-            verbose=True
-        )
-        
-        sentiment_analyst = Agent(
-            role="Advanced Sentiment Analysis Specialist",
-            goal="Perform deep sentiment analysis using AI models",
-            backstory="""Specialist in NLP and sentiment analysis with access to 
-            state-of-the-art language models for multilingual sentiment analysis.""",
-            tools=list(sentiment_tools),  # All tools from sentiment MCP server
-            llm=llm,
-            verbose=True
-        )
-        
-        competitive_analyst = Agent(
-            role="Competitive Intelligence Analyst", 
-            goal="Gather competitive intelligence using web analytics tools",
-            backstory="""Expert in competitive analysis with access to SEMrush, 
-            SimilarWeb, and other intelligence gathering tools.""",
-            tools=list(competitive_tools),  # All tools from competitive MCP server
-            llm=llm,
-            verbose=True
-        )
-        
-        # Tasks designed to leverage MCP tools
-        enhanced_data_task = Task(
-            description="""Use tourism data tools to gather comprehensive market data:
-            1. Get real-time Google Places data for Cabo businesses
-            2. Extract TripAdvisor review analytics
-            3. Query tourism database for visitor statistics
-            4. Analyze seasonal booking patterns""",
-            agent=tourism_data_analyst,
-            expected_output="Comprehensive dataset with real-time tourism metrics"
-        )
-        
-        sentiment_task = Task(
-            description="""Perform advanced sentiment analysis on customer feedback:
-            1. Analyze Spanish and English reviews separately
-            2. Extract emotion patterns and sentiment trends
-            3. Identify linguistic patterns in complaints
-            4. Generate sentiment predictions""",
-            agent=sentiment_analyst,
-            expected_output="Detailed sentiment analysis with emotion mapping"
-        )
-        
-        competitive_task = Task(
-            description="""Gather competitive intelligence:
-            1. Analyze competitor website traffic and rankings
-            2. Extract pricing intelligence from competitor sites
-            3. Monitor competitor marketing campaigns
-            4. Assess market positioning strategies""",
-            agent=competitive_analyst,
-            expected_output="Competitive intelligence report with actionable insights"
-        )
-        
-        # Create enhanced crew
-        crew = Crew(
-            agents=[tourism_data_analyst, sentiment_analyst, competitive_analyst],
-            tasks=[enhanced_data_task, sentiment_task, competitive_task],
-            process=Process.sequential,
-            verbose=True
-        )
-        
-        return crew
+    tourism_tools = pool.tools("tourism")
+    sentiment_tools = pool.tools("sentiment")
+    competitive_tools = pool.tools("competitive")
+    
+    # Enhanced agents with MCP tools
+    tourism_data_analyst = Agent(
+        role="Tourism Data Intelligence Specialist",
+        goal="Gather and analyze comprehensive tourism data using specialized tools",
+        backstory="""Expert in tourism data analysis with access to real-time APIs 
+        for Google Places, TripAdvisor, and tourism databases.""",
+        tools=list(tourism_tools),  # All tools from tourism MCP server
+        llm=llm,
+        verbose=True
+    )
+    
+    sentiment_analyst = Agent(
+        role="Advanced Sentiment Analysis Specialist",
+        goal="Perform deep sentiment analysis using AI models",
+        backstory="""Specialist in NLP and sentiment analysis with access to 
+        state-of-the-art language models for multilingual sentiment analysis.""",
+        tools=list(sentiment_tools),  # All tools from sentiment MCP server
+        llm=llm,
+        verbose=True
+    )
+    
+    competitive_analyst = Agent(
+        role="Competitive Intelligence Analyst", 
+        goal="Gather competitive intelligence using web analytics tools",
+        backstory="""Expert in competitive analysis with access to SEMrush, 
+        SimilarWeb, and other intelligence gathering tools.""",
+        tools=list(competitive_tools),  # All tools from competitive MCP server
+        llm=llm,
+        verbose=True
+    )
+    
+    # Tasks designed to leverage MCP tools
+    enhanced_data_task = Task(
+        description="""Use tourism data tools to gather comprehensive market data:
+        1. Get real-time Google Places data for Cabo businesses
+           (use collect_google_places for full-coverage business counts)
+        2. Extract TripAdvisor review analytics
+        3. Query tourism database for visitor statistics
+        4. Analyze seasonal booking patterns""",
+        agent=tourism_data_analyst,
+        expected_output="Comprehensive dataset with real-time tourism metrics"
+    )
+    
+    sentiment_task = Task(
+        description="""Perform advanced sentiment analysis on customer feedback:
+        1. Analyze Spanish and English reviews separately
+           (send whole review lists to analyze_multilingual_sentiment, not one review per call)
+        2. Extract themes and sentiment trends (give extract_themes a review file path for large corpora)
+        3. Identify linguistic patterns in complaints
+        4. Generate sentiment predictions""",
+        agent=sentiment_analyst,
+        expected_output="Detailed sentiment analysis with emotion mapping"
+    )
+    
+    competitive_task = Task(
+        description="""Gather competitive intelligence:
+        1. Analyze competitor website traffic and rankings
+        2. Extract pricing intelligence from competitor sites
+        3. Monitor competitor marketing campaigns
+        4. Assess market positioning strategies""",
+        agent=competitive_analyst,
+        expected_output="Competitive intelligence report with actionable insights"
+    )
+    
+    # Create enhanced crew
+    crew = Crew(
+        agents=[tourism_data_analyst, sentiment_analyst, competitive_analyst],
+        tasks=[enhanced_data_task, sentiment_task, competitive_task],
+        process=Process.sequential,
+        verbose=True
+    )
+    
+    return crew
 
 # Example MCP server implementations
 
@@ -149,39 +164,223 @@ Provides tools for gathering tourism-specific data
 import asyncio
 import json
 import os
-import requests
+import sys
+import aiohttp
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any, List, Optional
 
 app = Server("tourism-data-server")
 
-@app.tool()
-async def get_google_places_data(query: str, location: str = "Cabo San Lucas") -> Dict[str, Any]:
-    """Get Google Places data for tourism businesses"""
-    api_key = os.getenv("GOOGLE_PLACES_API_KEY")
-    if not api_key:
-        return {"error": "Google Places API key not configured"}
-    
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+PLACES_TEXT_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+PLACES_STORE_DIR = os.getenv("PLACES_STORE_DIR", "data/places")
+
+# Google only honours next_page_token a couple of seconds after issuing it
+PAGE_TOKEN_DELAY = 2.0
+PAGE_TOKEN_RETRIES = 5
+
+# HTTP client settings (connections are kept alive and reused across tool calls)
+HTTP_TIMEOUT = aiohttp.ClientTimeout(
+    total=float(os.getenv("PLACES_HTTP_TIMEOUT", "15")),
+    connect=float(os.getenv("PLACES_CONNECT_TIMEOUT", "5"))
+)
+MAX_CONNECTIONS = int(os.getenv("PLACES_MAX_CONNECTIONS", "20"))
+MAX_IN_FLIGHT = int(os.getenv("PLACES_MAX_IN_FLIGHT", "8"))
+
+_session: Optional[aiohttp.ClientSession] = None
+_in_flight: Optional[asyncio.Semaphore] = None
+
+# Share the Places rate limiter with the crew (cross-process when RATE_LIMIT_DB is set)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from cabo_rate_limit import get_limiter
+    from cabo_tourism_stats import get_tourism_store
+    places_limiter = get_limiter("places")
+except ImportError:
+    places_limiter = None
+    get_tourism_store = None
+
+MAX_THROTTLE_RETRIES = 5
+
+async def limiter_update(method, *args):
+    """Report to the Places limiter; SQLite-backed (cross-process) state is updated off the event loop"""
+    if places_limiter.blocking_state:
+        await asyncio.to_thread(method, *args)
+    else:
+        method(*args)
+
+# One collector at a time per Places store, so concurrent calls never interleave their dedup
+_store_locks: Dict[str, asyncio.Lock] = {}
+
+def get_session() -> aiohttp.ClientSession:
+    """Shared keep-alive session, created inside the running event loop"""
+    global _session, _in_flight
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            keepalive_timeout=60,
+            ttl_dns_cache=300
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+        _in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+    return _session
+
+async def fetch_json(url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """GET a JSON endpoint without blocking the event loop, backing off when throttled"""
+    session = get_session()
+    for _ in range(MAX_THROTTLE_RETRIES + 1):
+        if places_limiter:
+            # acquire_async runs SQLite-backed bucket IO in a worker thread itself
+            await places_limiter.acquire_async()
+        async with _in_flight:
+            async with session.get(url, params=params) as response:
+                if response.status == 429:
+                    retry_after = response.headers.get("Retry-After")
+                    if places_limiter:
+                        await limiter_update(places_limiter.on_throttle,
+                                             float(retry_after) if retry_after else None)
+                    else:
+                        await asyncio.sleep(float(retry_after or 5))
+                    continue
+                response.raise_for_status()
+                data = await response.json()
+        
+        # Places reports quota exhaustion in the body with HTTP 200
+        if data.get("status") == "OVER_QUERY_LIMIT":
+            if places_limiter:
+                await limiter_update(places_limiter.on_throttle)
+            else:
+                await asyncio.sleep(5)
+            continue
+        if places_limiter:
+            await limiter_update(places_limiter.on_success)
+        return data
+    raise RuntimeError(f"Google Places still throttled after {MAX_THROTTLE_RETRIES} retries")
+
+async def iter_places_pages(query: str, location: str, api_key: str,
+                            max_pages: int = 3) -> AsyncIterator[Dict[str, Any]]:
+    """Yield raw Places responses one page at a time, following next_page_token"""
     params = {
         "query": f"{query} {location}",
         "key": api_key,
         "type": "establishment"
     }
+    for page_number in range(max_pages):
+        if page_number == 0:
+            data = await fetch_json(PLACES_TEXT_SEARCH_URL, params)
+        else:
+            # The token becomes valid shortly after it is issued; retry while Google says it is not ready
+            for _ in range(PAGE_TOKEN_RETRIES):
+                await asyncio.sleep(PAGE_TOKEN_DELAY)
+                data = await fetch_json(PLACES_TEXT_SEARCH_URL, params)
+                if data.get("status") != "INVALID_REQUEST":
+                    break
+            else:
+                return
+        yield data
+        
+        token = data.get("next_page_token")
+        if not token:
+            return
+        params = {"pagetoken": token, "key": api_key}
+
+@app.tool()
+async def get_google_places_data(query: str, location: str = "Cabo San Lucas",
+                                 paginate: bool = False, max_pages: int = 3) -> Dict[str, Any]:
+    """Get Google Places data for tourism businesses (all pages when paginate=True)"""
+    api_key = os.getenv("GOOGLE_PLACES_API_KEY")
+    if not api_key:
+        return {"error": "Google Places API key not configured"}
     
     try:
-        response = requests.get(url, params=params)
-        data = response.json()
+        results, seen, status = [], set(), None
+        async for page in iter_places_pages(query, location, api_key, max_pages if paginate else 1):
+            status = page.get("status")
+            for place in page.get("results", []):
+                if place.get("place_id") not in seen:
+                    seen.add(place.get("place_id"))
+                    results.append(place)
         return {
-            "results": data.get("results", [])[:10],  # Limit to top 10
-            "status": data.get("status"),
+            "results": results if paginate else results[:10],  # Limit to top 10 unless paginating
+            "status": status,
             "query": query,
             "location": location
         }
+    except asyncio.TimeoutError:
+        return {"error": f"Google Places request timed out after {HTTP_TIMEOUT.total:.0f}s"}
     except Exception as e:
         return {"error": str(e)}
 
+def _load_seen_ids(store_path: str) -> set:
+    os.makedirs(PLACES_STORE_DIR, exist_ok=True)
+    seen = set()
+    if os.path.exists(store_path):
+        with open(store_path, encoding="utf-8") as f:
+            for line in f:
+                seen.add(json.loads(line)["place_id"])
+    return seen
+
+def _append_lines(store_path: str, lines: List[str]):
+    with open(store_path, "a", encoding="utf-8") as store:
+        store.writelines(lines)
+
+@app.tool()
+async def collect_google_places(queries: List[str], location: str = "Cabo San Lucas",
+                                max_pages: int = 3, store_name: str = "cabo_places",
+                                sample_size: int = 10) -> Dict[str, Any]:
+    """
+    Bulk-collect Places results for many queries into a local JSONL store.
+    
+    Every page is written to disk as it arrives and places are deduplicated by
+    place_id across queries (and across earlier calls using the same store), so
+    memory stays bounded to the set of seen ids plus a small sample.
+    """
+    api_key = os.getenv("GOOGLE_PLACES_API_KEY")
+    if not api_key:
+        return {"error": "Google Places API key not configured"}
+    
+    store_path = os.path.join(PLACES_STORE_DIR, f"{store_name}.jsonl")
+    
+    added, duplicates, pages, errors, sample = 0, 0, 0, [], []
+    async with _store_locks.setdefault(store_path, asyncio.Lock()):
+        # File IO runs in worker threads so other tool calls keep being served
+        seen = await asyncio.to_thread(_load_seen_ids, store_path)
+        existing = len(seen)
+        for query in queries:
+            try:
+                async for page in iter_places_pages(query, location, api_key, max_pages):
+                    pages += 1
+                    lines = []
+                    for place in page.get("results", []):
+                        place_id = place.get("place_id")
+                        if not place_id or place_id in seen:
+                            duplicates += 1
+                            continue
+                        seen.add(place_id)
+                        place["source_query"] = query
+                        lines.append(json.dumps(place, ensure_ascii=False) + "\\n")
+                        added += 1
+                        if len(sample) < sample_size:
+                            sample.append({
+                                k: place.get(k)
+                                for k in ("place_id", "name", "rating", "user_ratings_total", "types")
+                            })
+                    if lines:
+                        await asyncio.to_thread(_append_lines, store_path, lines)
+            except Exception as e:
+                errors.append({"query": query, "error": str(e)})
+    
+    return {
+        "store_path": store_path,
+        "queries": len(queries),
+        "pages_fetched": pages,
+        "new_places": added,
+        "duplicates_skipped": duplicates,
+        "total_places_in_store": existing + added,
+        "sample": sample,
+        "errors": errors
+    }
+
 @app.tool()
 async def analyze_tripadvisor_data(business_type: str) -> Dict[str, Any]:
     """Analyze TripAdvisor data for business insights"""
@@ -196,28 +395,51 @@ async def analyze_tripadvisor_data(business_type: str) -> Dict[str, Any]:
 
 @app.tool()
 async def get_tourism_statistics(metric: str, timeframe: str = "2024") -> Dict[str, Any]:
-    """Get tourism statistics from database"""
-    # Mock implementation - replace with actual database queries
-    stats = {
-        "visitor_count": {"2024": 2500000, "2023": 2200000},
-        "average_stay": {"2024": 4.5, "2023": 4.2},
-        "spending_per_visitor": {"2024": 1200, "2023": 1100}
-    }
+    """
+    Get tourism statistics from the local time-series store.
+    metric: visitor_count, average_stay, spending_per_visitor, occupancy_rate
+    or airport_arrivals; timeframe: a year ("2024"), month ("2024-03") or day.
+    """
+    if get_tourism_store is None:
+        return {"metric": metric, "timeframe": timeframe, "error": "Tourism statistics store not available"}
+    try:
+        return await asyncio.to_thread(lambda: get_tourism_store().statistic(metric, timeframe))
+    except ValueError as e:
+        return {"metric": metric, "timeframe": timeframe, "error": str(e)}
+
+@app.tool()
+async def get_seasonal_patterns(metric: str, granularity: str = "monthly", start: str = "",
+                                end: str = "") -> Dict[str, Any]:
+    """
+    Seasonal profile (average per calendar month, peak and low months) of a
+    tourism metric plus its monthly or yearly series between start and end.
+    """
+    if get_tourism_store is None:
+        return {"metric": metric, "error": "Tourism statistics store not available"}
     
-    return {
-        "metric": metric,
-        "timeframe": timeframe,
-        "value": stats.get(metric, {}).get(timeframe, "Data not available"),
-        "trend": "increasing" if timeframe == "2024" else "stable"
-    }
+    def query() -> Dict[str, Any]:
+        store = get_tourism_store()
+        return {
+            **store.seasonality(metric, start[:4], end[:4] or "~"),
+            "series": store.rollup(metric, granularity, start, end or "~"),
+        }
+    
+    try:
+        return await asyncio.to_thread(query)
+    except ValueError as e:
+        return {"metric": metric, "error": str(e)}
 
 async def main():
-    async with stdio_server() as streams:
-        await app.run(
-            streams.read_stream,
-            streams.write_stream,
-            app.create_initialization_options()
-        )
+    try:
+        async with stdio_server() as streams:
+            await app.run(
+                streams.read_stream,
+                streams.write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        if _session is not None:
+            await _session.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -234,71 +456,70 @@ Provides advanced sentiment analysis tools
 import asyncio
 import json
 import os
-from typing import Dict, Any, List
+import sys
+from typing import Dict, Any, List, Optional
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 
+# Scoring runs in-process on the shared engine from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cabo_sentiment_engine import get_engine
+from cabo_themes import extract_themes as run_theme_extraction
+from cabo_sentiment_trends import get_trend_store, ingest_points
+
 app = Server("sentiment-analysis-server")
 
+MAX_PER_TEXT_RESULTS = 200  # Cap per-review rows so responses stay small on stdio
+
 @app.tool()
-async def analyze_multilingual_sentiment(text: str, language: str = "auto") -> Dict[str, Any]:
-    """Analyze sentiment in multiple languages"""
-    # Mock implementation - replace with actual NLP models
-    sentiments = {
-        "positive": 0.6,
-        "negative": 0.2,
-        "neutral": 0.2
-    }
-    
-    emotions = {
-        "joy": 0.4,
-        "anger": 0.1,
-        "sadness": 0.1,
-        "fear": 0.05,
-        "surprise": 0.2,
-        "disgust": 0.05,
-        "trust": 0.5,
-        "anticipation": 0.3
-    }
-    
-    return {
-        "text": text[:100] + "..." if len(text) > 100 else text,
+async def analyze_multilingual_sentiment(texts: List[str], language: str = "auto",
+                                         per_text: bool = True) -> Dict[str, Any]:
+    """Analyze sentiment of a batch of English/Spanish reviews in one call"""
+    # Model inference is CPU-bound; keep the stdio event loop responsive
+    batch = await asyncio.to_thread(get_engine().score, texts)
+    result = {
         "language": language,
-        "sentiment_scores": sentiments,
-        "emotion_scores": emotions,
-        "overall_sentiment": "positive",
-        "confidence": 0.85
+        "model": get_engine().model_name,
+        **batch.summary()
     }
+    if per_text:
+        result["per_text"] = batch.per_text(MAX_PER_TEXT_RESULTS)
+        result["per_text_truncated"] = len(batch) > MAX_PER_TEXT_RESULTS
+    return result
 
 @app.tool()
-async def extract_themes(reviews: List[str]) -> Dict[str, Any]:
-    """Extract common themes from customer reviews"""
-    # Mock implementation - replace with actual theme extraction
-    themes = {
-        "service_quality": {"frequency": 45, "sentiment": "mixed"},
-        "food_quality": {"frequency": 38, "sentiment": "positive"},
-        "pricing": {"frequency": 32, "sentiment": "negative"},
-        "location": {"frequency": 28, "sentiment": "positive"},
-        "cleanliness": {"frequency": 25, "sentiment": "positive"}
-    }
-    
-    return {
-        "total_reviews_analyzed": len(reviews),
-        "themes": themes,
-        "top_theme": "service_quality",
-        "improvement_areas": ["pricing", "service_quality"]
-    }
+async def extract_themes(reviews: Optional[List[str]] = None, path: Optional[str] = None,
+                         text_field: str = "text", n_themes: int = 8) -> Dict[str, Any]:
+    """
+    Extract common themes and per-theme sentiment from customer reviews.
+    For large corpora pass path (a .txt, .jsonl or .csv file of reviews)
+    instead of the reviews themselves; the file is streamed in chunks.
+    """
+    if not reviews and not path:
+        return {"error": "Pass either reviews or path"}
+    return await asyncio.to_thread(
+        run_theme_extraction, reviews=reviews, path=path, text_field=text_field, n_themes=n_themes
+    )
 
 @app.tool()
-async def sentiment_trends(data_points: List[Dict]) -> Dict[str, Any]:
-    """Analyze sentiment trends over time"""
-    # Mock implementation for trend analysis
-    return {
-        "trend_direction": "improving",
-        "monthly_scores": [3.2, 3.4, 3.6, 3.8, 4.0, 4.1],
-        "key_improvements": ["faster service", "better communication"],
-        "persistent_issues": ["pricing transparency", "language barriers"]
-    }
+async def sentiment_trends(data_points: Optional[List[Dict]] = None, granularity: str = "month",
+                           periods: int = 6) -> Dict[str, Any]:
+    """
+    Analyze sentiment trends over time.
+    data_points like {"timestamp": "2025-03-01", "score": 0.4} (or "text" instead
+    of "score" to have it scored) are added to the running trend store first;
+    call with no points to query trends fed by earlier scrapes.
+    """
+    added = await asyncio.to_thread(ingest_points, data_points) if data_points else 0
+    summary = get_trend_store().summary(granularity, periods)
+    return {"points_added": added, **summary}
+
+@app.tool()
+async def sentiment_window(start: str, end: str) -> Dict[str, Any]:
+    """Mean, spread and count of sentiment scores between two ISO dates (inclusive)"""
+    store = get_trend_store()
+    return {**store.window(start, end), "ewma_at_end": store.ewma_at(end),
+            "change_points": [c for c in store.change_points(start) if c["date"] <= end]}
 
 async def main():
     async with stdio_server() as streams:
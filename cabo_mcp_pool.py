@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Warm MCP server pool for the Cabo research crews
+Keeps stdio MCP servers running across crew builds, health-checks and restarts
+them, and routes tool calls from concurrent crews to the least busy instance
+"""
+
+import atexit
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Type
+from crewai.tools import BaseTool
+from crewai_tools import MCPServerAdapter
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field, PrivateAttr, create_model
+from cabo_cache import PersistentCache, content_key
+
+load_dotenv()
+
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "1"))              # Instances per server
+MCP_HEALTH_INTERVAL = float(os.getenv("MCP_HEALTH_INTERVAL", "30"))  # Seconds between health checks
+MCP_MAX_RESTARTS = int(os.getenv("MCP_MAX_RESTARTS", "5"))         # Per instance before giving up
+STABLE_UPTIME_S = 600  # An instance that stayed up this long gets its restart budget back
+MCP_SCHEMA_CACHE_PATH = os.getenv("MCP_SCHEMA_CACHE_PATH", ".cabo_cache/mcp_tools.sqlite3")
+
+JSON_TYPES = {"string": str, "integer": int, "number": float, "boolean": bool,
+              "array": list, "object": dict}
+
+
+class MCPServerUnavailable(Exception):
+    """Raised when a server cannot be (re)started"""
+
+
+def _tool_description(tool: BaseTool) -> str:
+    # crewai prefixes descriptions with the tool name and arguments on init;
+    # keep only the server's own text so a proxy tool does not repeat it
+    return tool.description.split("Tool Description: ", 1)[-1]
+
+
+def server_fingerprint(params: Any) -> str:
+    """
+    Cache key for a server's tool list.
+
+    Covers the launch command, its arguments and the content of any script
+    file among them, so editing the server code invalidates the entry.
+    """
+    if isinstance(params, dict):
+        return content_key("mcp-tools", params)
+    args = list(getattr(params, "args", None) or [])
+    scripts = {}
+    for arg in args:
+        if os.path.isfile(arg):
+            with open(arg, "rb") as f:
+                scripts[arg] = hashlib.sha256(f.read()).hexdigest()
+    return content_key("mcp-tools", getattr(params, "command", None), args, scripts)
+
+
+def _schema_type(spec: Dict[str, Any]) -> Any:
+    # Optional fields arrive as anyOf [{type: X}, {type: null}]
+    for option in spec.get("anyOf", [spec]):
+        if option.get("type") == "array" and option.get("items"):
+            # Keep the item type so agents are told (and validated against) e.g. List[str]
+            item_type = _schema_type(option["items"])
+            return List[item_type]
+        if option.get("type") in JSON_TYPES:
+            return JSON_TYPES[option["type"]]
+    return Any
+
+
+def schema_model(tool_name: str, schema: Dict[str, Any]) -> Type[BaseModel]:
+    """Rebuild a tool's argument model from its cached JSON schema"""
+    required = set(schema.get("required", []))
+    fields: Dict[str, Any] = {}
+    for prop, spec in schema.get("properties", {}).items():
+        description = spec.get("description", "")
+        if prop in required:
+            fields[prop] = (_schema_type(spec), Field(description=description))
+        else:
+            fields[prop] = (Optional[_schema_type(spec)],
+                            Field(default=spec.get("default"), description=description))
+    model_name = "".join(part.title() for part in tool_name.replace("-", "_").split("_")) + "Input"
+    return create_model(model_name, **fields)
+
+
+def describe_tools(tools: Sequence[BaseTool]) -> List[Dict[str, Any]]:
+    """JSON-serializable name/description/argument schema of each tool"""
+    return [{
+        "name": tool.name,
+        "description": _tool_description(tool),
+        "schema": tool.args_schema.model_json_schema() if tool.args_schema else {},
+    } for tool in tools]
+
+
+def _session_thread(adapter: MCPServerAdapter) -> Optional[threading.Thread]:
+    # MCPAdapt runs the stdio session on a background thread that exits with the server.
+    # MCPServerAdapter has no public handle for it, so callers treat None as "not alive"
+    thread = getattr(getattr(adapter, "_adapter", None), "thread", None)
+    return thread if isinstance(thread, threading.Thread) else None
+
+
+class _ServerInstance:
+    """One running MCP server process and the crewai tools bound to its session"""
+
+    def __init__(self, name: str, params: Any):
+        self.name = name
+        self.params = params
+        self.adapter: Optional[MCPServerAdapter] = None
+        self.tools: Dict[str, BaseTool] = {}
+        self.in_use = 0
+        self.calls = 0
+        self.restarts = 0
+        self.started_at = 0.0
+        self.lock = threading.Lock()
+
+    def start(self):
+        adapter = MCPServerAdapter(self.params)
+        if _session_thread(adapter) is None:
+            adapter.stop()
+            raise MCPServerUnavailable(
+                f"MCP server {self.name!r} started, but this MCPServerAdapter version exposes "
+                f"no session thread to health-check it"
+            )
+        self.tools = {tool.name: tool for tool in adapter.tools}
+        self.adapter = adapter
+        self.started_at = time.time()
+
+    def alive(self) -> bool:
+        if self.adapter is None:
+            return False
+        thread = _session_thread(self.adapter)
+        return thread is not None and thread.is_alive()
+
+    def stop(self):
+        adapter, self.adapter = self.adapter, None
+        self.tools = {}
+        if adapter is not None:
+            try:
+                adapter.stop()
+            except Exception:
+                pass
+
+    def ensure_running(self):
+        """Start a never-started instance or restart a crashed one (caller holds self.lock)"""
+        if self.adapter is None:
+            self.start()
+        elif not self.alive():
+            self.restart()
+
+    def restart(self):
+        if time.time() - self.started_at > STABLE_UPTIME_S:
+            self.restarts = 0
+        if self.restarts >= MCP_MAX_RESTARTS:
+            raise MCPServerUnavailable(
+                f"MCP server {self.name!r} crashed {self.restarts} times; not restarting again"
+            )
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+
+class MCPServerPool:
+    """
+    Long-lived pool of stdio MCP servers shared by every crew in the process.
+
+    Servers are registered by name and started on first use (or by warm()).
+    Tool calls lease the least busy live instance of their server; a dead
+    instance is restarted transparently and the call retried once. A daemon
+    thread restarts crashed instances between calls.
+    """
+
+    def __init__(self, size: int = MCP_POOL_SIZE, health_interval: float = MCP_HEALTH_INTERVAL,
+                 schema_cache: Optional[PersistentCache] = None):
+        self.size = max(1, size)
+        self.health_interval = health_interval
+        self.schema_cache = schema_cache
+        self._params: Dict[str, Any] = {}
+        self._instances: Dict[str, List[_ServerInstance]] = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, params: Any):
+        """Declare a server; re-registering with new parameters restarts it on next use"""
+        with self._lock:
+            if name in self._params and self._params[name] != params:
+                for instance in self._instances.pop(name, []):
+                    instance.stop()
+            self._params[name] = params
+
+    def warm(self, names: Optional[Sequence[str]] = None):
+        """Start every instance of the given (default: all) servers now"""
+        for name in names or list(self._params):
+            for instance in self._get_instances(name):
+                with instance.lock:
+                    instance.ensure_running()
+
+    def _get_instances(self, name: str) -> List[_ServerInstance]:
+        with self._lock:
+            if name not in self._params:
+                raise KeyError(f"Unknown MCP server: {name}")
+            if name not in self._instances:
+                self._instances[name] = [_ServerInstance(name, self._params[name])
+                                         for _ in range(self.size)]
+            self._ensure_health_thread()
+            return self._instances[name]
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[_ServerInstance]:
+        """
+        Borrow the least busy instance of a server, starting or restarting it if needed.
+
+        Idle instances win over busy ones even if not yet started, so the pool
+        only grows to its full size under concurrent load.
+        """
+        instances = self._get_instances(name)
+        with self._lock:
+            instance = min(instances, key=lambda i: (i.in_use, not i.alive()))
+            instance.in_use += 1
+        try:
+            with instance.lock:
+                instance.ensure_running()
+            yield instance
+        finally:
+            with self._lock:
+                instance.in_use -= 1
+
+    def call_tool(self, server: str, tool_name: str, **kwargs: Any) -> Any:
+        """Run one tool on a live instance, restarting a crashed server and retrying once"""
+        for attempt in range(2):
+            with self.lease(server) as instance:
+                tool = instance.tools.get(tool_name)
+                if tool is None:
+                    # The cached tool list is stale; rediscover on the next tools() call
+                    self.invalidate_schemas(server)
+                    raise KeyError(f"MCP server {server!r} has no tool {tool_name!r}")
+                with self._lock:  # Same lock as in_use, so stats() reads consistent counters
+                    instance.calls += 1
+                try:
+                    return tool.run(**kwargs)
+                except Exception:
+                    if attempt or instance.alive():
+                        raise
+                    with instance.lock:
+                        if not instance.alive():
+                            instance.restart()
+
+    def _schema_key(self, name: str) -> str:
+        with self._lock:
+            if name not in self._params:
+                raise KeyError(f"Unknown MCP server: {name}")
+            return server_fingerprint(self._params[name])
+
+    def tools(self, name: str, tool_names: Optional[Sequence[str]] = None) -> List["PooledMCPTool"]:
+        """
+        crewai tools for a server that stay valid across server restarts.
+
+        With a schema cache, a server whose command, arguments and script are
+        unchanged gets its tools from the cache without being started; the
+        session is attached lazily on the first tool call.
+        """
+        key = self._schema_key(name)
+        described = self.schema_cache.get(key) if self.schema_cache else None
+        if described is None:
+            with self.lease(name) as instance:
+                described = describe_tools(list(instance.tools.values()))
+            if self.schema_cache:
+                self.schema_cache.set(key, described)
+        return [
+            PooledMCPTool.from_schema(name, spec, self)
+            for spec in described
+            if not tool_names or spec["name"] in tool_names
+        ]
+
+    def invalidate_schemas(self, name: str):
+        if self.schema_cache:
+            self.schema_cache.delete(self._schema_key(name))
+
+    def health_check(self):
+        """Restart instances whose server process has died"""
+        with self._lock:
+            instances = [i for group in self._instances.values() for i in group]
+        for instance in instances:
+            if instance.adapter is None or instance.alive():
+                continue
+            with instance.lock:
+                if instance.adapter is not None and not instance.alive():
+                    try:
+                        instance.restart()
+                    except Exception as e:
+                        print(f"MCP server {instance.name!r} restart failed: {e}")
+                        instance.stop()
+
+    def _ensure_health_thread(self):
+        if self._health_thread is None and self.health_interval > 0:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, name="mcp-pool-health", daemon=True
+            )
+            self._health_thread.start()
+
+    def _health_loop(self):
+        while not self._closed.wait(self.health_interval):
+            self.health_check()
+
+    def stats(self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            return {
+                name: [{"alive": i.alive(), "in_use": i.in_use, "calls": i.calls,
+                        "restarts": i.restarts, "uptime_s": round(time.time() - i.started_at, 1)
+                        if i.adapter else 0.0} for i in group]
+                for name, group in self._instances.items()
+            }
+
+    def shutdown(self):
+        self._closed.set()
+        with self._lock:
+            instances = [i for group in self._instances.values() for i in group]
+            self._instances.clear()
+        for instance in instances:
+            instance.stop()
+
+
+class PooledMCPTool(BaseTool):
+    """Proxy for an MCP tool that runs each call on whichever pool instance is live"""
+    server: str
+    tool_name: str
+
+    _pool: Any = PrivateAttr(default=None)
+
+    @classmethod
+    def from_schema(cls, server: str, spec: Dict[str, Any], pool: MCPServerPool) -> "PooledMCPTool":
+        """Build from a describe_tools() entry, live or cached"""
+        proxy = cls(
+            name=spec["name"],
+            description=spec["description"],
+            args_schema=schema_model(spec["name"], spec["schema"]),
+            server=server,
+            tool_name=spec["name"],
+        )
+        proxy._pool = pool
+        return proxy
+
+    def _run(self, **kwargs: Any) -> Any:
+        return self._pool.call_tool(self.server, self.tool_name, **kwargs)
+
+
+_pool: Optional[MCPServerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_mcp_pool() -> MCPServerPool:
+    """Process-wide MCP server pool, shut down when the interpreter exits"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MCPServerPool(schema_cache=PersistentCache(MCP_SCHEMA_CACHE_PATH, default_ttl=0))
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Structured output models for the Cabo research crew
+Pydantic models the tasks emit, plus fast batch validation and compact serialization
+"""
+
+from typing import Any, Dict, Iterable, List, Type, Union
+from pydantic import BaseModel, Field, TypeAdapter
+
+
+# Data models for structured output
+class MarketGap(BaseModel):
+    """Structured market gap analysis"""
+    gap_name: str = Field(description="Name of the identified market gap")
+    description: str = Field(description="Detailed description of the gap")
+    target_audience: str = Field(description="Who would benefit from addressing this gap")
+    estimated_market_size: str = Field(description="Rough estimate of market size")
+    competition_level: str = Field(description="Low/Medium/High competition")
+    implementation_difficulty: str = Field(description="Easy/Medium/Hard to implement")
+
+class ProductFeature(BaseModel):
+    """Structured product feature"""
+    feature_name: str = Field(description="Name of the feature")
+    description: str = Field(description="What the feature does")
+    priority: int = Field(description="Priority from 1-10")
+    estimated_dev_time: str = Field(description="Estimated development time")
+    roi_potential: str = Field(description="Low/Medium/High ROI potential")
+
+class MarketGapReport(BaseModel):
+    """Task output: market analysis narrative plus the gaps it identified"""
+    summary: str = Field(description="Market conditions, competitor landscape and technology readiness")
+    gaps: List[MarketGap] = Field(description="Specific market gaps, ranked by potential impact")
+
+class ProductFeatureReport(BaseModel):
+    """Task output: product strategy narrative plus prioritized features"""
+    summary: str = Field(description="Product specifications, architecture and ROI assumptions")
+    features: List[ProductFeature] = Field(description="Features across all products, with priorities")
+
+
+# Batch validation and serialization run in pydantic-core without per-item Python loops
+_gap_list = TypeAdapter(List[MarketGap])
+_feature_list = TypeAdapter(List[ProductFeature])
+
+JsonInput = Union[str, bytes]
+
+
+def validate_gaps(data: Union[JsonInput, List[Dict[str, Any]]]) -> List[MarketGap]:
+    """Validate a JSON array (or list of dicts) of market gaps in one pass"""
+    if isinstance(data, (str, bytes)):
+        return _gap_list.validate_json(data)
+    return _gap_list.validate_python(data)
+
+
+def validate_features(data: Union[JsonInput, List[Dict[str, Any]]]) -> List[ProductFeature]:
+    """Validate a JSON array (or list of dicts) of product features in one pass"""
+    if isinstance(data, (str, bytes)):
+        return _feature_list.validate_json(data)
+    return _feature_list.validate_python(data)
+
+
+def dump_gaps(gaps: List[MarketGap]) -> bytes:
+    """Compact JSON (no whitespace) for a list of market gaps"""
+    return _gap_list.dump_json(gaps)
+
+
+def dump_features(features: List[ProductFeature]) -> bytes:
+    """Compact JSON (no whitespace) for a list of product features"""
+    return _feature_list.dump_json(features)
+
+
+def structured_lists(gaps: List[MarketGap], features: List[ProductFeature]) -> Dict[str, List[Dict[str, Any]]]:
+    """JSON-ready market_gaps / product_features lists, as stored with a run"""
+    return {
+        "market_gaps": _gap_list.dump_python(gaps, mode="json"),
+        "product_features": _feature_list.dump_python(features, mode="json"),
+    }
+
+
+def validate_structured(data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Re-validate a saved run's structured lists (e.g. on import) before they are stored"""
+    return structured_lists(validate_gaps(data.get("market_gaps") or []),
+                            validate_features(data.get("product_features") or []))
+
+
+def validate_report(model: Type[BaseModel], data: Dict[str, Any]) -> BaseModel:
+    """Rebuild a checkpointed task report; its gap/feature list is validated as one batch"""
+    if model is MarketGapReport:
+        return MarketGapReport(summary=data["summary"], gaps=validate_gaps(data.get("gaps") or []))
+    if model is ProductFeatureReport:
+        return ProductFeatureReport(summary=data["summary"],
+                                    features=validate_features(data.get("features") or []))
+    return model.model_validate(data)
+
+
+def collect_structured(task_outputs: Iterable[Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Gather every MarketGap and ProductFeature emitted by a run's task outputs"""
+    gaps: List[MarketGap] = []
+    features: List[ProductFeature] = []
+    for output in task_outputs:
+        report = getattr(output, "pydantic", None)
+        if isinstance(report, MarketGapReport):
+            gaps.extend(report.gaps)
+        elif isinstance(report, ProductFeatureReport):
+            features.extend(report.features)
+    return structured_lists(gaps, features)
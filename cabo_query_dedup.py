@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Run-scoped search query deduplication for the Cabo research crew
+Canonicalizes queries and collapses equivalent or near-duplicate searches,
+whether in flight or already completed, into a single backend call
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, FrozenSet, Optional, Set, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUERY_DEDUP_THRESHOLD = float(os.getenv("QUERY_DEDUP_THRESHOLD", "0.85"))
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from how in is it of on or that the to what when where which
+who why with de del el la las los en y para que
+""".split())
+
+# Place names agents and tools use interchangeably
+PHRASE_SYNONYMS = [
+    (re.compile(r"\b(cabo san lucas|los cabos|san jose del cabo|cabo)\b"), "cabo"),
+    (re.compile(r"\b(trip ?advisor)\b"), "tripadvisor"),
+]
+
+YEAR = re.compile(r"\b(19|20)\d{2}\b")
+
+
+def canonical_tokens(query: str) -> FrozenSet[str]:
+    """Lowercase, unify place names and years, drop punctuation and stopwords"""
+    text = query.lower()
+    for pattern, replacement in PHRASE_SYNONYMS:
+        text = pattern.sub(replacement, text)
+    years = sorted(set(m.group(0) for m in YEAR.finditer(text)))
+    text = YEAR.sub(" ", text)
+    words = re.findall(r"[a-z0-9áéíóúñ]+", text)
+    tokens = {w[:-1] if len(w) > 4 and w.endswith("s") else w
+              for w in words if w not in STOPWORDS}
+    # "2024 2025", "2025, 2024" and "2024-2025" all become the same year span
+    if years:
+        tokens.add(f"years:{'-'.join(years)}")
+    return frozenset(tokens)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class QueryDeduplicator:
+    """
+    Single-flight map from (scope, canonical query) to the Future holding its result.
+
+    Within one scope (the request parameters other than the query text), an
+    exact canonical match or a near-duplicate (Jaccard similarity of the
+    canonical token sets >= threshold) shares the first requester's backend
+    call, whether that call is still running or already finished.
+    """
+
+    def __init__(self, threshold: float = QUERY_DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._futures: Dict[Tuple[str, FrozenSet[str]], Future] = {}
+        self._by_token: Dict[Tuple[str, str], Set[FrozenSet[str]]] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.backend_calls = 0
+
+    def _find_locked(self, scope: str, tokens: FrozenSet[str]) -> Optional[Future]:
+        future = self._futures.get((scope, tokens))
+        if future is not None or self.threshold >= 1:
+            return future
+
+        candidates: Set[FrozenSet[str]] = set()
+        for token in tokens:
+            candidates |= self._by_token.get((scope, token), set())
+        best, best_score = None, self.threshold
+        for candidate in candidates:
+            score = jaccard(tokens, candidate)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return self._futures[(scope, best)] if best is not None else None
+
+    def run(self, query: str, fn: Callable[[str], Any], scope: str = "") -> Any:
+        """Return fn(query), reusing the result of an equivalent query with the same scope from this run"""
+        tokens = canonical_tokens(query)
+        with self._lock:
+            self.requests += 1
+            future = self._find_locked(scope, tokens)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[(scope, tokens)] = future
+                for token in tokens:
+                    self._by_token.setdefault((scope, token), set()).add(tokens)
+                self.backend_calls += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            future.set_result(fn(query))
+        except BaseException as e:
+            # Let later requests retry instead of replaying the failure
+            with self._lock:
+                self._futures.pop((scope, tokens), None)
+                for token in tokens:
+                    self._by_token.get((scope, token), set()).discard(tokens)
+            future.set_exception(e)
+        return future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        collapsed = self.requests - self.backend_calls
+        return {
+            "requests": self.requests,
+            "backend_calls": self.backend_calls,
+            "collapsed": collapsed,
+            "collapse_rate": collapsed / self.requests if self.requests else 0.0,
+        }
+
+
+_active: Optional[QueryDeduplicator] = None
+
+
+def start_run(threshold: float = QUERY_DEDUP_THRESHOLD) -> QueryDeduplicator:
+    """Begin a fresh deduplication scope; queries from earlier runs are forgotten"""
+    global _active
+    _active = QueryDeduplicator(threshold)
+    return _active
+
+
+def stop_run() -> Optional[Dict[str, Any]]:
+    global _active
+    stats = _active.stats() if _active else None
+    _active = None
+    return stats
+
+
+def deduplicated(query: str, fn: Callable[[str], Any], scope: str = "") -> Any:
+    """
+    Run fn(query) through the active run's deduplicator, or directly if none is active.
+
+    Only queries with the same scope are collapsed; pass every request
+    parameter besides the query text that changes the result.
+    """
+    if _active is None:
+        return fn(query)
+    return _active.run(query, fn, scope)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Adaptive token-bucket rate limiting shared by every crew in a process
+One limiter per provider (LLM, Serper, Places) tracks requests/min and tokens/min,
+backs off on 429s using Retry-After and ramps back up as calls succeed.
+Set RATE_LIMIT_DB to share the buckets across processes through a SQLite file.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB")
+
+# Provider ceilings: (requests/min, tokens/min or None)
+PROVIDER_LIMITS = {
+    "llm": (int(os.getenv("LLM_RPM", "500")), int(os.getenv("LLM_TPM", "30000"))),
+    "serper": (int(os.getenv("SERPER_RPM", "300")), None),
+    "places": (int(os.getenv("PLACES_RPM", "600")), None),
+}
+
+BACKOFF_FACTOR = 0.5       # Multiply the rate by this on every 429
+RAMP_STEP = 0.02           # Recover this fraction of the ceiling per successful call
+MIN_RATE_FRACTION = 0.05   # Never drop below this fraction of the ceiling
+DEFAULT_RETRY_AFTER = 5.0  # Pause when a 429 carries no Retry-After
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call is still throttled after all retries"""
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None) \
+        or getattr(response, "status", None)
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read Retry-After (seconds) from an HTTP error's response headers, if present"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class _MemoryState:
+    """Bucket state guarded by a lock, shared by all threads in the process"""
+
+    def __init__(self, initial: Dict[str, float]):
+        self._state = dict(initial)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self) -> Iterator[Dict[str, float]]:
+        with self._lock:
+            yield self._state
+
+
+class _SQLiteState:
+    """Bucket state in a SQLite row, so several processes draw from one bucket"""
+
+    def __init__(self, path: str, provider: str, initial: Dict[str, float]):
+        self._provider = provider
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (provider TEXT PRIMARY KEY, state TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO buckets (provider, state) VALUES (?, ?)",
+            (provider, json.dumps(initial))
+        )
+
+    @contextmanager
+    def transaction(self) -> Iterator[Dict[str, float]]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT state FROM buckets WHERE provider = ?", (self._provider,)
+                ).fetchone()
+                state = json.loads(row[0])
+                yield state
+                self._conn.execute(
+                    "UPDATE buckets SET state = ? WHERE provider = ?",
+                    (json.dumps(state), self._provider)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket over requests/min (and optionally tokens/min) with AIMD control.
+
+    The current rate starts at the provider ceiling. A 429 halves it and
+    pauses the bucket for Retry-After seconds; each success adds back a small
+    step until the ceiling is reached again.
+    """
+
+    def __init__(self, provider: str, rpm: int, tpm: Optional[int] = None,
+                 db_path: Optional[str] = None):
+        self.provider = provider
+        self.max_rpm = rpm
+        self.max_tpm = tpm
+        initial = {
+            "rpm": float(rpm), "tpm": float(tpm or 0),
+            "requests": float(rpm), "tokens": float(tpm or 0),
+            "updated_at": time.time(), "paused_until": 0.0,
+        }
+        self._state = _SQLiteState(db_path, provider, initial) if db_path else _MemoryState(initial)
+        # SQLite-backed state can block for up to the busy timeout under cross-process contention
+        self.blocking_state = bool(db_path)
+        self.throttled = 0
+        self.waited_s = 0.0
+
+    def _refill(self, state: Dict[str, float], now: float):
+        elapsed = max(0.0, now - state["updated_at"])
+        state["requests"] = min(state["rpm"], state["requests"] + elapsed * state["rpm"] / 60)
+        if self.max_tpm:
+            state["tokens"] = min(state["tpm"], state["tokens"] + elapsed * state["tpm"] / 60)
+        state["updated_at"] = now
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        """Take capacity for one request; returns 0 on success or the seconds to wait"""
+        now = time.time()
+        with self._state.transaction() as state:
+            self._refill(state, now)
+            if now < state["paused_until"]:
+                return state["paused_until"] - now
+
+            # A single request larger than the whole bucket waits for a full bucket
+            tokens = min(tokens, state["tpm"]) if self.max_tpm else 0
+            if state["requests"] >= 1 and state["tokens"] >= tokens:
+                state["requests"] -= 1
+                state["tokens"] -= tokens
+                return 0.0
+
+            wait = (1 - state["requests"]) * 60 / state["rpm"] if state["requests"] < 1 else 0.0
+            if self.max_tpm and state["tokens"] < tokens:
+                wait = max(wait, (tokens - state["tokens"]) * 60 / state["tpm"])
+            return max(wait, 0.01)
+
+    def acquire(self, tokens: int = 0):
+        """Block until one request (and `tokens` tokens) can be sent"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            self.waited_s += wait
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0):
+        """acquire() for coroutines; SQLite state is touched from a worker thread, not the event loop"""
+        while True:
+            if self.blocking_state:
+                wait = await asyncio.to_thread(self.try_acquire, tokens)
+            else:
+                wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            self.waited_s += wait
+            await asyncio.sleep(wait)
+
+    def report_tokens(self, estimated: int, actual: int):
+        """Correct the tokens/min bucket once the real usage of a call is known"""
+        if not self.max_tpm or actual == estimated:
+            return
+        with self._state.transaction() as state:
+            state["tokens"] = min(state["tpm"], state["tokens"] + estimated - actual)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Provider returned 429: cut the rate and pause until Retry-After"""
+        self.throttled += 1
+        now = time.time()
+        with self._state.transaction() as state:
+            self._refill(state, now)
+            state["rpm"] = max(self.max_rpm * MIN_RATE_FRACTION, state["rpm"] * BACKOFF_FACTOR)
+            if self.max_tpm:
+                state["tpm"] = max(self.max_tpm * MIN_RATE_FRACTION, state["tpm"] * BACKOFF_FACTOR)
+            state["requests"] = min(state["requests"], 0.0)
+            state["paused_until"] = max(
+                state["paused_until"], now + (retry_after or DEFAULT_RETRY_AFTER)
+            )
+
+    def on_success(self):
+        """Additive recovery towards the ceiling while calls keep succeeding"""
+        with self._state.transaction() as state:
+            if state["rpm"] < self.max_rpm:
+                state["rpm"] = min(self.max_rpm, state["rpm"] + self.max_rpm * RAMP_STEP)
+            if self.max_tpm and state["tpm"] < self.max_tpm:
+                state["tpm"] = min(self.max_tpm, state["tpm"] + self.max_tpm * RAMP_STEP)
+
+    def call(self, fn: Callable[..., Any], *args: Any, tokens: int = 0,
+             max_retries: int = 5, **kwargs: Any) -> Any:
+        """Run fn under the limiter, retrying with backoff when the provider throttles"""
+        for _ in range(max_retries + 1):
+            self.acquire(tokens)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_throttle_error(e):
+                    raise
+                self.on_throttle(retry_after_seconds(e))
+                continue
+            self.on_success()
+            return result
+        raise RateLimitExceeded(f"{self.provider} still throttled after {max_retries} retries")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._state.transaction() as state:
+            return {
+                "provider": self.provider,
+                "current_rpm": round(state["rpm"], 1),
+                "current_tpm": round(state["tpm"], 1) if self.max_tpm else None,
+                "throttled": self.throttled,
+                "waited_s": round(self.waited_s, 2),
+            }
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> AdaptiveRateLimiter:
+    """Process-wide limiter for a provider ("llm", "serper", "places")"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            rpm, tpm = PROVIDER_LIMITS[provider]
+            _limiters[provider] = AdaptiveRateLimiter(provider, rpm, tpm, RATE_LIMIT_DB)
+        return _limiters[provider]
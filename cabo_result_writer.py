@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Streaming result writer for the Cabo research crew
+Appends each task's output to JSONL and TXT artifacts as soon as the task completes,
+with an fsync at every record boundary and optional gzip/zstd compression
+"""
+
+import gzip
+import io
+import json
+import os
+import threading
+import zlib
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Type
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESULT_COMPRESSION = os.getenv("RESULT_COMPRESSION", "none").lower()
+RESULT_FSYNC = os.getenv("RESULT_FSYNC", "true").lower() == "true"
+
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+RECOVERY_CHUNK_BYTES = 64 * 1024
+
+
+def with_suffix(path: str, compression: str) -> str:
+    """Append the compression suffix to path unless it is already there"""
+    suffix = COMPRESSION_SUFFIXES[compression]
+    return path if path.endswith(suffix) else path + suffix
+
+
+# A member closed by AppendFile ends with a sync-flush marker, the empty final
+# deflate block and the 8-byte CRC/ISIZE trailer; a crashed writer's does not
+GZIP_CLEAN_TAIL = b"\x00\x00\xff\xff\x03\x00"
+
+
+class _CompleteLines:
+    """Sink that forwards decoded bytes up to the last newline seen and drops a torn last line"""
+
+    def __init__(self, out: Any):
+        self.out = out
+        self.partial: List[bytes] = []
+
+    def __call__(self, data: bytes):
+        cut = data.rfind(b"\n") + 1
+        if not cut:
+            self.partial.append(data)
+            return
+        self.out.write(b"".join(self.partial) + data[:cut])
+        self.partial = [data[cut:]] if cut < len(data) else []
+
+
+def _feed(decoder: Any, data: bytes, sink: Callable[[bytes], None]):
+    if not hasattr(decoder, "unconsumed_tail"):
+        sink(decoder.decompress(data))
+        return
+    # zlib: cap the output per call so a highly compressible chunk never expands all at once
+    while data and not decoder.eof:
+        sink(decoder.decompress(data, RECOVERY_CHUNK_BYTES))
+        data = decoder.unconsumed_tail
+
+
+def _decode_stream(src: BinaryIO, sink: Callable[[bytes], None], new_decoder: Callable[[], Any],
+                   errors: Tuple[Type[BaseException], ...]) -> bool:
+    """
+    Decode consecutive gzip members / zstd frames from src into sink, one chunk at a time.
+
+    Returns True if the data ended exactly at a member/frame boundary, False if
+    it ended inside one or hit corrupt bytes (everything before is still sunk).
+    """
+    decoder, pending = None, b""
+    while True:
+        chunk = pending or src.read(RECOVERY_CHUNK_BYTES)
+        pending = b""
+        if not chunk:
+            return decoder is None
+        if decoder is None:
+            decoder = new_decoder()
+        snapshot = decoder.copy() if hasattr(decoder, "copy") else None
+        try:
+            _feed(decoder, chunk, sink)
+        except errors:
+            if snapshot is not None:
+                # Replay the bad chunk a byte at a time to keep everything before the corruption
+                for i in range(len(chunk)):
+                    try:
+                        sink(snapshot.decompress(chunk[i:i + 1]))
+                    except errors:
+                        break
+            return False
+        if decoder.eof:
+            # The next member/frame starts in the unused tail of this chunk
+            pending, decoder = decoder.unused_data, None
+
+
+def _codec(compression: str):
+    """(decoder factory, decoder errors, writer factory) for a compressed artifact"""
+    if compression == "gzip":
+        return (lambda: zlib.decompressobj(wbits=31), (zlib.error,),
+                lambda raw: gzip.GzipFile(fileobj=raw, mode="wb"))
+    import zstandard
+    return (lambda: zstandard.ZstdDecompressor().decompressobj(), (zstandard.ZstdError,),
+            lambda raw: zstandard.ZstdCompressor().stream_writer(raw, closefd=False))
+
+
+def _truncate_to_last_line(path: str) -> bool:
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return False
+        # Scan backwards a chunk at a time for the end of the last complete line
+        cut, pos = 0, end
+        while pos > 0:
+            start = max(0, pos - RECOVERY_CHUNK_BYTES)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline >= 0:
+                cut = start + newline + 1
+                break
+            pos = start
+        f.truncate(cut)
+        f.flush()
+        os.fsync(f.fileno())
+    return True
+
+
+def _compressed_tail_is_clean(path: str, compression: str) -> bool:
+    if compression == "gzip":
+        with open(path, "rb") as f:
+            if f.seek(0, os.SEEK_END) < 18 + len(GZIP_CLEAN_TAIL):
+                return False
+            f.seek(-8 - len(GZIP_CLEAN_TAIL), os.SEEK_END)
+            return f.read(len(GZIP_CLEAN_TAIL)) == GZIP_CLEAN_TAIL
+    # zstd frames carry no cheap end marker; verify by decoding without keeping the output
+    new_decoder, errors, _ = _codec(compression)
+    last_byte = b"\n"
+
+    def track(data: bytes):
+        nonlocal last_byte
+        last_byte = data[-1:] or last_byte
+
+    with open(path, "rb") as f:
+        clean = _decode_stream(f, track, new_decoder, errors)
+    return clean and last_byte == b"\n"
+
+
+def repair_tail(path: str, compression: str) -> bool:
+    """
+    Make an artifact left behind by a crashed writer safe to append to.
+
+    An unterminated gzip member or zstd frame would make everything appended
+    after it unreadable, and a torn last line would swallow the next record.
+    A clean file is detected from its tail (gzip, plain) or a streaming decode
+    (zstd) and left alone. Otherwise the readable content up to its last
+    complete line is streamed into a fresh file that replaces the original.
+    Returns True if the file was changed.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    if compression == "none":
+        return _truncate_to_last_line(path)
+    if _compressed_tail_is_clean(path, compression):
+        return False
+
+    new_decoder, errors, new_writer = _codec(compression)
+    tmp = f"{path}.repair-{os.getpid()}"
+    with open(path, "rb") as src, open(tmp, "wb") as raw:
+        out = new_writer(raw)
+        _decode_stream(src, _CompleteLines(out), new_decoder, errors)
+        if compression == "gzip":
+            out.flush()  # Sync marker first, so the repaired member passes the tail check
+        out.close()
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+    return True
+
+
+class AppendFile:
+    """
+    Append-only byte sink that can be made durable at record boundaries.
+
+    gzip appends a new member per open and sync-flushes the deflate stream;
+    zstd closes a frame at each sync. Either way everything written before
+    the last sync() decompresses even if the process dies mid-run. Reopening
+    a file a crashed writer left behind repairs its tail first (repair_tail),
+    so the new data is appended after a clean boundary.
+    """
+
+    def __init__(self, path: str, compression: str = RESULT_COMPRESSION, fsync: bool = RESULT_FSYNC):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression {compression!r} "
+                             f"(expected one of {', '.join(COMPRESSION_SUFFIXES)})")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.compression = compression
+        self.fsync = fsync
+        self._zstd = None
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError("RESULT_COMPRESSION=zstd requires the 'zstandard' package") from e
+            self._zstd = zstandard
+        self.repaired = repair_tail(path, compression)
+        self._raw = open(path, "ab")
+        if compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        elif compression == "zstd":
+            self._stream = self._zstd.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def write(self, data: bytes):
+        self._stream.write(data)
+
+    def sync(self):
+        """Flush compressor and OS buffers so the bytes so far survive a crash"""
+        if self._zstd is not None:
+            self._stream.flush(self._zstd.FLUSH_FRAME)
+        else:
+            self._stream.flush()
+        self._raw.flush()
+        if self.fsync:
+            os.fsync(self._raw.fileno())
+
+    def close(self):
+        if self._raw.closed:
+            return
+        self.sync()
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+
+def open_text(path: str) -> io.TextIOBase:
+    """Open a possibly compressed artifact for reading, judging by its suffix"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        import zstandard
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a (possibly partial) JSONL artifact, skipping a torn last line"""
+    with open_text(path) as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    return
+        except EOFError:
+            # A gzip member still being written has no end marker yet
+            return
+
+
+class ResultWriter:
+    """
+    Streams one run to <base>.jsonl and <base>.txt (plus compression suffix).
+
+    The JSONL holds a "run" header, one "task" record per completed task and
+    a closing "summary" record. Reopening the same base appends, so a resumed
+    run continues the artifacts of the failed attempt.
+    """
+
+    def __init__(self, base: str, run_id: str, research_type: str = "Cabo Tourism Market Analysis",
+                 compression: str = RESULT_COMPRESSION):
+        self.run_id = run_id
+        self.research_type = research_type
+        self.started_at = datetime.now().isoformat()
+        self.jsonl_path = with_suffix(base + ".jsonl", compression)
+        self.txt_path = with_suffix(base + ".txt", compression)
+        resuming = os.path.exists(self.jsonl_path)
+        self._jsonl = AppendFile(self.jsonl_path, compression)
+        self._txt = AppendFile(self.txt_path, compression)
+        self._lock = threading.Lock()
+        self.tasks_written = 0
+
+        self._write_record({"type": "run", "run_id": run_id, "timestamp": self.started_at,
+                            "research_type": research_type, "resumed": resuming})
+        if not resuming:
+            self._write_text(f"{research_type} Report\nGenerated: {self.started_at}\n"
+                             + "=" * 80 + "\n\n")
+
+    def _write_record(self, record: Dict[str, Any]):
+        with self._lock:
+            self._jsonl.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            self._jsonl.sync()
+
+    def _write_text(self, text: str):
+        with self._lock:
+            self._txt.write(text.encode("utf-8"))
+            self._txt.sync()
+
+    def write_task(self, task: Any, output: Any):
+        """Scheduler callback: append one finished task to both artifacts"""
+        name = getattr(output, "name", None) or getattr(task, "name", None)
+        agent = getattr(output, "agent", None)
+        pydantic = getattr(output, "pydantic", None)
+        raw = getattr(output, "raw", None) or str(output)
+        self._write_record({
+            "type": "task",
+            "task": name,
+            "agent": agent,
+            "completed_at": datetime.now().isoformat(),
+            "output": raw,
+            "structured": pydantic.model_dump(mode="json") if pydantic is not None else None,
+        })
+        self._write_text(f"## {name} ({agent})\n\n{raw}\n\n")
+        self.tasks_written += 1
+
+    def finish(self, metadata: Dict[str, Any]):
+        """Append the closing summary record and close both artifacts"""
+        self._write_record({"type": "summary", "completed_at": datetime.now().isoformat(), **metadata})
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._jsonl.close()
+            self._txt.close()
+
+
+def load_run(path: str) -> Dict[str, Any]:
+    """Fold a run's JSONL artifact into one dict (latest record per task wins)"""
+    run: Dict[str, Any] = {}
+    tasks: Dict[str, Dict[str, Any]] = {}
+    summary: Optional[Dict[str, Any]] = None
+    for record in read_records(path):
+        kind = record.pop("type", None)
+        if kind == "run":
+            run = {**record, **run} if run else record
+        elif kind == "task":
+            tasks.pop(record["task"], None)
+            tasks[record["task"]] = record
+        elif kind == "summary":
+            summary = record
+    task_list: List[Dict[str, Any]] = list(tasks.values())
+    return {
+        **run,
+        "tasks": task_list,
+        "result": task_list[-1]["output"] if task_list else None,
+        "summary": summary,
+        "complete": summary is not None,
+    }
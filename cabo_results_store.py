@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Historical results store for the Cabo research crew
+SQLite tables of runs, task outputs, market gaps, product features and
+metrics, indexed for trend queries across hundreds of runs
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from dotenv import load_dotenv
+from cabo_models import validate_structured
+from cabo_result_writer import load_run
+
+load_dotenv()
+
+RESULTS_DB = os.getenv("RESULTS_DB", "results/cabo_results.sqlite3")
+
+GAP_COLUMNS = ["gap_name", "description", "target_audience", "estimated_market_size",
+               "competition_level", "implementation_difficulty"]
+FEATURE_COLUMNS = ["feature_name", "description", "priority", "estimated_dev_time", "roi_potential"]
+METRIC_COLUMNS = ["calls", "wall_s", "cache_hits", "errors", "prompt_tokens",
+                  "completion_tokens", "cost_usd"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    research_type TEXT,
+    crew_size INTEGER,
+    tasks_completed INTEGER,
+    cost_usd REAL,
+    total_tokens INTEGER,
+    over_budget INTEGER,
+    source_file TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs(timestamp);
+
+CREATE TABLE IF NOT EXISTS task_outputs (
+    run_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    task TEXT,
+    agent TEXT,
+    output TEXT,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_task_outputs_task ON task_outputs(task);
+
+CREATE TABLE IF NOT EXISTS market_gaps (
+    run_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    gap_key TEXT NOT NULL,
+    gap_name TEXT, description TEXT, target_audience TEXT, estimated_market_size TEXT,
+    competition_level TEXT, implementation_difficulty TEXT,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_market_gaps_key ON market_gaps(gap_key);
+CREATE INDEX IF NOT EXISTS idx_market_gaps_competition ON market_gaps(competition_level);
+
+CREATE TABLE IF NOT EXISTS product_features (
+    run_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    feature_key TEXT NOT NULL,
+    feature_name TEXT, description TEXT, priority INTEGER, estimated_dev_time TEXT,
+    roi_potential TEXT,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_product_features_key ON product_features(feature_key);
+CREATE INDEX IF NOT EXISTS idx_product_features_roi ON product_features(roi_potential);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    name TEXT NOT NULL,
+    calls INTEGER, wall_s REAL, cache_hits INTEGER, errors INTEGER,
+    prompt_tokens INTEGER, completion_tokens INTEGER, cost_usd REAL,
+    PRIMARY KEY (run_id, scope, name)
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_scope_name ON metrics(scope, name);
+"""
+
+
+def _key(name: Any) -> str:
+    """Case- and whitespace-insensitive grouping key for gap/feature names"""
+    return " ".join(str(name or "").lower().split())
+
+
+class ResultsStore:
+    """
+    One row per run plus child rows per task, gap, feature and metric bucket.
+
+    Each run is written in a single transaction that replaces any earlier record of
+    its run_id, so a reader never sees a partially recorded run. Trend queries
+    aggregate over the indexed key columns.
+    """
+
+    def __init__(self, path: str = RESULTS_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def record_run(
+        self,
+        run_id: str,
+        timestamp: str,
+        research_type: str = "",
+        crew_size: int = 0,
+        task_outputs: Iterable[Dict[str, Any]] = (),
+        structured: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        source_file: Optional[str] = None,
+    ):
+        """Store a finished run, replacing any earlier one; task_outputs are dicts with task, agent and output"""
+        task_outputs = list(task_outputs)
+        structured = structured or {}
+        totals = (metrics or {}).get("totals") or {}
+
+        task_rows = [(run_id, i, t.get("task"), t.get("agent"), t.get("output"))
+                     for i, t in enumerate(task_outputs)]
+        gap_rows = [(run_id, i, _key(g.get("gap_name")), *[g.get(c) for c in GAP_COLUMNS])
+                    for i, g in enumerate(structured.get("market_gaps") or [])]
+        feature_rows = [(run_id, i, _key(f.get("feature_name")), *[f.get(c) for c in FEATURE_COLUMNS])
+                        for i, f in enumerate(structured.get("product_features") or [])]
+        metric_rows = []
+        if metrics:
+            buckets = [("total", "all", totals)]
+            buckets += [("agent", name, stats) for name, stats in metrics.get("by_agent", {}).items()]
+            buckets += [("call", name, stats) for name, stats in metrics.get("by_call", {}).items()]
+            metric_rows = [(run_id, scope, name, *[stats.get(c, 0) for c in METRIC_COLUMNS])
+                           for scope, name, stats in buckets]
+
+        with self._lock, self._conn:
+            # Recording a run_id again (e.g. after --resume) replaces it and all of its rows
+            for table in ("task_outputs", "market_gaps", "product_features", "metrics"):
+                self._conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, timestamp, research_type, crew_size, len(task_outputs),
+                 totals.get("cost_usd"),
+                 totals.get("prompt_tokens", 0) + totals.get("completion_tokens", 0) if totals else None,
+                 int(bool((metrics or {}).get("over_budget"))), source_file)
+            )
+            self._conn.executemany("INSERT INTO task_outputs VALUES (?, ?, ?, ?, ?)", task_rows)
+            self._conn.executemany(
+                f"INSERT INTO market_gaps VALUES ({', '.join('?' * (3 + len(GAP_COLUMNS)))})", gap_rows
+            )
+            self._conn.executemany(
+                f"INSERT INTO product_features VALUES ({', '.join('?' * (3 + len(FEATURE_COLUMNS)))})",
+                feature_rows
+            )
+            self._conn.executemany(
+                f"INSERT INTO metrics VALUES ({', '.join('?' * (3 + len(METRIC_COLUMNS)))})", metric_rows
+            )
+
+    def has_run(self, run_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone() is not None
+
+    def import_json(self, path: str) -> Optional[str]:
+        """Backfill a run from a saved JSON/JSONL result file; returns its run_id, or None if already stored"""
+        if ".jsonl" in os.path.basename(path):
+            data = load_run(path)
+            data.update((data.get("summary") or {}))
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        metadata = data.get("metadata") or {}
+        metrics = metadata.get("instrumentation")
+        run_id = data.get("run_id") or (metrics or {}).get("run_id") or os.path.splitext(os.path.basename(path))[0]
+        if self.has_run(run_id):
+            return None
+        self.record_run(
+            run_id,
+            data.get("timestamp", ""),
+            research_type=data.get("research_type", ""),
+            crew_size=metadata.get("crew_size", 0),
+            task_outputs=data.get("tasks") or [{"task": "final", "output": data.get("result")}],
+            structured=validate_structured(data.get("structured") or {}),
+            metrics=metrics,
+            source_file=path,
+        )
+        return run_id
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        """Run an arbitrary read query and return rows as dicts"""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, tuple(params))]
+
+    def dataframe(self, sql: str, params: Iterable[Any] = ()):
+        """Same as query() but returns a pandas DataFrame"""
+        import pandas as pd
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=tuple(params))
+
+    def runs(self, since: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent runs first, optionally only those at or after an ISO timestamp"""
+        return self.query(
+            "SELECT * FROM runs WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?",
+            (since or "", limit)
+        )
+
+    def gap_trends(self, since: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """How often each market gap recurs across runs, with its average rank"""
+        return self.query(
+            """
+            SELECT g.gap_key, MAX(g.gap_name) AS gap_name,
+                   COUNT(DISTINCT g.run_id) AS runs,
+                   ROUND(AVG(g.position) + 1, 2) AS avg_rank,
+                   MIN(r.timestamp) AS first_seen, MAX(r.timestamp) AS last_seen,
+                   COALESCE(SUM(g.competition_level = 'High'), 0) AS high_competition
+            FROM market_gaps g JOIN runs r ON r.run_id = g.run_id
+            WHERE r.timestamp >= ?
+            GROUP BY g.gap_key
+            ORDER BY runs DESC, avg_rank ASC
+            LIMIT ?
+            """,
+            (since or "", limit)
+        )
+
+    def feature_trends(self, since: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Average priority and ROI spread of each product feature across runs"""
+        return self.query(
+            """
+            SELECT f.feature_key, MAX(f.feature_name) AS feature_name,
+                   COUNT(DISTINCT f.run_id) AS runs,
+                   ROUND(AVG(f.priority), 2) AS avg_priority,
+                   COALESCE(SUM(f.roi_potential = 'High'), 0) AS high_roi,
+                   COALESCE(SUM(f.roi_potential = 'Medium'), 0) AS medium_roi,
+                   COALESCE(SUM(f.roi_potential = 'Low'), 0) AS low_roi,
+                   MAX(r.timestamp) AS last_seen
+            FROM product_features f JOIN runs r ON r.run_id = f.run_id
+            WHERE r.timestamp >= ?
+            GROUP BY f.feature_key
+            ORDER BY avg_priority DESC, runs DESC
+            LIMIT ?
+            """,
+            (since or "", limit)
+        )
+
+    def metric_trend(self, scope: str = "total", name: str = "all",
+                     limit: int = 100) -> List[Dict[str, Any]]:
+        """Per-run metrics for one bucket (e.g. scope='call', name='search:serper')"""
+        return self.query(
+            """
+            SELECT r.run_id, r.timestamp, m.*
+            FROM metrics m JOIN runs r ON r.run_id = m.run_id
+            WHERE m.scope = ? AND m.name = ?
+            ORDER BY r.timestamp DESC
+            LIMIT ?
+            """,
+            (scope, name, limit)
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[ResultsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    """Return the process-wide results store, opening it on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore(RESULTS_DB)
+        return _store
+
+
+def _print_rows(rows: List[Dict[str, Any]]):
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query historical Cabo research runs")
+    parser.add_argument("--db", default=RESULTS_DB, help="Results database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backfill = commands.add_parser("import", help="Backfill runs from saved JSON results")
+    backfill.add_argument("files", nargs="*",
+                          default=["cabo_market_research_*.json", "cabo_market_research_*.jsonl*"])
+    for name in ("runs", "gaps", "features"):
+        sub = commands.add_parser(name)
+        sub.add_argument("--since", help="Only runs at or after this ISO timestamp")
+        sub.add_argument("--limit", type=int, default=20)
+    metric = commands.add_parser("metrics", help="Per-run metric trend for one bucket")
+    metric.add_argument("--scope", default="total", choices=["total", "agent", "call"])
+    metric.add_argument("--name", default="all")
+    metric.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    if args.command == "import":
+        paths = sorted({p for pattern in args.files for p in glob.glob(pattern)})
+        imported = [run_id for run_id in map(store.import_json, paths) if run_id]
+        print(f"Imported {len(imported)} of {len(paths)} result files into {args.db}")
+    elif args.command == "runs":
+        _print_rows(store.runs(args.since, args.limit))
+    elif args.command == "gaps":
+        _print_rows(store.gap_trends(args.since, args.limit))
+    elif args.command == "features":
+        _print_rows(store.feature_trends(args.since, args.limit))
+    else:
+        _print_rows(store.metric_trend(args.scope, args.name, args.limit))
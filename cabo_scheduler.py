@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Dependency-aware task scheduler for the Cabo research crew
+Runs crew tasks as a DAG built from each task's context, so independent tasks execute concurrently
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional
+from crewai import Crew, Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_TASK_WORKERS = int(os.getenv("TASK_MAX_WORKERS", "4"))
+
+
+def task_dependencies(tasks: List[Task]) -> Dict[int, List[int]]:
+    """
+    Map each task index to the indexes of the tasks it depends on.
+
+    A task with an explicit context list depends only on those tasks (an
+    empty list means no upstream work). A task without one keeps sequential
+    semantics and depends on every task before it.
+    """
+    index = {id(task): i for i, task in enumerate(tasks)}
+    deps: Dict[int, List[int]] = {}
+    for i, task in enumerate(tasks):
+        if isinstance(task.context, list):
+            missing = [t.description.strip()[:60] for t in task.context if id(t) not in index]
+            if missing:
+                raise ValueError(f"Task {i} depends on tasks outside the crew: {missing}")
+            deps[i] = [index[id(t)] for t in task.context]
+        else:
+            deps[i] = list(range(i))
+
+    _check_acyclic(deps)
+    return deps
+
+
+def _check_acyclic(deps: Dict[int, List[int]]):
+    visiting, done = set(), set()
+
+    def visit(node: int):
+        if node in done:
+            return
+        if node in visiting:
+            raise ValueError(f"Task dependency cycle detected at task {node}")
+        visiting.add(node)
+        for upstream in deps[node]:
+            visit(upstream)
+        visiting.discard(node)
+        done.add(node)
+
+    for node in deps:
+        visit(node)
+
+
+def run_task_graph(
+    crew: Crew,
+    max_workers: Optional[int] = None,
+    on_task_complete: Optional[Callable[[Task, TaskOutput], None]] = None,
+    completed: Optional[Dict[int, TaskOutput]] = None,
+    on_task_start: Optional[Callable[[Task], None]] = None,
+) -> List[TaskOutput]:
+    """
+    Execute the crew's tasks in dependency order on a worker pool.
+
+    Ready tasks run concurrently; each task receives the raw output of its
+    upstream tasks as context. Outputs are returned in the crew's task order.
+    Tasks whose index is in completed (e.g. restored from a checkpoint) are
+    not re-run; their stored outputs are used as context downstream.
+    If a task fails, no new tasks are started, running ones are allowed to
+    finish (and reported through the callbacks), and the error is re-raised.
+    """
+    tasks = list(crew.tasks)
+    deps = task_dependencies(tasks)
+    outputs: Dict[int, TaskOutput] = dict(completed or {})
+    pending = set(range(len(tasks))) - set(outputs)
+    running = {}
+    error: Optional[BaseException] = None
+
+    for agent in crew.agents:
+        agent.crew = crew
+
+    def execute(i: int) -> TaskOutput:
+        task = tasks[i]
+        if on_task_start:
+            on_task_start(task)
+        context = aggregate_raw_outputs_from_task_outputs([outputs[d] for d in deps[i]])
+        return task.execute_sync(agent=task.agent, context=context, tools=task.tools)
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers or DEFAULT_TASK_WORKERS,
+        thread_name_prefix="cabo-task"
+    ) as executor:
+        while pending or running:
+            if error is None:
+                ready = [i for i in sorted(pending) if all(d in outputs for d in deps[i])]
+                for i in ready:
+                    pending.discard(i)
+                    running[executor.submit(execute, i)] = i
+            elif not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i = running.pop(future)
+                try:
+                    outputs[i] = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if crew.task_callback:
+                    crew.task_callback(outputs[i])
+                if on_task_complete:
+                    on_task_complete(tasks[i], outputs[i])
+
+    if error is not None:
+        raise error
+    return [outputs[i] for i in range(len(tasks))]
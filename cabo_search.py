@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Cached web search for the Cabo research crew
+Wraps SerperDevTool with a persistent result cache shared across runs
+"""
+
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+from crewai_tools import SerperDevTool
+from dotenv import load_dotenv
+from cabo_cache import PersistentCache, content_key
+from cabo_instrumentation import SERPER_COST_PER_QUERY, instrument
+from cabo_rate_limit import get_limiter
+from cabo_query_dedup import deduplicated
+
+load_dotenv()
+
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", ".cabo_cache/search_cache.sqlite3")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(7 * 24 * 3600)))
+SEARCH_CACHE_MAX_MB = int(os.getenv("SEARCH_CACHE_MAX_MB", "256"))
+SEARCH_CACHE_BYPASS = os.getenv("SEARCH_CACHE_BYPASS", "false").lower() == "true"
+
+_search_cache: Optional[PersistentCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> PersistentCache:
+    """Return the process-wide search cache, opening it on first use"""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = PersistentCache(
+                SEARCH_CACHE_PATH,
+                default_ttl=SEARCH_CACHE_TTL,
+                max_bytes=SEARCH_CACHE_MAX_MB * 1024 * 1024,
+                bypass=SEARCH_CACHE_BYPASS,
+            )
+        return _search_cache
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text so trivially different spellings share a cache entry"""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that serves repeated queries from the persistent cache"""
+
+    def _search_params(self, kwargs: Dict[str, Any]) -> List[Any]:
+        """Everything besides the query text that changes what Serper returns"""
+        return [
+            getattr(self, "search_type", None),
+            getattr(self, "n_results", None),
+            getattr(self, "country", None),
+            getattr(self, "location", None),
+            getattr(self, "locale", None),
+            kwargs,
+        ]
+
+    def _run(self, *args: Any, **kwargs: Any) -> Any:
+        query = str(args[0] if args else kwargs.pop("search_query", kwargs.pop("query", "")))
+        # Equivalent queries with the same parameters share one lookup within a run (see cabo_query_dedup)
+        scope = content_key(*self._search_params(kwargs))
+        return deduplicated(query, lambda q: self._cached_search(q, **kwargs), scope=scope)
+
+    def _cached_search(self, query: str, **kwargs: Any) -> Any:
+        key = content_key("serper", normalize_query(query), *self._search_params(kwargs))
+
+        with instrument("search", "serper", input=query) as event:
+            cache = get_search_cache()
+            cached = cache.get(key)
+            event["cache_hit"] = cached is not None
+            if cached is not None:
+                event["output"] = cached
+                return cached
+
+            result = get_limiter("serper").call(super()._run, search_query=query, **kwargs)
+            cache.set(key, result)
+            event["output"] = result
+            event["cost_usd"] = SERPER_COST_PER_QUERY
+            return result
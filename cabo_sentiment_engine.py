@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Batched multilingual sentiment scoring for the Cabo review corpora
+Runs a local transformers model on CPU in fixed-size, length-sorted batches with
+dynamic padding and returns NumPy score arrays
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Multilingual (English/Spanish among others) negative/neutral/positive classifier
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "cardiffnlp/twitter-xlm-roberta-base-sentiment")
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+SENTIMENT_MAX_LENGTH = int(os.getenv("SENTIMENT_MAX_LENGTH", "256"))  # Tokens per review
+SENTIMENT_THREADS = int(os.getenv("SENTIMENT_THREADS", "0"))  # torch CPU threads (0 = default)
+
+LABELS = ("negative", "neutral", "positive")
+
+
+class SentimentBatch:
+    """
+    Scores for a batch of texts, kept as arrays rather than per-text dicts.
+
+    probs has one row per input text and one column per label in LABELS;
+    polarity is P(positive) - P(negative) in [-1, 1].
+    """
+
+    def __init__(self, probs: np.ndarray):
+        self.probs = probs
+
+    def __len__(self) -> int:
+        return len(self.probs)
+
+    @property
+    def polarity(self) -> np.ndarray:
+        return self.probs[:, 2] - self.probs[:, 0]
+
+    @property
+    def predicted(self) -> np.ndarray:
+        return self.probs.argmax(axis=1)
+
+    @property
+    def confidence(self) -> np.ndarray:
+        return self.probs.max(axis=1)
+
+    def summary(self) -> Dict[str, Any]:
+        """Corpus-level aggregates (the part worth sending over MCP)"""
+        if not len(self):
+            return {"count": 0}
+        mean = self.probs.mean(axis=0)
+        counts = np.bincount(self.predicted, minlength=len(LABELS))
+        return {
+            "count": len(self),
+            "mean_scores": {label: round(float(p), 4) for label, p in zip(LABELS, mean)},
+            "distribution": {label: int(c) for label, c in zip(LABELS, counts)},
+            "mean_polarity": round(float(self.polarity.mean()), 4),
+            "overall_sentiment": LABELS[int(mean.argmax())],
+            "confidence": round(float(mean.max()), 4),
+        }
+
+    def per_text(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        rows = self.probs if limit is None else self.probs[:limit]
+        return [{"label": LABELS[int(r.argmax())], "polarity": round(float(r[2] - r[0]), 4),
+                 "confidence": round(float(r.max()), 4)} for r in rows]
+
+
+class SentimentEngine:
+    """
+    Loads the model once and scores any number of texts per call.
+
+    Texts are deduplicated and sorted by length before batching, so each
+    fixed-size batch pads only to its own longest member.
+    """
+
+    def __init__(self, model_name: str = SENTIMENT_MODEL, batch_size: int = SENTIMENT_BATCH_SIZE,
+                 max_length: int = SENTIMENT_MAX_LENGTH):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._tokenizer = None
+        self._model = None
+        self._label_order: Optional[List[int]] = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._model is not None:
+            return
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        if SENTIMENT_THREADS:
+            torch.set_num_threads(SENTIMENT_THREADS)
+        self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        model.eval()
+        # Map the model's own label ids onto LABELS order
+        id2label = {i: label.lower() for i, label in model.config.id2label.items()}
+        by_name = {label: i for i, label in id2label.items()}
+        if all(label in by_name for label in LABELS):
+            self._label_order = [by_name[label] for label in LABELS]
+        else:
+            self._label_order = list(range(len(LABELS)))
+        self._model = model
+
+    def _score_batch(self, texts: List[str]) -> np.ndarray:
+        import torch
+        encoded = self._tokenizer(texts, padding="longest", truncation=True,
+                                  max_length=self.max_length, return_tensors="pt")
+        with torch.inference_mode():
+            logits = self._model(**encoded).logits
+        probs = torch.softmax(logits.float(), dim=-1).numpy()
+        return probs[:, self._label_order]
+
+    def score(self, texts: Sequence[str]) -> SentimentBatch:
+        """Score every text; blank texts score as neutral without touching the model"""
+        probs = np.zeros((len(texts), len(LABELS)), dtype=np.float32)
+        probs[:, 1] = 1.0
+
+        unique: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            text = (text or "").strip()
+            if text:
+                unique.setdefault(text, []).append(i)
+        if not unique:
+            return SentimentBatch(probs)
+
+        distinct = sorted(unique, key=len)
+        with self._lock:
+            self._load()
+            for start in range(0, len(distinct), self.batch_size):
+                batch = distinct[start:start + self.batch_size]
+                scores = self._score_batch(batch)
+                for text, row in zip(batch, scores):
+                    probs[unique[text]] = row
+        return SentimentBatch(probs)
+
+
+_engine: Optional[SentimentEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> SentimentEngine:
+    """Process-wide engine so the model is loaded once per server"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = SentimentEngine()
+        return _engine
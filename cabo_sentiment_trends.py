@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Rolling sentiment trends over time-stamped review streams
+Daily buckets in NumPy arrays with Fenwick trees for O(log n) window queries,
+plus incrementally maintained EWMA and CUSUM change-point flags
+"""
+
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TREND_STORE_PATH = os.getenv("TREND_STORE_PATH", "data/sentiment_trends.npz")
+TREND_EWMA_HALFLIFE = float(os.getenv("TREND_EWMA_HALFLIFE", "14"))  # Days
+CUSUM_SLACK = 0.5        # k, in standard deviations of the daily mean around the EWMA
+CUSUM_THRESHOLD = 5.0    # h, in standard deviations; crossing it flags a change point
+CUSUM_WARMUP_DAYS = 14   # Observed days (from the start or the last change) before flagging
+
+ORIGIN = date(2000, 1, 1)
+DateLike = Union[str, int, float, date, datetime]
+
+
+def to_day(value: DateLike) -> int:
+    """Day index since ORIGIN for an ISO date/datetime string, epoch seconds or date"""
+    if isinstance(value, datetime):
+        value = value.date()
+    elif isinstance(value, (int, float)):
+        value = datetime.fromtimestamp(value, tz=timezone.utc).date()
+    elif isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+    day = (value - ORIGIN).days
+    if day < 0:
+        raise ValueError(f"Dates before {ORIGIN} are not supported: {value}")
+    return day
+
+
+def from_day(day: int) -> str:
+    return (ORIGIN + timedelta(days=int(day))).isoformat()
+
+
+class _Fenwick:
+    """Binary indexed tree over rows of (count, sum, sum of squares)"""
+
+    def __init__(self, values: np.ndarray):
+        # O(n) construction: propagate each node into its parent once
+        n = len(values)
+        self.tree = np.zeros((n + 1, values.shape[1]), dtype=np.float64)
+        self.tree[1:] = values
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+
+    def add(self, index: int, delta: np.ndarray):
+        i = index + 1
+        n = len(self.tree)
+        while i < n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, end: int) -> np.ndarray:
+        """Sum over days [0, end)"""
+        total = np.zeros(self.tree.shape[1], dtype=np.float64)
+        i = min(end, len(self.tree) - 1)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+class SentimentTrendStore:
+    """
+    Streaming store of sentiment scores bucketed by day.
+
+    Window aggregates (count/mean/std over any date range) come from Fenwick
+    trees in O(log n). EWMA and a two-sided CUSUM of daily means against that
+    EWMA are kept per day and only recomputed forward from the earliest day
+    touched since the last query, so in-order streams cost O(new days).
+    """
+
+    def __init__(self, halflife: float = TREND_EWMA_HALFLIFE, capacity: int = 1024):
+        self.halflife = halflife
+        self.daily = np.zeros((capacity, 3), dtype=np.float64)   # count, sum, sumsq
+        self.state = np.zeros((capacity, 5), dtype=np.float64)   # ewma, var, cusum up/down, days in regime
+        self.flags = np.zeros(capacity, dtype=np.int8)          # +1 / -1 on change points
+        self._tree = _Fenwick(self.daily)
+        self.first_day: Optional[int] = None
+        self.last_day: Optional[int] = None
+        self._dirty_from: Optional[int] = None
+        self._refreshed_to: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _grow(self, day: int):
+        capacity = len(self.daily)
+        if day < capacity:
+            return
+        while capacity <= day:
+            capacity *= 2
+        extra = capacity - len(self.daily)
+        self.daily = np.vstack([self.daily, np.zeros((extra, 3))])
+        self.state = np.vstack([self.state, np.zeros((extra, 5))])
+        self.flags = np.concatenate([self.flags, np.zeros(extra, dtype=np.int8)])
+        self._tree = _Fenwick(self.daily)
+
+    def ingest_arrays(self, days: np.ndarray, scores: np.ndarray):
+        """Add many (day index, score) points at once"""
+        days = np.asarray(days, dtype=np.int64)
+        scores = np.asarray(scores, dtype=np.float64)
+        if not len(days):
+            return
+        with self._lock:
+            self._grow(int(days.max()))
+            unique, inverse = np.unique(days, return_inverse=True)
+            delta = np.zeros((len(unique), 3))
+            np.add.at(delta, inverse, np.column_stack([np.ones_like(scores), scores, scores ** 2]))
+            self.daily[unique] += delta
+            for day, row in zip(unique, delta):
+                self._tree.add(int(day), row)
+
+            low, high = int(unique[0]), int(unique[-1])
+            self.first_day = low if self.first_day is None else min(self.first_day, low)
+            self.last_day = high if self.last_day is None else max(self.last_day, high)
+            self._dirty_from = low if self._dirty_from is None else min(self._dirty_from, low)
+
+    def ingest(self, points: Iterable[Dict[str, Any]], score_key: str = "score",
+               time_key: str = "timestamp") -> int:
+        """Add points like {"timestamp": "2025-03-01T10:00:00", "score": 0.4}; returns how many"""
+        days, scores = [], []
+        for point in points:
+            days.append(to_day(point[time_key]))
+            scores.append(float(point[score_key]))
+        self.ingest_arrays(np.asarray(days), np.asarray(scores))
+        return len(days)
+
+    def _refresh(self):
+        """Bring EWMA and CUSUM up to date from the earliest day changed since last time"""
+        if self._dirty_from is None:
+            return
+        start = max(self._dirty_from, self.first_day)
+        if self._refreshed_to is not None:
+            # Days between the previous last day and a new one still need their state
+            start = min(start, self._refreshed_to + 1)
+        alpha = 1 - 0.5 ** (1 / self.halflife)
+        if start > self.first_day:
+            level, var, up, down, observed = self.state[start - 1]
+        else:
+            level, var, up, down, observed = np.nan, 0.0, 0.0, 0.0, 0
+        for day in range(start, self.last_day + 1):
+            flag = 0
+            count = self.daily[day, 0]
+            if count:
+                x = self.daily[day, 1] / count
+                # Plain running mean/variance until the EWMA weight takes over
+                weight = max(alpha, 1 / (observed + 1))
+                if observed == 0:
+                    level = x
+                else:
+                    # Standardize against the EWMA level and EW variance of daily means so far
+                    residual = x - level
+                    if observed >= CUSUM_WARMUP_DAYS and var > 0:
+                        z = residual / var ** 0.5
+                        up = max(0.0, up + z - CUSUM_SLACK)
+                        down = max(0.0, down - z - CUSUM_SLACK)
+                        if up > CUSUM_THRESHOLD or down > CUSUM_THRESHOLD:
+                            flag = 1 if up > CUSUM_THRESHOLD else -1
+                            # Start a new regime at this level so one shift is flagged once
+                            up = down = 0.0
+                            level, observed = x, 0
+                    if not flag:
+                        level += weight * residual
+                        var = (1 - weight) * (var + weight * residual ** 2)
+                observed += 1
+            self.state[day] = (level, var, up, down, observed)
+            self.flags[day] = flag
+        self._refreshed_to = self.last_day
+        self._dirty_from = None
+
+    def window(self, start: DateLike, end: DateLike) -> Dict[str, Any]:
+        """Count, mean and std of scores with start <= date <= end, in O(log n)"""
+        lo, hi = to_day(start), to_day(end) + 1
+        with self._lock:
+            count, total, squares = self._tree.prefix(hi) - self._tree.prefix(lo)
+        if not count:
+            return {"start": from_day(lo), "end": from_day(hi - 1), "count": 0, "mean": None, "std": None}
+        mean = total / count
+        return {
+            "start": from_day(lo),
+            "end": from_day(hi - 1),
+            "count": int(count),
+            "mean": round(float(mean), 4),
+            "std": round(float(max(squares / count - mean ** 2, 0.0)) ** 0.5, 4),
+        }
+
+    def series(self, granularity: str = "month", periods: int = 6,
+               end: Optional[DateLike] = None) -> List[Dict[str, Any]]:
+        """Per-day/week/month aggregates for the last `periods` periods ending at `end`"""
+        if self.last_day is None:
+            return []
+        last = ORIGIN + timedelta(days=to_day(end) if end is not None else self.last_day)
+        windows: List[Tuple[date, date]] = []
+        for _ in range(periods):
+            if granularity == "day":
+                first = last
+            elif granularity == "week":
+                first = last - timedelta(days=last.weekday())
+            elif granularity == "month":
+                first = last.replace(day=1)
+            else:
+                raise ValueError("granularity must be 'day', 'week' or 'month'")
+            windows.append((first, last))
+            last = first - timedelta(days=1)
+        return [self.window(first, last) for first, last in reversed(windows)]
+
+    def ewma_at(self, day: Optional[DateLike] = None) -> Optional[float]:
+        with self._lock:
+            if self.last_day is None:
+                return None
+            self._refresh()
+            index = min(to_day(day), self.last_day) if day is not None else self.last_day
+            if index < self.first_day:
+                return None
+            value = self.state[index, 0]
+        return round(float(value), 4)
+
+    def change_points(self, since: Optional[DateLike] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self.last_day is None:
+                return []
+            self._refresh()
+            start = to_day(since) if since is not None else self.first_day
+            days = np.nonzero(self.flags[start:self.last_day + 1])[0] + start
+            return [{"date": from_day(d), "direction": "up" if self.flags[d] > 0 else "down"}
+                    for d in days]
+
+    def summary(self, granularity: str = "month", periods: int = 6) -> Dict[str, Any]:
+        """Trend overview for agents: recent period means, direction, EWMA and change points"""
+        if self.last_day is None:
+            return {"points": 0}
+        last = ORIGIN + timedelta(days=self.last_day)
+        recent = self.window(last - timedelta(days=29), last)
+        previous = self.window(last - timedelta(days=59), last - timedelta(days=30))
+        direction = "insufficient data"
+        if recent["count"] and previous["count"]:
+            change = recent["mean"] - previous["mean"]
+            spread = max(recent["std"] or 0.0, previous["std"] or 0.0, 1e-9)
+            direction = "stable" if abs(change) < 0.1 * spread else "improving" if change > 0 else "declining"
+        return {
+            "points": int(self.daily[:, 0].sum()),
+            "first_date": from_day(self.first_day),
+            "last_date": from_day(self.last_day),
+            "trend_direction": direction,
+            "last_30_days": recent,
+            "previous_30_days": previous,
+            "ewma": self.ewma_at(),
+            f"{granularity}ly_scores" if granularity != "day" else "daily_scores":
+                self.series(granularity, periods),
+            "change_points": self.change_points()[-10:],
+        }
+
+    def save(self, path: str = TREND_STORE_PATH):
+        """Persist the daily buckets (derived arrays are rebuilt on load)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            used = (self.last_day or 0) + 1
+            tmp = path + ".tmp.npz"
+            np.savez(tmp, daily=self.daily[:used])
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = TREND_STORE_PATH) -> "SentimentTrendStore":
+        store = cls()
+        if os.path.exists(path):
+            daily = np.load(path)["daily"]
+            days = np.nonzero(daily[:, 0])[0]
+            if len(days):
+                with store._lock:
+                    store._grow(int(days[-1]))
+                    store.daily[:len(daily)] = daily
+                    store._tree = _Fenwick(store.daily)
+                    store.first_day, store.last_day = int(days[0]), int(days[-1])
+                    store._dirty_from = store.first_day
+        return store
+
+
+_store: Optional[SentimentTrendStore] = None
+_store_lock = threading.Lock()
+
+
+def get_trend_store() -> SentimentTrendStore:
+    """Process-wide store, restored from TREND_STORE_PATH (empty disables persistence)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SentimentTrendStore.load(TREND_STORE_PATH) if TREND_STORE_PATH \
+                else SentimentTrendStore()
+        return _store
+
+
+def ingest_points(points: List[Dict[str, Any]], score_key: str = "score",
+                  time_key: str = "timestamp") -> int:
+    """
+    Feed scraped points into the shared store and persist it.
+
+    Points without a score but with a "text" field are scored with the shared
+    sentiment engine (polarity in [-1, 1]) in one batch.
+    """
+    unscored = [p for p in points if p.get(score_key) is None and p.get("text")]
+    if unscored:
+        from cabo_sentiment_engine import get_engine
+        polarity = get_engine().score([p["text"] for p in unscored]).polarity
+        for point, value in zip(unscored, polarity):
+            point[score_key] = float(value)
+    store = get_trend_store()
+    added = store.ingest((p for p in points if p.get(score_key) is not None), score_key, time_key)
+    if added and TREND_STORE_PATH:
+        store.save(TREND_STORE_PATH)
+    return added
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Streaming theme extraction over large review corpora
+Hashes reviews into fixed-size vectors chunk by chunk, clusters them with online
+k-means and tracks bounded top terms and sentiment per theme, so memory stays
+flat no matter how many reviews are streamed through
+"""
+
+import csv
+import json
+import os
+import re
+import zlib
+from collections import Counter
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from cabo_query_dedup import STOPWORDS
+
+load_dotenv()
+
+THEME_CHUNK_SIZE = int(os.getenv("THEME_CHUNK_SIZE", "1000"))     # Reviews per streamed chunk
+THEME_FEATURES = int(os.getenv("THEME_FEATURES", "2048"))         # Hashed vector dimensions
+THEME_TERMS_PER_CLUSTER = 256                                      # Misra-Gries counter capacity
+THEME_EXAMPLES = 2
+
+REVIEW_STOPWORDS = STOPWORDS | frozenset("""
+i me my we our you your he she they them their this these those was were be been being have has
+had do does did not no but so very just also too there here than then out up down about all any
+can could would will get got one really much more most even still back over only again place
+muy es un una lo se por con fue pero su sus al le les nos mi mis son como mas más ya este esta
+todo todos hay bien sin sobre entre cuando también tambien
+""".split())
+
+TOKEN = re.compile(r"[a-záéíóúüñ]{3,}")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN.findall(text.lower()) if t not in REVIEW_STOPWORDS]
+
+
+def _hash(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def hash_vectors(docs: List[List[str]], n_features: int = THEME_FEATURES) -> np.ndarray:
+    """Signed feature hashing with sublinear term frequency, L2-normalized rows"""
+    rows, cols, signs = [], [], []
+    for row, tokens in enumerate(docs):
+        for token in tokens:
+            h = _hash(token)
+            rows.append(row)
+            cols.append(h % n_features)
+            signs.append(1.0 if (h >> 31) & 1 else -1.0)
+    matrix = np.zeros((len(docs), n_features), dtype=np.float32)
+    if rows:
+        np.add.at(matrix, (np.asarray(rows), np.asarray(cols)), np.asarray(signs, dtype=np.float32))
+    matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class TopTerms:
+    """Misra-Gries heavy hitters: approximate top terms in a fixed number of counters"""
+
+    def __init__(self, capacity: int = THEME_TERMS_PER_CLUSTER):
+        self.capacity = capacity
+        self.counts: Counter = Counter()
+
+    def merge(self, chunk_counts: Counter):
+        """Fold in one chunk's exact counts (mergeable summary: subtract the (k+1)-th count)"""
+        self.counts.update(chunk_counts)
+        if len(self.counts) > self.capacity:
+            ranked = self.counts.most_common()
+            cut = ranked[self.capacity][1]
+            self.counts = Counter({t: c - cut for t, c in ranked[:self.capacity] if c > cut})
+
+    def top(self, n: int) -> List[str]:
+        return [t for t, _ in self.counts.most_common(n)]
+
+
+class ThemeExtractor:
+    """
+    Online (mini-batch) k-means over hashed review vectors.
+
+    Centroids are seeded with k-means++ on the first chunk and then nudged
+    towards each later chunk's members with a per-centroid 1/count learning
+    rate. Per-theme frequency, polarity and top terms accumulate as chunks
+    arrive; nothing proportional to the corpus size is retained.
+    """
+
+    def __init__(self, n_themes: int = 8, n_features: int = THEME_FEATURES,
+                 sentiment: Optional[Callable[[List[str]], np.ndarray]] = None, seed: int = 13):
+        self.n_themes = n_themes
+        self.n_features = n_features
+        self.sentiment = sentiment
+        self.rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self.seen = np.zeros(n_themes, dtype=np.int64)
+        self.polarity_sum = np.zeros(n_themes, dtype=np.float64)
+        self.negative = np.zeros(n_themes, dtype=np.int64)
+        self.positive = np.zeros(n_themes, dtype=np.int64)
+        self.terms = [TopTerms() for _ in range(n_themes)]
+        self.examples: List[List[str]] = [[] for _ in range(n_themes)]
+        self.total = 0
+        self.skipped = 0
+
+    def _seed(self, vectors: np.ndarray) -> np.ndarray:
+        k = min(self.n_themes, len(vectors))
+        centers = [vectors[self.rng.integers(len(vectors))]]
+        for _ in range(1, k):
+            distance = 1 - np.max(vectors @ np.vstack(centers).T, axis=1)
+            distance = np.clip(distance, 0, None) ** 2
+            total = distance.sum()
+            pick = self.rng.choice(len(vectors), p=distance / total) if total > 0 \
+                else self.rng.integers(len(vectors))
+            centers.append(vectors[pick])
+        # Pad with random directions if the first chunk had fewer reviews than themes
+        while len(centers) < self.n_themes:
+            v = self.rng.standard_normal(self.n_features).astype(np.float32)
+            centers.append(v / np.linalg.norm(v))
+        return np.vstack(centers).astype(np.float32)
+
+    def partial_fit(self, reviews: List[str]):
+        """Consume one chunk of reviews"""
+        docs = [tokenize(r or "") for r in reviews]
+        keep = [i for i, d in enumerate(docs) if d]
+        self.skipped += len(reviews) - len(keep)
+        if not keep:
+            return
+        docs = [docs[i] for i in keep]
+        texts = [reviews[i] for i in keep]
+        vectors = hash_vectors(docs, self.n_features)
+        if self.centroids is None:
+            self.centroids = self._seed(vectors)
+
+        assigned = np.argmax(vectors @ self.centroids.T, axis=1)
+        for theme in np.unique(assigned):
+            members = vectors[assigned == theme]
+            self.seen[theme] += len(members)
+            rate = len(members) / self.seen[theme]
+            center = (1 - rate) * self.centroids[theme] + rate * members.mean(axis=0)
+            self.centroids[theme] = center / max(np.linalg.norm(center), 1e-12)
+
+        polarity = self.sentiment(texts) if self.sentiment else None
+        if polarity is not None:
+            np.add.at(self.polarity_sum, assigned, polarity)
+            np.add.at(self.negative, assigned, polarity < -0.2)
+            np.add.at(self.positive, assigned, polarity > 0.2)
+        chunk_terms: Dict[int, Counter] = {}
+        for theme, tokens, text in zip(assigned, docs, texts):
+            chunk_terms.setdefault(theme, Counter()).update(tokens)
+            if len(self.examples[theme]) < THEME_EXAMPLES:
+                self.examples[theme].append(text[:200])
+        for theme, counts in chunk_terms.items():
+            self.terms[theme].merge(counts)
+        self.total += len(keep)
+
+    def fit_stream(self, reviews: Iterable[str], chunk_size: int = THEME_CHUNK_SIZE) -> "ThemeExtractor":
+        iterator = iter(reviews)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return self
+            self.partial_fit(chunk)
+
+    def report(self, top_terms: int = 5) -> Dict[str, Any]:
+        themes = {}
+        for theme in np.argsort(-self.seen):
+            count = int(self.seen[theme])
+            if not count:
+                continue
+            terms = self.terms[theme].top(top_terms)
+            entry: Dict[str, Any] = {
+                "frequency": count,
+                "share": round(count / self.total, 4),
+                "top_terms": terms,
+                "examples": self.examples[theme],
+            }
+            if self.sentiment:
+                mean = self.polarity_sum[theme] / count
+                entry["mean_polarity"] = round(float(mean), 4)
+                entry["sentiment"] = "positive" if mean > 0.2 else "negative" if mean < -0.2 else "mixed"
+                entry["negative_share"] = round(float(self.negative[theme] / count), 4)
+            name = "_".join(terms[:2]) or f"theme_{theme}"
+            themes[name if name not in themes else f"{name}_{theme}"] = entry
+
+        improvement = sorted(
+            (name for name, t in themes.items() if t.get("mean_polarity", 0) < 0),
+            key=lambda name: themes[name]["mean_polarity"]
+        )
+        return {
+            "total_reviews_analyzed": self.total,
+            "skipped_empty": self.skipped,
+            "themes": themes,
+            "top_theme": next(iter(themes), None),
+            "improvement_areas": improvement,
+        }
+
+
+def iter_reviews(path: str, text_field: str = "text") -> Iterator[str]:
+    """Stream review texts from a .txt (one per line), .jsonl or .csv file"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield row.get(text_field) or ""
+        elif path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line).get(text_field) or ""
+        else:
+            for line in f:
+                yield line.strip()
+
+
+def sentiment_polarity(texts: List[str]) -> np.ndarray:
+    """Polarity per text from the shared batched sentiment engine"""
+    from cabo_sentiment_engine import get_engine
+    return get_engine().score(texts).polarity
+
+
+def extract_themes(reviews: Optional[Iterable[str]] = None, path: Optional[str] = None,
+                   text_field: str = "text", n_themes: int = 8,
+                   with_sentiment: bool = True) -> Dict[str, Any]:
+    """Theme report for an in-memory list/iterator of reviews or a review file"""
+    if path:
+        reviews = iter_reviews(path, text_field)
+    extractor = ThemeExtractor(n_themes, sentiment=sentiment_polarity if with_sentiment else None)
+    return extractor.fit_stream(reviews or []).report()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Local time-series store for Los Cabos tourism statistics
+Daily values in SQLite with monthly and yearly rollups kept up to date on import,
+so seasonal and year-over-year questions are answered from pre-aggregated tables
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TOURISM_STATS_DB = os.getenv("TOURISM_STATS_DB", "data/tourism_stats.sqlite3")
+IMPORT_BATCH_SIZE = 10000
+
+# How daily values combine into a month or year
+METRICS = {
+    "visitor_count": "sum",
+    "average_stay": "mean",
+    "spending_per_visitor": "mean",
+    "occupancy_rate": "mean",
+    "airport_arrivals": "sum",
+}
+ALIASES = {
+    "visitors": "visitor_count",
+    "stay": "average_stay",
+    "avg_stay": "average_stay",
+    "spend_per_visitor": "spending_per_visitor",
+    "spending": "spending_per_visitor",
+    "occupancy": "occupancy_rate",
+    "hotel_occupancy": "occupancy_rate",
+    "arrivals": "airport_arrivals",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily (
+    metric TEXT NOT NULL,
+    day TEXT NOT NULL,
+    value REAL NOT NULL,
+    source TEXT,
+    PRIMARY KEY (metric, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS monthly (
+    metric TEXT NOT NULL,
+    period TEXT NOT NULL,
+    total REAL, mean REAL, min REAL, max REAL, days INTEGER,
+    PRIMARY KEY (metric, period)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS yearly (
+    metric TEXT NOT NULL,
+    period TEXT NOT NULL,
+    total REAL, mean REAL, min REAL, max REAL, days INTEGER,
+    PRIMARY KEY (metric, period)
+) WITHOUT ROWID;
+"""
+
+# Period prefix length of an ISO day per rollup table
+ROLLUPS = {"monthly": 7, "yearly": 4}
+
+
+def metric_name(metric: str) -> str:
+    """Canonical metric name, accepting the aliases agents tend to use"""
+    key = "_".join(metric.lower().replace("-", " ").split())
+    key = ALIASES.get(key, key)
+    if key not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}; available: {', '.join(METRICS)}")
+    return key
+
+
+def _value_column(metric: str) -> str:
+    return "total" if METRICS[metric] == "sum" else "mean"
+
+
+class TourismStatsStore:
+    """
+    Daily tourism metrics keyed by (metric, ISO day).
+
+    The primary keys double as the range-query indexes. Every write refreshes
+    the monthly/yearly rows of the periods it touched in the same transaction,
+    so readers never see rollups out of step with the daily data.
+    """
+
+    def __init__(self, path: str = TOURISM_STATS_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _refresh_rollups(self, touched: Dict[str, set]):
+        for table, width in ROLLUPS.items():
+            for metric, days in touched.items():
+                periods = sorted({day[:width] for day in days})
+                self._conn.executemany(
+                    f"""
+                    INSERT OR REPLACE INTO {table}
+                    SELECT metric, substr(day, 1, {width}), SUM(value), AVG(value),
+                           MIN(value), MAX(value), COUNT(*)
+                    FROM daily
+                    WHERE metric = ? AND day >= ? AND day < ? || '~'
+                    GROUP BY metric, substr(day, 1, {width})
+                    """,
+                    [(metric, period, period) for period in periods]
+                )
+
+    def upsert(self, rows: Iterable[Tuple[str, str, float]], source: Optional[str] = None) -> int:
+        """Insert or replace (metric, ISO day, value) rows and refresh their rollups"""
+        count = 0
+        touched: Dict[str, set] = {}
+        batch: List[Tuple[str, str, float, Optional[str]]] = []
+        with self._lock, self._conn:
+            for metric, day, value in rows:
+                metric, day = metric_name(metric), str(day)[:10]
+                batch.append((metric, day, float(value), source))
+                touched.setdefault(metric, set()).add(day)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    self._conn.executemany("INSERT OR REPLACE INTO daily VALUES (?, ?, ?, ?)", batch)
+                    count += len(batch)
+                    batch = []
+            self._conn.executemany("INSERT OR REPLACE INTO daily VALUES (?, ?, ?, ?)", batch)
+            count += len(batch)
+            self._refresh_rollups(touched)
+        return count
+
+    def import_csv(self, path: str) -> int:
+        """
+        Bulk-load a CSV of daily values.
+
+        Accepts long format (date, metric, value columns) or wide format (a
+        date column plus one column per metric); empty cells and columns that
+        are not a known metric are skipped.
+        """
+        def rows() -> Iterable[Tuple[str, str, float]]:
+            with open(path, encoding="utf-8", newline="") as f:
+                reader = csv.DictReader(f)
+                fields = [c.strip().lower() for c in reader.fieldnames or []]
+                date_field = next((c for c in ("date", "day") if c in fields), None)
+                if date_field is None:
+                    raise ValueError(f"{path} has no date/day column")
+                long_format = "metric" in fields and "value" in fields
+                known = {c for c in fields if c.replace(" ", "_") in METRICS or c.replace(" ", "_") in ALIASES}
+                for raw in reader:
+                    row = {k.strip().lower(): (v or "").strip() for k, v in raw.items() if k}
+                    if long_format:
+                        if row["value"]:
+                            yield row["metric"], row[date_field], float(row["value"])
+                        continue
+                    for column, value in row.items():
+                        if column in known and value:
+                            yield column, row[date_field], float(value)
+
+        return self.upsert(rows(), source=os.path.basename(path))
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, tuple(params))]
+
+    def daily(self, metric: str, start: str, end: str) -> List[Dict[str, Any]]:
+        """Daily values with start <= day <= end (ISO dates), via the primary key index"""
+        return self.query(
+            "SELECT day, value FROM daily WHERE metric = ? AND day BETWEEN ? AND ? ORDER BY day",
+            (metric_name(metric), start, end)
+        )
+
+    def rollup(self, metric: str, granularity: str = "monthly", start: str = "",
+               end: str = "~") -> List[Dict[str, Any]]:
+        """Pre-aggregated monthly or yearly rows for periods in [start, end]"""
+        if granularity not in ROLLUPS:
+            raise ValueError("granularity must be 'monthly' or 'yearly'")
+        metric = metric_name(metric)
+        return self.query(
+            f"""
+            SELECT period, {_value_column(metric)} AS value, total, mean, min, max, days
+            FROM {granularity}
+            WHERE metric = ? AND period BETWEEN ? AND ?
+            ORDER BY period
+            """,
+            (metric, start, end)
+        )
+
+    def statistic(self, metric: str, timeframe: str) -> Dict[str, Any]:
+        """
+        One value for a year ("2024"), month ("2024-03") or day ("2024-03-15"),
+        with the change against the same period a year earlier.
+        """
+        metric = metric_name(metric)
+        timeframe = timeframe.strip()
+        if len(timeframe) == 10:
+            rows = self.daily(metric, timeframe, timeframe)
+            previous = self.daily(metric, *(2 * [f"{int(timeframe[:4]) - 1}{timeframe[4:]}"]))
+        else:
+            granularity = "yearly" if len(timeframe) == 4 else "monthly"
+            rows = self.rollup(metric, granularity, timeframe, timeframe)
+            prior = f"{int(timeframe[:4]) - 1}{timeframe[4:]}"
+            previous = self.rollup(metric, granularity, prior, prior)
+        result: Dict[str, Any] = {"metric": metric, "timeframe": timeframe,
+                                  "aggregation": METRICS[metric]}
+        if not rows:
+            return {**result, "value": None, "trend": "no data"}
+        value = rows[0]["value"]
+        result.update({"value": round(value, 2), "days_covered": rows[0].get("days", 1)})
+        if previous and previous[0]["value"]:
+            change = (value - previous[0]["value"]) / abs(previous[0]["value"])
+            result["previous_value"] = round(previous[0]["value"], 2)
+            result["change_pct"] = round(100 * change, 1)
+            result["trend"] = "stable" if abs(change) < 0.02 else "increasing" if change > 0 else "decreasing"
+        else:
+            result["trend"] = "no prior period"
+        return result
+
+    def seasonality(self, metric: str, start_year: str = "", end_year: str = "~") -> Dict[str, Any]:
+        """Average value per calendar month across years, from the monthly rollup"""
+        metric = metric_name(metric)
+        rows = self.query(
+            f"""
+            SELECT substr(period, 6, 2) AS month, AVG({_value_column(metric)}) AS value,
+                   COUNT(*) AS years
+            FROM monthly
+            WHERE metric = ? AND substr(period, 1, 4) BETWEEN ? AND ?
+            GROUP BY month
+            ORDER BY month
+            """,
+            (metric, start_year, end_year)
+        )
+        if not rows:
+            return {"metric": metric, "months": {}, "peak_months": [], "low_months": []}
+        overall = sum(r["value"] for r in rows) / len(rows)
+        ranked = sorted(rows, key=lambda r: r["value"], reverse=True)
+        return {
+            "metric": metric,
+            "months": {r["month"]: {"value": round(r["value"], 2), "years": r["years"],
+                                    "index": round(r["value"] / overall, 3) if overall else None}
+                       for r in rows},
+            "peak_months": [r["month"] for r in ranked[:3]],
+            "low_months": [r["month"] for r in ranked[-3:][::-1]],
+        }
+
+    def coverage(self) -> List[Dict[str, Any]]:
+        """Date range and day count stored per metric"""
+        return self.query(
+            "SELECT metric, MIN(day) AS first_day, MAX(day) AS last_day, COUNT(*) AS days "
+            "FROM daily GROUP BY metric ORDER BY metric"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[TourismStatsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_tourism_store() -> TourismStatsStore:
+    """Return the process-wide tourism statistics store, opening it on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TourismStatsStore(TOURISM_STATS_DB)
+        return _store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load and query Los Cabos tourism statistics")
+    parser.add_argument("--db", default=TOURISM_STATS_DB, help="Tourism statistics database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("import", help="Bulk-load daily values from CSV files")
+    load.add_argument("files", nargs="+")
+    show = commands.add_parser("stat", help="Value for a year, month or day")
+    show.add_argument("metric")
+    show.add_argument("timeframe")
+    season = commands.add_parser("seasonality", help="Average by calendar month")
+    season.add_argument("metric")
+    commands.add_parser("coverage", help="Stored date range per metric")
+    args = parser.parse_args()
+
+    store = TourismStatsStore(args.db)
+    if args.command == "import":
+        for path in args.files:
+            print(f"{path}: {store.import_csv(path)} values")
+    elif args.command == "stat":
+        print(json.dumps(store.statistic(args.metric, args.timeframe), indent=2))
+    elif args.command == "seasonality":
+        print(json.dumps(store.seasonality(args.metric), indent=2))
+    else:
+        for row in store.coverage():
+            print(json.dumps(row))
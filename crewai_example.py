@@ -7,16 +7,22 @@ This example demonstrates how to create a crew of AI agents that work together.
 import os
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import SerperDevTool, WebsiteSearchTool
+from crewai_tools import WebsiteSearchTool
 from dotenv import load_dotenv
+from cabo_llm import RateLimitedLLM
+from cabo_search import CachedSerperDevTool
 
 # Load environment variables
 load_dotenv()
 
 # Initialize tools
-search_tool = SerperDevTool()
+search_tool = CachedSerperDevTool()  # Shares the persistent search cache across runs
 web_search_tool = WebsiteSearchTool()
 
+# Every agent draws from the process-wide LLM rate limiter and response cache,
+# so batch workers running this crew share one request/token budget
+llm = RateLimitedLLM(model=os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini"))
+
 # Create agents
 researcher = Agent(
     role='Senior Research Analyst',
@@ -26,6 +32,7 @@ researcher = Agent(
     relevant data and presenting it in a clear, actionable format.""",
     verbose=True,
     allow_delegation=False,
+    llm=llm,
     tools=[search_tool, web_search_tool]
 )
 
@@ -36,7 +43,8 @@ writer = Agent(
     complex research into engaging, easy-to-understand content. You have a talent
     for structuring information logically and writing in a clear, persuasive style.""",
     verbose=True,
-    allow_delegation=False
+    allow_delegation=False,
+    llm=llm
 )
 
 editor = Agent(
@@ -45,7 +53,8 @@ editor = Agent(
     backstory="""You are a meticulous editor with a keen eye for detail. You ensure
     all content is accurate, well-structured, and polished before publication.""",
     verbose=True,
-    allow_delegation=False
+    allow_delegation=False,
+    llm=llm
 )
 
 # Create tasks
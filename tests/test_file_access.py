@@ -0,0 +1,68 @@
+"""Bounded reads and grep over memory-mapped files, including single huge lines"""
+
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cabo_file_access import LINE_INDEX_STRIDE, MappedFile, compile_pattern  # noqa: E402
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_read_lines_pages_through_a_multiline_file(tmp_path):
+    lines = [f"line {i}\n" for i in range(3 * LINE_INDEX_STRIDE + 5)]
+    mapped = MappedFile(_write(tmp_path, "lines.txt", "".join(lines).encode()))
+
+    text, read = mapped.read_lines(2 * LINE_INDEX_STRIDE + 1, 3)
+    assert read == 3
+    assert text == "".join(lines[2 * LINE_INDEX_STRIDE + 1:2 * LINE_INDEX_STRIDE + 4])
+    assert mapped.n_lines == len(lines)
+
+
+def test_read_lines_on_one_huge_line_copies_only_the_window(tmp_path):
+    mapped = MappedFile(_write(tmp_path, "minified.json", b"x" * (32 * 1024 * 1024)))
+    mapped._build_line_index()  # Index scan is bounded by SCAN_BLOCK_BYTES and measured elsewhere
+
+    tracemalloc.start()
+    text, read = mapped.read_lines(0, 5, max_chars=1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert (len(text), read) == (1000, 1)
+    assert peak < 1024 * 1024
+
+
+def test_grep_reports_line_numbers_and_one_span_per_line(tmp_path):
+    data = b"alpha\nbeta needle needle\ngamma\nneedle delta\n"
+    mapped = MappedFile(_write(tmp_path, "small.txt", data))
+
+    spans = list(mapped.grep(compile_pattern("needle"), context_lines=1))
+    assert [(s["line"], s["text"]) for s in spans] == [(2, "beta needle needle"), (4, "needle delta")]
+    assert spans[0]["before"] == "alpha\n"
+    assert spans[1]["after"] == ""
+    assert spans[0]["offset"] == data.index(b"needle")
+
+
+def test_grep_stays_linear_on_a_single_line_with_many_matches(tmp_path):
+    data = b"[" + b'{"k":"v"},' * 300_000 + b"{}]\nsecond \"k\" line\n"
+    mapped = MappedFile(_write(tmp_path, "one_line.json", data))
+
+    started = time.perf_counter()
+    spans = list(mapped.grep(re.compile(rb'"k"')))
+    assert time.perf_counter() - started < 1.0
+    assert [s["line"] for s in spans] == [1, 2]
+    assert all(len(s["text"]) <= 600 for s in spans)
+
+
+def test_grep_stops_at_max_matches(tmp_path):
+    mapped = MappedFile(_write(tmp_path, "many.txt", b"hit\n" * 100))
+    assert len(list(mapped.grep(compile_pattern("hit"), max_matches=7))) == 7
@@ -0,0 +1,91 @@
+"""Canonicalization and single-flight collapsing of equivalent search queries"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import cabo_query_dedup  # noqa: E402
+from cabo_query_dedup import QueryDeduplicator, canonical_tokens, deduplicated  # noqa: E402
+
+
+def test_place_names_years_and_stopwords_canonicalize_together():
+    assert canonical_tokens("Best hotels in Los Cabos 2025, 2024") == \
+        canonical_tokens("best hotel cabo san lucas 2024-2025")
+    assert canonical_tokens("Cabo restaurants") != canonical_tokens("Cabo restaurants 2024")
+
+
+def test_near_duplicates_share_one_backend_call():
+    dedup = QueryDeduplicator(threshold=0.6)
+    calls = []
+    fn = lambda q: calls.append(q) or f"result for {q}"  # noqa: E731
+    first = dedup.run("cabo whale watching tours prices", fn)
+    again = dedup.run("whale watching tours prices in Los Cabos", fn)
+    other = dedup.run("cabo fishing charters", fn)
+    assert again == first
+    assert other != first
+    assert calls == ["cabo whale watching tours prices", "cabo fishing charters"]
+    assert dedup.stats()["collapsed"] == 1
+
+
+def test_scopes_are_never_collapsed():
+    dedup = QueryDeduplicator()
+    calls = []
+    fn = lambda q: calls.append(q) or len(calls)  # noqa: E731
+    assert dedup.run("cabo gyms", fn, scope="gl=mx") == 1
+    assert dedup.run("cabo gyms", fn, scope="gl=us") == 2
+    assert dedup.run("Cabo gyms", fn, scope="gl=mx") == 1
+
+
+def test_concurrent_equivalent_queries_wait_for_the_first_call():
+    dedup = QueryDeduplicator()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow(query):
+        calls.append(query)
+        started.set()
+        release.wait(5)
+        return "shared"
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(dedup.run("cabo yoga studios", slow)))
+    owner.start()
+    assert started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(dedup.run("Yoga studios Cabo", slow)))
+               for _ in range(4)]
+    for t in waiters:
+        t.start()
+    release.set()
+    for t in [owner, *waiters]:
+        t.join(5)
+    assert results == ["shared"] * 5
+    assert calls == ["cabo yoga studios"]
+
+
+def test_failed_query_is_retried_not_replayed():
+    dedup = QueryDeduplicator()
+
+    def failing(query):
+        raise RuntimeError("backend down")
+
+    with pytest.raises(RuntimeError):
+        dedup.run("cabo surf lessons", failing)
+    assert dedup.run("cabo surf lessons", lambda q: "ok") == "ok"
+    assert dedup.stats()["backend_calls"] == 2
+
+
+def test_module_scope_only_collapses_during_a_run():
+    calls = []
+    fn = lambda q: calls.append(q) or len(calls)  # noqa: E731
+    cabo_query_dedup.start_run()
+    try:
+        assert deduplicated("cabo spas", fn) == deduplicated("Cabo spas", fn) == 1
+    finally:
+        assert cabo_query_dedup.stop_run()["requests"] == 2
+    assert deduplicated("cabo spas", fn) == 2
+    assert cabo_query_dedup.stop_run() is None
@@ -0,0 +1,103 @@
+"""AIMD token-bucket behaviour of the shared rate limiter"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import cabo_rate_limit  # noqa: E402
+from cabo_rate_limit import AdaptiveRateLimiter, RateLimitExceeded  # noqa: E402
+
+
+class _Throttled(Exception):
+    status_code = 429
+
+
+def test_bucket_drains_then_reports_a_wait():
+    limiter = AdaptiveRateLimiter("test", rpm=3)
+    assert [limiter.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = limiter.try_acquire()
+    assert 0 < wait <= 20
+
+
+def test_token_budget_limits_large_requests():
+    limiter = AdaptiveRateLimiter("test", rpm=100, tpm=1000)
+    assert limiter.try_acquire(tokens=900) == 0.0
+    assert limiter.try_acquire(tokens=500) > 0
+    limiter.report_tokens(estimated=900, actual=100)  # Unused estimate is handed back
+    assert limiter.try_acquire(tokens=500) == 0.0
+
+
+def test_throttle_halves_rate_and_pauses_then_success_ramps_back():
+    limiter = AdaptiveRateLimiter("test", rpm=100)
+    limiter.on_throttle(retry_after=30)
+    assert limiter.stats()["current_rpm"] == 100 * cabo_rate_limit.BACKOFF_FACTOR
+    assert limiter.try_acquire() > 25  # Paused until Retry-After
+
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.stats()["current_rpm"] == pytest.approx(50 + 10 * 100 * cabo_rate_limit.RAMP_STEP)
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.stats()["current_rpm"] == 100  # Never above the ceiling
+
+
+def test_rate_never_drops_below_floor():
+    limiter = AdaptiveRateLimiter("test", rpm=100)
+    for _ in range(20):
+        limiter.on_throttle(retry_after=0.001)
+    assert limiter.stats()["current_rpm"] == 100 * cabo_rate_limit.MIN_RATE_FRACTION
+
+
+def test_call_retries_throttle_errors_and_gives_up(monkeypatch):
+    monkeypatch.setattr(cabo_rate_limit, "DEFAULT_RETRY_AFTER", 0.0)
+    limiter = AdaptiveRateLimiter("test", rpm=10_000)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _Throttled()
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert limiter.throttled == 2
+
+    def always_throttled():
+        raise _Throttled()
+
+    with pytest.raises(RateLimitExceeded):
+        limiter.call(always_throttled, max_retries=2)
+
+
+def test_sqlite_state_is_shared_between_limiters(tmp_path):
+    db = str(tmp_path / "limits.sqlite3")
+    first = AdaptiveRateLimiter("shared", rpm=2, db_path=db)
+    second = AdaptiveRateLimiter("shared", rpm=2, db_path=db)
+    assert first.try_acquire() == 0.0
+    assert second.try_acquire() == 0.0
+    assert first.try_acquire() > 0  # Both drew from the same bucket
+
+
+def test_acquire_async_keeps_sqlite_io_off_the_event_loop(tmp_path):
+    limiter = AdaptiveRateLimiter("async", rpm=60, db_path=str(tmp_path / "limits.sqlite3"))
+    threads = []
+    original = limiter.try_acquire
+
+    def recording_try_acquire(tokens=0):
+        threads.append(threading.get_ident())
+        return original(tokens)
+
+    limiter.try_acquire = recording_try_acquire
+
+    async def run():
+        await limiter.acquire_async()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert threads and loop_thread not in threads
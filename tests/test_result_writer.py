@@ -0,0 +1,113 @@
+"""Crash -> resume -> read round trips for the streaming result writer"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cabo_result_writer import ResultWriter, load_run, read_records  # noqa: E402
+
+
+class _Output:
+    def __init__(self, name, raw):
+        self.name, self.raw, self.agent, self.pydantic = name, raw, "analyst", None
+
+
+def _crash_after_tasks(base, compression, tasks, torn_tail=b""):
+    """Write a run header and tasks in a child process that dies without closing its files"""
+    script = textwrap.dedent(f"""
+        import os, sys
+        sys.path.insert(0, {ROOT!r})
+        from cabo_result_writer import ResultWriter
+
+        class Output:
+            def __init__(self, name):
+                self.name, self.raw, self.agent, self.pydantic = name, "output of " + name, "analyst", None
+
+        writer = ResultWriter({base!r}, "run-1", compression={compression!r})
+        for name in {tasks!r}:
+            writer.write_task(None, Output(name))
+        writer._jsonl._raw.write({torn_tail!r})
+        writer._jsonl._raw.flush()
+        os._exit(1)
+    """)
+    subprocess.run([sys.executable, "-c", script], check=False)
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+@pytest.mark.parametrize("torn_tail", [b"", b'{"type": "task", "task": "torn'])
+def test_resume_after_crash_keeps_every_record_readable(tmp_path, compression, torn_tail):
+    base = str(tmp_path / "run")
+    _crash_after_tasks(base, compression, ["market", "sentiment"],
+                       torn_tail if compression == "none" else b"\x1f\x8b\x08" if torn_tail else b"")
+
+    writer = ResultWriter(base, "run-1", compression=compression)
+    writer.write_task(None, _Output("strategy", "output of strategy"))
+    writer.finish({"status": "ok"})
+
+    records = list(read_records(writer.jsonl_path))
+    assert [r["type"] for r in records] == ["run", "task", "task", "run", "task", "summary"]
+    run = load_run(writer.jsonl_path)
+    assert [t["task"] for t in run["tasks"]] == ["market", "sentiment", "strategy"]
+    assert run["complete"] and run["resumed"] is False
+
+
+def test_resume_after_clean_close_appends_without_rewriting(tmp_path):
+    base = str(tmp_path / "run")
+    first = ResultWriter(base, "run-1", compression="gzip")
+    first.write_task(None, _Output("market", "output of market"))
+    first.close()
+    size = os.path.getsize(first.jsonl_path)
+
+    second = ResultWriter(base, "run-1", compression="gzip")
+    assert not second._jsonl.repaired
+    second.finish({"status": "ok"})
+    assert os.path.getsize(second.jsonl_path) > size
+    assert load_run(second.jsonl_path)["complete"]
+
+
+def test_reopening_a_large_clean_gzip_artifact_does_not_load_it(tmp_path):
+    import tracemalloc
+    from cabo_result_writer import AppendFile
+
+    path = str(tmp_path / "big.jsonl.gz")
+    writer = AppendFile(path, "gzip", fsync=False)
+    for i in range(20_000):
+        writer.write(b'{"type": "task", "output": "%s"}\n' % (b"%d" % i * 100))
+    writer.close()
+
+    tracemalloc.start()
+    reopened = AppendFile(path, "gzip", fsync=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    reopened.close()
+
+    assert not reopened.repaired
+    assert peak < 512 * 1024
+    assert sum(1 for _ in read_records(path)) == 20_000
+
+
+def test_torn_plain_artifact_is_cut_back_to_its_last_line(tmp_path):
+    from cabo_result_writer import repair_tail
+
+    path = tmp_path / "run.jsonl"
+    path.write_bytes(b'{"a": 1}\n' + b"x" * 200_000)
+    assert repair_tail(str(path), "none")
+    assert path.read_bytes() == b'{"a": 1}\n'
+    assert not repair_tail(str(path), "none")
+
+
+def test_repaired_gzip_artifact_passes_the_tail_check_next_time(tmp_path):
+    from cabo_result_writer import repair_tail
+
+    base = str(tmp_path / "run")
+    _crash_after_tasks(base, "gzip", ["market"])
+    path = base + ".jsonl.gz"
+    assert repair_tail(path, "gzip")
+    assert not repair_tail(path, "gzip")
+    assert [r["type"] for r in read_records(path)] == ["run", "task"]
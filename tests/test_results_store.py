@@ -0,0 +1,98 @@
+"""Run upserts and trend queries of the historical results store"""
+
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cabo_results_store import ResultsStore  # noqa: E402
+
+
+def _gap(name, competition="Low"):
+    return {"gap_name": name, "description": "d", "target_audience": "t",
+            "estimated_market_size": "s", "competition_level": competition,
+            "implementation_difficulty": "Easy"}
+
+
+def _feature(name, priority, roi="High"):
+    return {"feature_name": name, "description": "d", "priority": priority,
+            "estimated_dev_time": "2w", "roi_potential": roi}
+
+
+def _metrics(cost):
+    return {"totals": {"cost_usd": cost, "prompt_tokens": 100, "completion_tokens": 50, "calls": 3},
+            "by_call": {"search:serper": {"calls": 2, "cache_hits": 1}}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite3"))
+    yield store
+    store.close()
+
+
+def _count(store, table, run_id):
+    return store.query(f"SELECT COUNT(*) AS n FROM {table} WHERE run_id = ?", (run_id,))[0]["n"]
+
+
+def test_recording_a_run_again_replaces_its_child_rows(store):
+    store.record_run("r1", "2026-01-01T00:00:00",
+                     task_outputs=[{"task": "a", "output": "x"}, {"task": "b", "output": "y"}],
+                     structured={"market_gaps": [_gap("A"), _gap("B")],
+                                 "product_features": [_feature("F", 5)]},
+                     metrics=_metrics(1.0))
+    store.record_run("r1", "2026-01-01T00:00:00",
+                     task_outputs=[{"task": "a", "output": "x2"}],
+                     structured={"market_gaps": [_gap("C")]})
+
+    assert [r["run_id"] for r in store.runs()] == ["r1"]
+    assert store.runs()[0]["tasks_completed"] == 1
+    assert _count(store, "task_outputs", "r1") == 1
+    assert [g["gap_name"] for g in store.query("SELECT gap_name FROM market_gaps")] == ["C"]
+    assert _count(store, "product_features", "r1") == 0
+    assert _count(store, "metrics", "r1") == 0
+
+
+def test_gap_trends_group_names_across_runs(store):
+    store.record_run("r1", "2026-01-01", structured={"market_gaps": [_gap("Late-night gyms", "High"),
+                                                                      _gap("Surf coaching")]})
+    store.record_run("r2", "2026-02-01", structured={"market_gaps": [_gap("late-night  GYMS")]})
+    store.record_run("r3", "2026-03-01", structured={"market_gaps": [_gap("Surf coaching")]})
+
+    trends = {t["gap_key"]: t for t in store.gap_trends()}
+    gyms = trends["late-night gyms"]
+    assert (gyms["runs"], gyms["avg_rank"], gyms["high_competition"]) == (2, 1.0, 1)
+    assert (gyms["first_seen"], gyms["last_seen"]) == ("2026-01-01", "2026-02-01")
+    assert trends["surf coaching"]["avg_rank"] == 1.5
+    assert [t["gap_key"] for t in store.gap_trends(since="2026-02-15")] == ["surf coaching"]
+
+
+def test_feature_trends_rank_by_average_priority(store):
+    store.record_run("r1", "2026-01-01", structured={"product_features": [
+        _feature("Booking", 9), _feature("Chat", 4, "Low")]})
+    store.record_run("r2", "2026-02-01", structured={"product_features": [_feature("booking", 7, "Medium")]})
+
+    trends = store.feature_trends()
+    assert [t["feature_key"] for t in trends] == ["booking", "chat"]
+    assert (trends[0]["runs"], trends[0]["avg_priority"]) == (2, 8.0)
+    assert (trends[0]["high_roi"], trends[0]["medium_roi"], trends[0]["low_roi"]) == (1, 1, 0)
+
+
+def test_metric_trend_and_import_skip_known_runs(store, tmp_path):
+    store.record_run("r1", "2026-01-01", metrics=_metrics(0.5))
+    store.record_run("r2", "2026-02-01", metrics=_metrics(0.75))
+    assert [m["cost_usd"] for m in store.metric_trend()] == [0.75, 0.5]
+    assert [m["cache_hits"] for m in store.metric_trend("call", "search:serper")] == [1, 1]
+
+    path = tmp_path / "cabo_market_research_r3.json"
+    path.write_text(json.dumps({
+        "run_id": "r3", "timestamp": "2026-03-01", "result": "done",
+        "structured": {"product_features": [_feature("Tours", "6")]},
+    }))
+    assert store.import_json(str(path)) == "r3"
+    assert store.import_json(str(path)) is None
+    assert store.query("SELECT priority FROM product_features WHERE run_id = 'r3'") == [{"priority": 6}]
@@ -0,0 +1,107 @@
+"""Fenwick window queries and EWMA/CUSUM change points of the sentiment trend store"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cabo_sentiment_trends import SentimentTrendStore, _Fenwick, from_day, to_day  # noqa: E402
+
+START = to_day("2025-01-01")
+
+
+def _daily_points(means, noise=0.05, per_day=4, seed=0):
+    rng = np.random.default_rng(seed)
+    days = np.repeat(np.arange(len(means)) + START, per_day)
+    scores = np.repeat(means, per_day) + rng.normal(0, noise, len(days))
+    return days, scores
+
+
+def test_fenwick_prefix_sums_match_cumulative_sums():
+    values = np.random.default_rng(1).normal(size=(37, 3))
+    tree = _Fenwick(values)
+    tree.add(5, np.array([1.0, 2.0, 3.0]))
+    values[5] += [1.0, 2.0, 3.0]
+    for end in (0, 1, 6, 36, 37, 100):
+        assert np.allclose(tree.prefix(end), values[:end].sum(axis=0))
+
+
+def test_window_matches_brute_force_across_growth():
+    rng = np.random.default_rng(2)
+    store = SentimentTrendStore(capacity=8)
+    days = rng.integers(START, START + 400, size=2000)
+    scores = rng.uniform(-1, 1, size=2000)
+    for chunk in np.array_split(np.arange(2000), 7):  # Forces several capacity doublings
+        store.ingest_arrays(days[chunk], scores[chunk])
+
+    for lo, hi in [(0, 399), (10, 10), (100, 250), (390, 500)]:
+        result = store.window(from_day(START + lo), from_day(START + hi))
+        picked = scores[(days >= START + lo) & (days <= START + hi)]
+        assert result["count"] == len(picked)
+        assert result["mean"] == pytest.approx(picked.mean(), abs=1e-4)
+        assert result["std"] == pytest.approx(picked.std(), abs=1e-4)
+    assert store.window("2024-01-01", "2024-12-31")["count"] == 0
+
+
+def test_monthly_series_splits_on_calendar_months():
+    store = SentimentTrendStore()
+    store.ingest([{"timestamp": "2025-01-31T23:00:00", "score": 1.0},
+                  {"timestamp": "2025-02-01T01:00:00", "score": -1.0},
+                  {"timestamp": "2025-02-28", "score": 0.0}])
+    jan, feb = store.series("month", periods=2)
+    assert (jan["start"], jan["end"], jan["count"], jan["mean"]) == ("2025-01-01", "2025-01-31", 1, 1.0)
+    assert (feb["start"], feb["count"], feb["mean"]) == ("2025-02-01", 2, -0.5)
+
+
+def test_cusum_flags_a_level_shift_once_and_stays_quiet_on_noise():
+    means = np.concatenate([np.full(60, 0.2), np.full(60, -0.4)])
+    store = SentimentTrendStore()
+    store.ingest_arrays(*_daily_points(means))
+
+    points = store.change_points()
+    assert len(points) == 1
+    assert points[0]["direction"] == "down"
+    assert 0 <= to_day(points[0]["date"]) - (START + 60) <= 3
+    assert store.ewma_at() == pytest.approx(-0.4, abs=0.05)
+
+    quiet = SentimentTrendStore()
+    quiet.ingest_arrays(*_daily_points(np.full(120, 0.2), seed=3))
+    assert quiet.change_points() == []
+
+
+def test_incremental_and_out_of_order_ingest_match_a_single_batch():
+    days, scores = _daily_points(np.concatenate([np.full(50, 0.5), np.full(50, -0.1)]), seed=4)
+    batch = SentimentTrendStore()
+    batch.ingest_arrays(days, scores)
+
+    streamed = SentimentTrendStore()
+    order = np.argsort(days, kind="stable")
+    for chunk in np.array_split(order, 10):
+        streamed.ingest_arrays(days[chunk], scores[chunk])
+        streamed.ewma_at()  # Refresh between chunks so later ones go through the incremental path
+    late = days < START + 20
+    late_store = SentimentTrendStore()
+    late_store.ingest_arrays(days[~late], scores[~late])
+    late_store.change_points()
+    late_store.ingest_arrays(days[late], scores[late])  # Backfilled days before the first one
+
+    for store in (streamed, late_store):
+        assert store.change_points() == batch.change_points()
+        assert store.ewma_at() == batch.ewma_at()
+        assert store.ewma_at("2025-02-01") == batch.ewma_at("2025-02-01")
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = SentimentTrendStore()
+    store.ingest_arrays(*_daily_points(np.concatenate([np.full(40, 0.3), np.full(40, -0.5)])))
+    path = str(tmp_path / "trends.npz")
+    store.save(path)
+
+    loaded = SentimentTrendStore.load(path)
+    assert loaded.window("2025-01-01", "2025-12-31") == store.window("2025-01-01", "2025-12-31")
+    assert loaded.change_points() == store.change_points()
+    assert loaded.summary()["trend_direction"] == "declining"